@@ -36,9 +36,25 @@ module instr_mem (
     (* ram_style = "block" *) logic [31:0] RAM [8195:0];
 
     //Initialize instruction memory with given file
+`ifdef SIM
+    // +instr_hex=<path> takes precedence, allowing one simulation build to run any program
+    string instr_hex_file;
+
+    initial begin
+        if ($value$plusargs("instr_hex=%s", instr_hex_file)) begin
+            $readmemh(instr_hex_file, RAM);
+        end
+    `ifdef INSTR_HEX_FILE
+        else begin
+            $readmemh(`INSTR_HEX_FILE, RAM);
+        end
+    `endif
+    end
+`elsif INSTR_HEX_FILE
     initial begin
        $readmemh(`INSTR_HEX_FILE, RAM);
     end
+`endif
 
     //[31:2] as to maintain word alignment
     assign rd_o = RAM[addr[31:2]];
@@ -1,10 +1,16 @@
 #!/usr/bin/env python3
 
 import argparse
+import hashlib
+import json
 import yaml
 import os
-from jinja2 import Environment, FileSystemLoader
 import re
+from functools import lru_cache
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_PATH = f"{SCRIPT_DIR}/.gen_cache.json"
+TEMPLATE_DIR = f"{SCRIPT_DIR}/templates"
 
 ###################################################
 #                General Functions                #
@@ -21,6 +27,19 @@ def parse_args():
         help="Path to rtl directory (defaults to: ../../rtl)"
     )
 
+    parser.add_argument(
+        "--trigger_spec", "-t",
+        type=str,
+        default=argparse.SUPPRESS,
+        help="YAML spec of the triggers used with PIPELINE_DUMP_TRIGGER (defaults to: ./trigger_spec.yml)"
+    )
+
+    parser.add_argument(
+        "--force", "-f",
+        action="store_true",
+        help="Regenerate all outputs, ignoring the cache"
+    )
+
     parser.add_argument(
         "-o", "--output_dir",
         type=str,
@@ -40,16 +59,134 @@ def load_yaml(yaml_path):
 
     return yaml_data
 
+@lru_cache(maxsize=None)
+def get_template_env():
+    """
+    Returns the Jinja environment shared by every generated output, so each template is only loaded once.
+    jinja2 is imported here, so runs where nothing changed don't pay for the import.
+    """
+    from jinja2 import Environment, FileSystemLoader
+
+    return Environment(loader=FileSystemLoader(TEMPLATE_DIR))
+
+###################################################
+#                   Gen Cache                     #
+###################################################
+def hash_file(file_path):
+    with open(file_path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def load_gen_cache(cache_path, script_hash):
+    """
+    Loads the cache of parsed sources and written outputs from a previous run.
+    The cache is discarded if this script has changed since it was written.
+
+    Returns:
+        dict with "script" (hash of this script), "inputs" (hash of all inputs of the last run),
+        "parsed" (parser:source -> {"hash", "data"}) and "outputs" (output path -> hash)
+    """
+    try:
+        with open(cache_path, "r") as f:
+            gen_cache = json.load(f)
+        if (gen_cache["script"] == script_hash):
+            return gen_cache
+    except (OSError, ValueError, KeyError):
+        pass
+
+    return {"script": script_hash, "inputs": "", "parsed": {}, "outputs": {}}
+
+def save_gen_cache(cache_path, gen_cache):
+    try:
+        with open(cache_path, "w") as f:
+            json.dump(gen_cache, f)
+    except OSError:
+        print(f"could not write gen cache {cache_path}")
+
+def cached_parse(gen_cache, parse_func, source_path, *args):
+    """
+    Returns parse_func(source_path, *args), reusing the previous result while the source's contents are unchanged
+    """
+    key = f"{parse_func.__name__}:{os.path.abspath(source_path)}:{':'.join(args)}"
+    source_hash = hash_file(source_path)
+
+    entry = gen_cache["parsed"].get(key)
+    if (entry is None or entry["hash"] != source_hash):
+        entry = {"hash": source_hash, "data": parse_func(source_path, *args)}
+        gen_cache["parsed"][key] = entry
+
+    return entry["data"]
+
+def hash_gen_inputs(input_paths, output_dir):
+    """
+    Returns a hash of every file the outputs are generated from (and where they are written)
+    """
+    hasher = hashlib.sha256()
+    hasher.update(f"{os.path.abspath(output_dir)}\0".encode())
+
+    for input_path in input_paths:
+        hasher.update(f"{input_path}:{hash_file(input_path)}\0".encode())
+
+    return hasher.hexdigest()
+
+def outputs_up_to_date(gen_cache):
+    """
+    Returns whether every output of the last run still holds what was written
+    """
+    if (not gen_cache["outputs"]):
+        return False
+
+    for output_path, output_hash in gen_cache["outputs"].items():
+        if (not os.path.isfile(output_path) or hash_file(output_path) != output_hash):
+            return False
+
+    return True
+
+def write_if_changed(output_path, content, gen_cache):
+    """
+    Writes content to output_path unless it already holds it, so unchanged outputs keep their mtime
+    """
+    content_hash = hashlib.sha256(content.encode()).hexdigest()
+    gen_cache["outputs"][os.path.abspath(output_path)] = content_hash
+
+    if (os.path.isfile(output_path) and hash_file(output_path) == content_hash):
+        return False
+
+    with open(output_path, "w") as f:
+        f.write(content)
+    print(f"updated {output_path}")
+
+    return True
+
 ###################################################
 #               Pipeline Stage Parsing            #
 ###################################################
+def parse_field_width(declaration):
+    """
+    Returns the bit width of a field/port declaration such as "logic [31:0] pc",
+    or None if it can't be determined from the declaration alone (e.g. parameterized widths)
+    """
+    range_match = re.search(r'\[\s*(\d+)\s*:\s*(\d+)\s*\]', declaration)
+    if (range_match):
+        return abs(int(range_match.group(1)) - int(range_match.group(2))) + 1
+    elif ("[" not in declaration):
+        return 1
+
+    return None
+
 def parse_stage_structs(module_path, stage_name):
     """
     Extracts field names from the pipeline register structs (meta, data, control)
     for the given pipeline stage.
+
+    Returns:
+        struct_fields: dict of category -> list of field names
+        field_widths: dict of category -> field -> bit width, plus "bundle": the
+                      order of the categories in the stage's bundle struct (MSB first)
     """
     struct_fields = {}
+    field_widths = {}
     fields = []
+    widths = {}
     parsing_struct = False
 
     with open(module_path, "r") as f:
@@ -62,6 +199,7 @@ def parse_stage_structs(module_path, stage_name):
                 if (start_match):
                     parsing_struct = True
                     fields = []
+                    widths = {}
                 continue
 
             # if reaches here, parsing struct.
@@ -72,20 +210,26 @@ def parse_stage_structs(module_path, stage_name):
 
                 if (category != "bundle"):
                     struct_fields[category] = fields
+                    field_widths[category] = widths
+                else:
+                    field_widths["bundle"] = fields
             else:
-                line = line.strip().strip(";").split()
-                if (line):
-                    fields.append(line[-1])
+                line = line.strip().strip(";")
+                tokens = line.split()
+                if (tokens):
+                    fields.append(tokens[-1])
+                    widths[tokens[-1]] = parse_field_width(line)
 
-    return struct_fields
+    return struct_fields, field_widths
 
-def parse_all_stages(rtl_dir, stage_metadata):
+def parse_all_stages(rtl_dir, stage_metadata, gen_cache):
     for stage in stage_metadata.keys():
         module_path = f"{rtl_dir}/{stage_metadata[stage].get('module', '')}"
 
-        struct_fields = parse_stage_structs(module_path, stage)
+        struct_fields, field_widths = cached_parse(gen_cache, parse_stage_structs, module_path, stage)
 
         stage_metadata[stage]["struct_fields"] = struct_fields
+        stage_metadata[stage]["field_widths"] = field_widths
 
     return stage_metadata
 
@@ -93,8 +237,13 @@ def parse_all_stages(rtl_dir, stage_metadata):
 #               Hazard Unit Parsing               #
 ###################################################
 def parse_hazard_unit(hazard_unit_path):
-
+    """
+    Returns:
+        hazard_unit_info: dict of section (stall, flush, forward) -> list of output names
+        hazard_widths: dict of output name -> bit width
+    """
     hazard_unit_info = {}
+    hazard_widths = {}
     valid_sections = ["stall", "flush", "forward"]
 
     for section in valid_sections:
@@ -115,50 +264,204 @@ def parse_hazard_unit(hazard_unit_path):
                 continue
 
             if (section in valid_sections and "output" in line):
-                line = line.strip().replace(",", "").split()
-                hazard_unit_info[section].append(line[-1])
+                line = line.strip().replace(",", "")
+                signal = line.split()[-1]
+                hazard_unit_info[section].append(signal)
+                hazard_widths[signal] = parse_field_width(line)
             elif (section == "forward" and ");" in line):
                 break
 
-    return hazard_unit_info
+    return hazard_unit_info, hazard_widths
+
+###################################################
+#                 Trigger Parsing                 #
+###################################################
+def parse_hazard_signals(hazard_unit_path):
+    """
+    Returns the names of all signals declared in the hazard unit (ports and internal logic)
+    """
+    signals = []
+
+    with open(hazard_unit_path, "r") as f:
+        for line in f:
+            signal_match = re.match(r'\s*(?:input|output)?\s*logic\s*(?:\[[^\]]*\])?\s*(\w+)', line)
+            if (signal_match):
+                signals.append(signal_match.group(1))
+
+    return signals
+
+def parse_trigger_spec(trigger_spec, stage_metadata, hazard_signals):
+    """
+    Converts a trigger spec into the SystemVerilog conditions checked by the pipeline monitor
+
+    Returns:
+        dict with "pre_window", "post_window" and "triggers", a list of
+        {"name", "condition"} in the order they appear in the spec
+    """
+    trigger_info = {"pre_window": int(trigger_spec.get("pre_window", 0)),
+                    "post_window": int(trigger_spec.get("post_window", 0)),
+                    "triggers": []}
+
+    if (trigger_info["pre_window"] < 0 or trigger_info["post_window"] < 0):
+        raise ValueError("trigger windows must not be negative")
+
+    for trigger in trigger_spec.get("triggers", []):
+        if ("pc" in trigger):
+            stage = trigger.get("stage", "ex")
+            if ("pc" not in stage_metadata.get(stage, {}).get("struct_fields", {}).get("meta", [])):
+                raise ValueError(f"stage {stage} has no pc to trigger on")
+            pc = int(trigger["pc"])
+            outputs = f"{stage_metadata[stage]['hierarchy']}.outputs_{stage}"
+            trigger_info["triggers"].append({"name": f"pc_{stage}_0x{pc:08x}",
+                                             "condition": f"{outputs}.meta.valid && {outputs}.meta.pc == 32'h{pc:08x}"})
+        elif ("cycle" in trigger):
+            cycle = int(trigger["cycle"])
+            trigger_info["triggers"].append({"name": f"cycle_{cycle}",
+                                             "condition": f"riscv_top_tb.u_performance_monitor.cycle_cnt == {cycle}"})
+        elif ("hazard" in trigger):
+            signal = trigger["hazard"]
+            if (signal not in hazard_signals and f"{signal}_o" in hazard_signals):
+                signal = f"{signal}_o"
+            if (signal not in hazard_signals):
+                raise ValueError(f"hazard unit has no signal {trigger['hazard']}")
+            trigger_info["triggers"].append({"name": signal,
+                                             "condition": f"|`HAZARD_UNIT_HIER.{signal}"})
+        elif (trigger.get("test_fail", False)):
+            trigger_info["triggers"].append({"name": "test_fail",
+                                             "condition": "riscv_top_tb.test_failed"})
+        else:
+            raise ValueError(f"unknown trigger: {trigger}")
+
+    return trigger_info
+
+###################################################
+#               Binary Dump Schema                #
+###################################################
+def layout_section(categories, widths, value_format):
+    """
+    Lays out the fields of a packed value (first field at the MSB), as written by
+    a single %u in the binary dump.
+
+    Args:
+        categories: dict of category -> ordered list of field names
+        widths: dict of category -> field -> bit width
+        value_format: function of category returning the text dump format ("b" or "h")
+
+    Returns:
+        dict with the section's size in bytes and the bit offset (from the LSB),
+        width and format of each field
+    """
+    total_width = 0
+    for category, fields in categories.items():
+        for field in fields:
+            if (widths[category][field] is None):
+                raise ValueError(f"could not determine the width of {category}.{field}")
+            total_width += widths[category][field]
+
+    section = {"bytes": 4 * ((total_width + 31) // 32), "width": total_width, "fields": {}}
+    bit_pos = total_width
+    for category, fields in categories.items():
+        section["fields"][category] = {}
+        for field in fields:
+            bit_pos -= widths[category][field]
+            section["fields"][category][field] = {"offset": bit_pos,
+                                                  "width": widths[category][field],
+                                                  "format": value_format(category)}
+
+    return section
+
+def gen_dump_schema(stage_metadata, hazard_unit_info, hazard_widths):
+    """
+    Describes the record layout of the binary pipeline dump (PIPELINE_DUMP_BIN).
+
+    Each cycle is one fixed size record: the cycle count, then each stage's output
+    bundle, then the hazard unit outputs. Each is written with %u, so it is padded
+    to a multiple of 32 bit words, stored least significant word first, little endian.
+    """
+    schema = {"format": "pipeline_dump_bin",
+              "version": 1,
+              "byte_order": "little",
+              "word_order": "lsw_first",
+              "record_bytes": 0,
+              "cycle": {"byte_offset": 0, "bytes": 4},
+              "sections": {}}
+
+    sections = {}
+
+    for stage_name, stage_info in stage_metadata.items():
+        field_widths = stage_info["field_widths"]
+        bundle_order = field_widths.get("bundle", list(stage_info["struct_fields"].keys()))
+        categories = {category: stage_info["struct_fields"][category] for category in bundle_order}
+
+        sections[stage_name] = layout_section(categories, field_widths,
+                                              lambda category: "b" if category == "control" else "h")
+
+    hazard_fields = {category: {signal: hazard_widths[signal] for signal in signals} for category, signals in hazard_unit_info.items()}
+    sections["hazard_unit"] = layout_section(hazard_unit_info, hazard_fields, lambda category: "b")
+
+    byte_offset = schema["cycle"]["bytes"]
+    for section_name, section in sections.items():
+        schema["sections"][section_name] = {"byte_offset": byte_offset, **section}
+        byte_offset += section["bytes"]
+    schema["record_bytes"] = byte_offset
+
+    return schema
 
 ###################################################
 #               Output Generation                 #
 ###################################################
-def gen_stage_dump_tasks(output_dir, stage_metadata, indent_levels):
+def get_category_slices(section):
+    """
+    Returns the (msb, lsb) bit range of each category of a dump schema section
+    """
+    category_slices = {}
+    for category, fields in section["fields"].items():
+        category_slices[category] = (max(field["offset"] + field["width"] - 1 for field in fields.values()),
+                                     min(field["offset"] for field in fields.values()))
+
+    return category_slices
 
-    env = Environment(loader=FileSystemLoader("templates"))
-    stage_dump_template = env.get_template("stage_dump_template.sv.j2")
+def gen_stage_dump_tasks(output_dir, stage_metadata, indent_levels, dump_schema, gen_cache):
+    stage_dump_template = get_template_env().get_template("stage_dump_template.sv.j2")
 
     for stage_name, stage_info in stage_metadata.items():
+        layout = dump_schema["sections"][stage_name]
         stage_dump_task_output = stage_dump_template.render(stage_name=stage_name,
                                                             hierarchy=stage_info["hierarchy"],
                                                             struct_fields=stage_info["struct_fields"],
-                                                            indent_levels=indent_levels)
+                                                            indent_levels=indent_levels,
+                                                            layout=layout,
+                                                            category_slices=get_category_slices(layout))
 
-        with open(f"{output_dir}/{stage_name}_dump_tasks.sv", "w") as f:
-            f.write(stage_dump_task_output)
+        write_if_changed(f"{output_dir}/{stage_name}_dump_tasks.sv", stage_dump_task_output, gen_cache)
 
     return
 
-def gen_pipeline_monitor(output_dir, stage_metadata):
-    env = Environment(loader=FileSystemLoader("templates"))
-    pipeline_monitor_template = env.get_template("pipeline_monitor_template.sv.j2")
+def gen_pipeline_monitor(output_dir, stage_metadata, dump_schema, trigger_info, gen_cache):
+    pipeline_monitor_template = get_template_env().get_template("pipeline_monitor_template.sv.j2")
 
-    monitor_output = pipeline_monitor_template.render(stages=stage_metadata.keys())
+    # The monitor writes the schema next to the binary dump, so the two always match
+    schema_lines = yaml.safe_dump(dump_schema, sort_keys=False, default_flow_style=None).splitlines()
+    schema_lines = [line.replace("\\", "\\\\").replace('"', '\\"').replace("%", "%%") for line in schema_lines]
 
-    with open(f"{output_dir}/pipeline_monitor.sv", "w") as f:
-        f.write(monitor_output)
+    monitor_output = pipeline_monitor_template.render(stages=stage_metadata.keys(),
+                                                      stage_metadata=stage_metadata,
+                                                      layouts=dump_schema["sections"],
+                                                      schema_lines=schema_lines,
+                                                      trigger_info=trigger_info)
 
-def gen_hazard_unit_dump_task(output_dir, hazard_unit_info, indent_levels):
-    env = Environment(loader=FileSystemLoader("templates"))
-    hazard_dump_template = env.get_template("hazard_dump_template.sv.j2")
+    write_if_changed(f"{output_dir}/pipeline_monitor.sv", monitor_output, gen_cache)
 
+def gen_hazard_unit_dump_task(output_dir, hazard_unit_info, indent_levels, dump_schema, gen_cache):
+    hazard_dump_template = get_template_env().get_template("hazard_dump_template.sv.j2")
+
+    layout = dump_schema["sections"]["hazard_unit"]
     hazard_dump_output = hazard_dump_template.render(hazard_info=hazard_unit_info,
-                                                     indent_levels=indent_levels)
+                                                     indent_levels=indent_levels,
+                                                     layout=layout,
+                                                     category_slices=get_category_slices(layout))
 
-    with open(f"{output_dir}/hazard_dump_tasks.sv", "w") as f:
-        f.write(hazard_dump_output)
+    write_if_changed(f"{output_dir}/hazard_dump_tasks.sv", hazard_dump_output, gen_cache)
 
     return
 
@@ -167,35 +470,60 @@ def main():
     # Parse args
     args = parse_args()
 
-    script_dir = os.path.dirname(os.path.abspath(__file__))
     if (not hasattr(args, "rtl_dir")):
-        rtl_dir = os.path.abspath(f"{script_dir}/../../rtl/")
+        rtl_dir = os.path.abspath(f"{SCRIPT_DIR}/../../rtl/")
     else:
         rtl_dir = args.rtl_dir
 
     if (not hasattr(args, "output_dir")):
-        output_dir = os.path.abspath(f"{script_dir}/../../tb/system_test")
+        output_dir = os.path.abspath(f"{SCRIPT_DIR}/../../tb/system_test")
     else:
         output_dir = args.output_dir
 
+    if (not hasattr(args, "trigger_spec")):
+        trigger_spec_path = f"{SCRIPT_DIR}/trigger_spec.yml"
+    else:
+        trigger_spec_path = args.trigger_spec
+
+    # Skip generation entirely if no input changed and the outputs are untouched
+    stage_metadata_path = f"{SCRIPT_DIR}/stage_metadata.yml"
+    stage_metadata = load_yaml(stage_metadata_path)
+    hazard_unit_path = f"{rtl_dir}/hazard_unit.sv"
+
+    input_paths = [os.path.abspath(__file__), stage_metadata_path, trigger_spec_path, hazard_unit_path]
+    input_paths.extend(f"{rtl_dir}/{stage_info.get('module', '')}" for stage_info in stage_metadata.values())
+    input_paths.extend(sorted(f"{TEMPLATE_DIR}/{template}" for template in os.listdir(TEMPLATE_DIR)))
+
+    gen_cache = load_gen_cache(CACHE_PATH, hash_file(os.path.abspath(__file__)))
+    inputs_hash = hash_gen_inputs(input_paths, output_dir)
+    if (not args.force and gen_cache["inputs"] == inputs_hash and outputs_up_to_date(gen_cache)):
+        return
+
+    gen_cache["inputs"] = inputs_hash
+    gen_cache["outputs"] = {}
+
     # Make output dir
     os.makedirs(f"{output_dir}/tasks", exist_ok=True)
     os.makedirs(f"{output_dir}/monitors", exist_ok=True)
 
     # Parse data
-    stage_metadata = load_yaml("./stage_metadata.yml")
-    stage_metadata = parse_all_stages(rtl_dir, stage_metadata)
+    stage_metadata = parse_all_stages(rtl_dir, stage_metadata, gen_cache)
 
-    hazard_unit_info = parse_hazard_unit(f"{rtl_dir}/hazard_unit.sv")
+    hazard_unit_info, hazard_widths = cached_parse(gen_cache, parse_hazard_unit, hazard_unit_path)
+    dump_schema = gen_dump_schema(stage_metadata, hazard_unit_info, hazard_widths)
+    trigger_info = parse_trigger_spec(load_yaml(trigger_spec_path), stage_metadata,
+                                      cached_parse(gen_cache, parse_hazard_signals, hazard_unit_path))
 
     # Generate outputs
     indent_levels = {"stage": "  ",
                      "category": "    ",
                      "signal": "      "}
 
-    gen_stage_dump_tasks(f"{output_dir}/tasks", stage_metadata, indent_levels)
-    gen_pipeline_monitor(f"{output_dir}/monitors", stage_metadata)
-    gen_hazard_unit_dump_task(f"{output_dir}/tasks", hazard_unit_info, indent_levels)
+    gen_stage_dump_tasks(f"{output_dir}/tasks", stage_metadata, indent_levels, dump_schema, gen_cache)
+    gen_pipeline_monitor(f"{output_dir}/monitors", stage_metadata, dump_schema, trigger_info, gen_cache)
+    gen_hazard_unit_dump_task(f"{output_dir}/tasks", hazard_unit_info, indent_levels, dump_schema, gen_cache)
+
+    save_gen_cache(CACHE_PATH, gen_cache)
 
 if __name__ == "__main__":
     main()
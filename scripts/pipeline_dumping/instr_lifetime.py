@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+
+import argparse
+import csv
+import html
+import os
+import re
+
+from post_process_dump import (DEFAULT_CYCLE_RANGE, decode_binary_dump, load_binary_dump, load_yaml,
+                               parse_dump_value, parse_range, select_cycle_records, setup_logger)
+from pipeline_trace import iter_raw_cycles
+
+PIPELINE_STAGES = ["de", "ex", "mem", "wb"]
+STAGE_LETTERS = {"de": "D", "ex": "E", "mem": "M", "wb": "W"}
+
+# Binary dumps are decoded this many records at a time
+BINARY_CHUNK_SIZE = 100000
+
+TIMELINE_FIELDS = ["id", "pc", "instr"] + [f"{stage}_{field}" for stage in PIPELINE_STAGES for field in ("cycle", "stalls")] + ["end_cycle", "fate"]
+
+###################################################
+#                  Dump Reading                   #
+###################################################
+def get_cycle_state(cycle_data):
+    """
+    Extracts what the lifetime reconstruction needs from a cycle of a dump
+
+    Returns:
+        slots: dict of stage -> (pc or None, instr) of its valid instruction, or None for a bubble
+        hazards: dict of hazard unit output -> value
+    """
+    slots = {}
+    for stage in PIPELINE_STAGES:
+        meta = cycle_data.get(stage, {}).get("meta", {})
+        if (parse_dump_value(meta.get("valid")) == 1):
+            slots[stage] = (parse_dump_value(meta.get("pc")), parse_dump_value(meta.get("instr")))
+        else:
+            slots[stage] = None
+
+    hazards = {}
+    for signals in cycle_data.get("hazard_unit", {}).values():
+        for signal_name, signal_val in signals.items():
+            hazards[signal_name] = parse_dump_value(signal_val) or 0
+
+    return slots, hazards
+
+def iter_text_states(dump_path, cycle_range):
+    for cycle, cycle_data in iter_raw_cycles(dump_path, cycle_range):
+        yield (cycle,) + get_cycle_state(cycle_data)
+
+def iter_binary_states(dump_path, schema_path, cycle_range):
+    """
+    Binary dump version of iter_text_states, decoding BINARY_CHUNK_SIZE records at a time
+    """
+    schema = load_yaml(schema_path)
+    records = load_binary_dump(dump_path, schema)
+    record_indices = select_cycle_records(records, *cycle_range)
+
+    for start in range(0, len(record_indices), BINARY_CHUNK_SIZE):
+        columns = decode_binary_dump(records[record_indices[start:start+BINARY_CHUNK_SIZE]], schema, PIPELINE_STAGES, ["meta"])
+        columns = {column_name: column.tolist() for column_name, column in columns.items()}
+        hazard_columns = {column_name.split(".")[-1]: column for column_name, column in columns.items()
+                          if column_name.startswith("hazard_unit.")}
+
+        for record_idx, cycle in enumerate(columns["cycle"]):
+            slots = {}
+            for stage in PIPELINE_STAGES:
+                if (columns[f"{stage}.meta.valid"][record_idx] == 1):
+                    pc_column = columns.get(f"{stage}.meta.pc")
+                    slots[stage] = (pc_column[record_idx] if pc_column else None, columns[f"{stage}.meta.instr"][record_idx])
+                else:
+                    slots[stage] = None
+
+            hazards = {signal_name: column[record_idx] for signal_name, column in hazard_columns.items()}
+            yield cycle, slots, hazards
+
+###################################################
+#              Lifetime Reconstruction            #
+###################################################
+def new_instr(instr_id, slot):
+    pc, instr = slot
+    return {"id": instr_id, "pc": pc, "instr": instr, "stages": {}, "end_cycle": None, "fate": None}
+
+def matches_slot(instr, slot):
+    """
+    Returns whether a tracked instruction is the one a stage holds (mem and wb only dump instr, not pc)
+    """
+    pc, instr_bits = slot
+    return instr["instr"] == instr_bits and (pc is None or instr["pc"] is None or instr["pc"] == pc)
+
+def advance_pipeline(in_flight, hazards):
+    """
+    Moves the tracked instructions through one clock edge, the way the pipeline registers do:
+    a flushed register is cleared, a stalled one holds, and any other takes the previous stage's instruction
+
+    Returns:
+        dict of stage -> instruction expected there after the edge (None for the register fetch fills, or a bubble)
+    """
+    expected = {}
+    for stage_idx, stage in enumerate(PIPELINE_STAGES):
+        if (hazards.get(f"flush_{stage}_o", 0)):
+            expected[stage] = None
+        elif (hazards.get(f"stall_{stage}_o", 0)):
+            expected[stage] = in_flight[stage]
+        elif (stage_idx == 0):
+            expected[stage] = None
+        else:
+            expected[stage] = in_flight[PIPELINE_STAGES[stage_idx - 1]]
+
+    return expected
+
+def iter_lifetimes(cycle_states):
+    """
+    Reconstructs the path of each dynamic instruction through de/ex/mem/wb from the per-stage meta
+    fields and hazard unit outputs of consecutive cycles. Only the instructions in flight are held.
+
+    Each cycle, the instructions are advanced with advance_pipeline and checked against the dumped stages.
+    A stage holding an instruction other than the expected one starts a new instruction (fetched into de,
+    or first seen mid pipeline at the start of the dump or after a gap in its cycles).
+
+    Yields:
+        Each instruction once it leaves the pipeline: dict with "id", "pc" (None if only seen in mem/wb),
+        "instr", "stages" (stage -> [first cycle, cycles spent]), "end_cycle" (last cycle in the pipeline)
+        and "fate": "retired", "flushed" (squashed by a flush), or "incomplete" (still in flight when the dump ends)
+    """
+    in_flight = {stage: None for stage in PIPELINE_STAGES}
+    prev_cycle = None
+    prev_hazards = {}
+    instr_cnt = 0
+
+    def finish(instr, end_cycle, fate):
+        instr["end_cycle"] = end_cycle
+        instr["fate"] = fate
+        return instr
+
+    for cycle, slots, hazards in cycle_states:
+        if (prev_cycle is not None and cycle == prev_cycle + 1):
+            expected = advance_pipeline(in_flight, prev_hazards)
+        else:
+            # start of the dump, or a gap in its cycles: nothing can be followed across it
+            for instr in in_flight.values():
+                if (instr is not None):
+                    yield finish(instr, prev_cycle, "incomplete")
+            expected = {stage: None for stage in PIPELINE_STAGES}
+            in_flight = {stage: None for stage in PIPELINE_STAGES}
+
+        # oldest first, so instructions first seen together are numbered in program order
+        placed = {}
+        for stage in reversed(PIPELINE_STAGES):
+            instr = expected[stage]
+            if (slots[stage] is None):
+                instr = None
+            elif (instr is None or not matches_slot(instr, slots[stage])):
+                instr = new_instr(instr_cnt, slots[stage])
+                instr_cnt += 1
+
+            if (instr is not None):
+                if (instr["pc"] is None):
+                    instr["pc"] = slots[stage][0]
+                stage_cycles = instr["stages"].setdefault(stage, [cycle, 0])
+                stage_cycles[1] += 1
+                placed[id(instr)] = instr
+            expected[stage] = instr
+
+        # instructions that didn't make it to a stage left the pipeline on the last edge
+        for stage, instr in in_flight.items():
+            if (instr is not None and id(instr) not in placed):
+                retired = (stage == "wb" and not prev_hazards.get("stall_wb_o", 0))
+                yield finish(instr, prev_cycle, "retired" if retired else "flushed")
+
+        in_flight = expected
+        prev_cycle = cycle
+        prev_hazards = hazards
+
+    for instr in in_flight.values():
+        if (instr is not None):
+            yield finish(instr, prev_cycle, "incomplete")
+
+###################################################
+#                     Outputs                     #
+###################################################
+def format_hex(value, digits=8):
+    return "" if value is None else f"0x{value:0{digits}x}"
+
+def timeline_row(instr):
+    row = {"id": instr["id"], "pc": format_hex(instr["pc"]), "instr": format_hex(instr["instr"]),
+           "end_cycle": instr["end_cycle"], "fate": instr["fate"]}
+    for stage in PIPELINE_STAGES:
+        first_cycle, stage_cycles = instr["stages"].get(stage, ("", 1))
+        row[f"{stage}_cycle"] = first_cycle
+        row[f"{stage}_stalls"] = stage_cycles - 1 if first_cycle != "" else ""
+
+    return row
+
+def update_pc_stats(pc_stats, instr):
+    """
+    Accumulates an instruction's stall cycles and fate into the statistics of its PC
+    """
+    if (instr["pc"] is None):
+        return
+
+    stats = pc_stats.setdefault(instr["pc"], {"executions": 0, "flushed": 0, "incomplete": 0, "stall_cycles": 0,
+                                              **{f"{stage}_stalls": 0 for stage in PIPELINE_STAGES}})
+    if (instr["fate"] == "retired"):
+        stats["executions"] += 1
+    else:
+        stats[instr["fate"]] += 1
+
+    for stage, (first_cycle, stage_cycles) in instr["stages"].items():
+        stats[f"{stage}_stalls"] += stage_cycles - 1
+        stats["stall_cycles"] += stage_cycles - 1
+
+def write_pc_stats(pc_stats_path, pc_stats):
+    """
+    Writes the per-PC statistics, PCs losing the most cycles to stalls first
+    """
+    with open(pc_stats_path, "w", newline="") as f:
+        fields = ["pc", "executions", "flushed", "incomplete", "stall_cycles"] + [f"{stage}_stalls" for stage in PIPELINE_STAGES]
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        for pc, stats in sorted(pc_stats.items(), key=lambda item: (-item[1]["stall_cycles"], item[0])):
+            writer.writerow({"pc": format_hex(pc), **stats})
+
+def get_diagram_cells(instr, window):
+    """
+    Returns:
+        dict of cycle -> cell of an instruction in the pipeline diagram: the stage letter on its first
+        cycle in a stage, lowercase while stalled there, and "x" on the cycle after it was flushed
+    """
+    low_cycle, high_cycle = window
+    cells = {}
+
+    for stage, (first_cycle, stage_cycles) in instr["stages"].items():
+        for cycle in range(max(first_cycle, low_cycle), min(first_cycle + stage_cycles - 1, high_cycle) + 1):
+            cells[cycle] = STAGE_LETTERS[stage] if cycle == first_cycle else STAGE_LETTERS[stage].lower()
+
+    if (instr["fate"] == "flushed" and low_cycle <= instr["end_cycle"] + 1 <= high_cycle):
+        cells[instr["end_cycle"] + 1] = "x"
+
+    return cells
+
+def in_window(instr, window):
+    first_cycle = min(first_cycle for first_cycle, _ in instr["stages"].values())
+    last_cycle = instr["end_cycle"] + 1 if instr["fate"] == "flushed" else instr["end_cycle"]
+    return first_cycle <= window[1] and last_cycle >= window[0]
+
+def write_text_diagram(diagram_path, diagram_instrs, window):
+    low_cycle, high_cycle = window
+    cycles = range(low_cycle, high_cycle + 1)
+    label_width = 24
+
+    with open(diagram_path, "w") as f:
+        # cycle numbers are written vertically above their column
+        digits = len(str(high_cycle))
+        for digit_idx in range(digits):
+            f.write(" " * label_width + "".join(str(cycle).rjust(digits)[digit_idx] for cycle in cycles) + "\n")
+
+        for instr in diagram_instrs:
+            cells = get_diagram_cells(instr, window)
+            label = f"{format_hex(instr['pc']) or '?':<10} {format_hex(instr['instr'])}"
+            f.write(f"{label:<{label_width}}" + "".join(cells.get(cycle, ".") for cycle in cycles) + "\n")
+
+def write_html_diagram(diagram_path, diagram_instrs, window):
+    low_cycle, high_cycle = window
+    cycles = range(low_cycle, high_cycle + 1)
+    cell_classes = {"D": "de", "E": "ex", "M": "mem", "W": "wb", "x": "flush"}
+
+    with open(diagram_path, "w") as f:
+        f.write("<!DOCTYPE html>\n<html>\n<head>\n<meta charset=\"utf-8\">\n<title>Pipeline diagram</title>\n<style>\n"
+                "table { border-collapse: collapse; font-family: monospace; font-size: 12px; }\n"
+                "th, td { border: 1px solid #ddd; padding: 1px 3px; text-align: center; }\n"
+                "td.label { text-align: left; white-space: nowrap; }\n"
+                "td.de { background: #cfe2ff; } td.ex { background: #d1e7dd; }\n"
+                "td.mem { background: #fff3cd; } td.wb { background: #e2d9f3; }\n"
+                "td.stall { opacity: 0.5; } td.flush { background: #f8d7da; }\n"
+                "</style>\n</head>\n<body>\n<table>\n")
+        f.write("<tr><th>pc</th><th>instr</th>" + "".join(f"<th>{cycle}</th>" for cycle in cycles) + "</tr>\n")
+
+        for instr in diagram_instrs:
+            cells = get_diagram_cells(instr, window)
+            f.write(f"<tr><td class=\"label\">{html.escape(format_hex(instr['pc']))}</td>"
+                    f"<td class=\"label\">{html.escape(format_hex(instr['instr']))}</td>")
+            for cycle in cycles:
+                cell = cells.get(cycle, "")
+                classes = cell_classes.get(cell.upper() if cell != "x" else cell, "")
+                if (cell and cell != "x" and cell.islower()):
+                    classes += " stall"
+                f.write(f"<td class=\"{classes.strip()}\">{cell}</td>" if classes else "<td></td>")
+            f.write("</tr>\n")
+
+        f.write("</table>\n</body>\n</html>\n")
+
+###################################################
+#                   Main Functions                #
+###################################################
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Reconstruct instruction lifetimes from a pipeline dump"
+    )
+
+    parser.add_argument(
+        "dump_path",
+        type=str,
+        help="Path to a raw (full, delta or trigger) or binary (.bin) pipeline dump"
+    )
+
+    parser.add_argument(
+        "-c", "--cycle_range",
+        type=parse_range,
+        default=DEFAULT_CYCLE_RANGE,
+        help="Cycle range (low,high) to reconstruct, inclusive"
+    )
+
+    parser.add_argument(
+        "-w", "--window",
+        type=parse_range,
+        default=argparse.SUPPRESS,
+        help="Cycle range (low,high) to draw a pipeline diagram of"
+    )
+
+    parser.add_argument(
+        "--diagram_format",
+        choices=["text", "html"],
+        default="text",
+        help="Format of the pipeline diagram (default: text)"
+    )
+
+    parser.add_argument(
+        "--schema",
+        type=str,
+        default=argparse.SUPPRESS,
+        help="Schema of a binary dump (defaults to: <dump>.schema.yml)"
+    )
+
+    parser.add_argument(
+        "-o", "--output_dir",
+        type=str,
+        default=argparse.SUPPRESS,
+        help="Directory to write outputs (default: directory of the dump)"
+    )
+
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    logger = setup_logger("lifetime_logger")
+
+    if (not hasattr(args, "output_dir")):
+        output_dir = os.path.dirname(os.path.abspath(args.dump_path))
+    else:
+        output_dir = args.output_dir
+
+    if (args.dump_path.endswith(".bin")):
+        if (not hasattr(args, "schema")):
+            schema_path = re.sub(r"\.bin$", ".schema.yml", args.dump_path)
+        else:
+            schema_path = args.schema
+        cycle_states = iter_binary_states(args.dump_path, schema_path, args.cycle_range)
+    else:
+        cycle_states = iter_text_states(args.dump_path, args.cycle_range)
+
+    fate_cnts = {"retired": 0, "flushed": 0, "incomplete": 0}
+    pc_stats = {}
+    diagram_instrs = []
+
+    # Instructions are written as soon as they leave the pipeline, so memory use doesn't grow with the dump
+    with open(f"{output_dir}/instr_timeline.csv", "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=TIMELINE_FIELDS)
+        writer.writeheader()
+
+        for instr in iter_lifetimes(cycle_states):
+            writer.writerow(timeline_row(instr))
+            update_pc_stats(pc_stats, instr)
+            fate_cnts[instr["fate"]] += 1
+            if (hasattr(args, "window") and in_window(instr, args.window)):
+                diagram_instrs.append(instr)
+
+    write_pc_stats(f"{output_dir}/pc_stalls.csv", pc_stats)
+    logger.info(f"instructions: {sum(fate_cnts.values())} ({', '.join(f'{fate}: {cnt}' for fate, cnt in fate_cnts.items())})")
+    logger.info(f"timeline: {output_dir}/instr_timeline.csv")
+    logger.info(f"per-PC stalls: {output_dir}/pc_stalls.csv")
+
+    if (hasattr(args, "window")):
+        # instructions are yielded in the order they leave the pipeline, the diagram lists them in fetch order
+        diagram_instrs.sort(key=lambda instr: instr["id"])
+        if (args.diagram_format == "html"):
+            diagram_path = f"{output_dir}/pipeline_diagram.html"
+            write_html_diagram(diagram_path, diagram_instrs, args.window)
+        else:
+            diagram_path = f"{output_dir}/pipeline_diagram.txt"
+            write_text_diagram(diagram_path, diagram_instrs, args.window)
+        logger.info(f"pipeline diagram: {diagram_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import re
+import yaml
+import numpy as np
+
+from post_process_dump import (DEFAULT_CYCLE_RANGE, INDEX_STRIDE, apply_cycle_delta, decode_binary_dump,
+                               find_cycle_offset, get_dump_mode, iter_cycle_blocks, load_binary_dump,
+                               load_cycle_index, load_yaml, parse_cycle_block, parse_dump_value, parse_macros,
+                               parse_range, select_cycle_records, setup_logger)
+
+# Value of a signal that was x/z, or couldn't be mapped back from a macro name
+UNKNOWN = -1
+
+PIPELINE_STAGES = ["de", "ex", "mem", "wb"]
+
+###################################################
+#                  Trace Loading                  #
+###################################################
+def get_macro_values(macro_map):
+    """
+    Inverts a macro map from parse_macros
+
+    Returns:
+        dict of signal -> macro name -> integer value
+    """
+    return {signal: {name: value for value, name in mapping["values"].items()}
+            for signal, mapping in macro_map.items()}
+
+def get_macro_signal(column_name):
+    """
+    Returns the macro map key of a column (forwarding outputs share the "forward" macros)
+    """
+    section_name, category, field_name = column_name.split(".")
+    if (section_name == "hazard_unit" and category == "forward"):
+        return "forward"
+
+    return field_name
+
+def build_columns(cycle_iter, macro_values=None):
+    """
+    Converts cycles in the nested structure of a dump into one array per signal
+
+    Args:
+        cycle_iter: Iterable of (cycle, stage -> category -> signal -> value string)
+        macro_values: Optional output of get_macro_values, to map macro names (processed dumps) back to values
+
+    Returns:
+        dict of "cycle" or "<stage>.<category>.<signal>" -> int64 array
+    """
+    cycles = []
+    values = {}
+    macro_values = macro_values or {}
+
+    for cycle_cnt, (cycle, cycle_data) in enumerate(cycle_iter):
+        cycles.append(cycle)
+        for stage, categories in cycle_data.items():
+            for category, signals in (categories or {}).items():
+                for signal_name, signal_val in (signals or {}).items():
+                    column_name = f"{stage}.{category}.{signal_name}"
+                    # a signal missing from earlier cycles is unknown there
+                    column = values.setdefault(column_name, [UNKNOWN] * cycle_cnt)
+                    column.extend([UNKNOWN] * (cycle_cnt - len(column)))
+
+                    value = parse_dump_value(signal_val)
+                    if (value is None):
+                        value = macro_values.get(get_macro_signal(column_name), {}).get(signal_val, UNKNOWN)
+                    column.append(value)
+
+    columns = {"cycle": np.array(cycles, dtype=np.int64)}
+    for column_name, column in values.items():
+        column.extend([UNKNOWN] * (len(cycles) - len(column)))
+        columns[column_name] = np.array(column, dtype=np.int64)
+
+    return columns
+
+def iter_raw_cycles(dump_path, cycle_range):
+    """
+    Reads the cycles of cycle_range from a raw text dump (full, delta or trigger), seeking to the
+    range with the dump's cycle index. Delta dumps are reconstructed into the full state of every cycle.
+
+    Yields:
+        cycle: Cycle number
+        cycle_data: dict of stage -> category -> signal -> value string
+    """
+    low_cycle, high_cycle = cycle_range
+    delta = (get_dump_mode(dump_path) == "delta")
+    state = {}
+
+    start_offset = 0
+    if (low_cycle > INDEX_STRIDE):
+        start_offset = find_cycle_offset(load_cycle_index(dump_path, setup_logger("post_process_logger")), low_cycle)
+
+    for cycle, block_lines in iter_cycle_blocks(dump_path, start_offset):
+        if (cycle > high_cycle):
+            return
+
+        if (delta):
+            cycle_data = apply_cycle_delta(state, parse_cycle_block(block_lines))
+        elif (cycle >= low_cycle):
+            cycle_data = parse_cycle_block(block_lines)
+
+        if (cycle >= low_cycle):
+            yield cycle, cycle_data
+
+def load_trace(dump_path, cycle_range=DEFAULT_CYCLE_RANGE, schema_path=None, macro_file=None):
+    """
+    Loads any pipeline dump into a PipelineTrace:
+        .bin: binary dump (PIPELINE_DUMP_BIN), with its schema
+        .npz: columns written by post_process_dump.py -f npz
+        processed_*.yml: processed YAML written by post_process_dump.py (macro names are mapped back to values)
+        other: raw text dump (full, delta or trigger)
+
+    Args:
+        dump_path: Path to the dump
+        cycle_range: (low, high) cycles to load, inclusive
+        schema_path: Schema of a binary dump (defaults to <dump>.schema.yml)
+        macro_file: Macro definitions, used to map macro names in processed dumps and queries
+                    (defaults to common/includes/control_macros.sv)
+    """
+    if (macro_file is None):
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        macro_file = os.path.abspath(f"{script_dir}/../../common/includes/control_macros.sv")
+    macro_map = parse_macros(macro_file) if os.path.isfile(macro_file) else {}
+    low_cycle, high_cycle = cycle_range
+
+    if (dump_path.endswith(".bin")):
+        if (schema_path is None):
+            schema_path = re.sub(r"\.bin$", ".schema.yml", dump_path)
+        schema = load_yaml(schema_path)
+        records = load_binary_dump(dump_path, schema)
+        records = records[select_cycle_records(records, low_cycle, high_cycle)]
+        columns = decode_binary_dump(records, schema, list(schema["sections"].keys()), ["meta", "control", "data"])
+        columns = {column_name: column.astype(np.int64) for column_name, column in columns.items()}
+    elif (dump_path.endswith(".npz")):
+        with np.load(dump_path) as npz_data:
+            columns = {column_name: npz_data[column_name].astype(np.int64) for column_name in npz_data.files}
+    elif (os.path.basename(dump_path).startswith("processed_")):
+        with open(dump_path, "r") as f:
+            dump_data = yaml.load(f, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader)) or {}
+        columns = build_columns(((cycle, cycle_data) for cycle, cycle_data in dump_data.items()),
+                                get_macro_values(macro_map))
+    else:
+        columns = build_columns(iter_raw_cycles(dump_path, cycle_range))
+
+    return PipelineTrace(columns, macro_map).select(cycle_range)
+
+###################################################
+#                  Pipeline Trace                 #
+###################################################
+class PipelineTrace:
+    """
+    Pipeline dump held as one NumPy array per signal, all aligned on the cycle array.
+    Columns are named "<stage>.<category>.<signal>" (e.g. "ex.meta.pc", "hazard_unit.flush.flush_ex_o"),
+    and can be referred to by any unique suffix (e.g. "flush_ex_o", "ex.pc").
+    Signals that were x/z hold UNKNOWN.
+
+    Cycles are increasing but need not be contiguous (e.g. trigger dumps): run lengths
+    are broken at gaps, and cycle ranges select whichever cycles are present.
+    """
+
+    def __init__(self, columns, macro_map=None):
+        self.cycles = columns["cycle"]
+        self.columns = {column_name: column for column_name, column in columns.items() if column_name != "cycle"}
+        self.macro_map = macro_map or {}
+        self.macro_values = get_macro_values(self.macro_map)
+
+    def __len__(self):
+        return len(self.cycles)
+
+    def __getitem__(self, name):
+        return self.columns[self.resolve(name)]
+
+    def resolve(self, name):
+        """
+        Returns the full column name of a signal given by its full name or a unique suffix
+        """
+        if (name in self.columns):
+            return name
+
+        # "<signal>", or "<stage or category>.<signal>"
+        parts = name.split(".")
+        matches = [column_name for column_name in self.columns
+                   if column_name.split(".")[-1] == parts[-1] and (len(parts) == 1 or parts[0] in column_name.split(".")[:2])]
+        if (len(matches) != 1):
+            raise KeyError(f"{name} matches {len(matches)} signals: {matches}")
+
+        return matches[0]
+
+    def macro(self, name, macro_name):
+        """
+        Returns the value of a macro (e.g. "ALU_SLT") for a signal, for comparisons against its column
+        """
+        return self.macro_values[get_macro_signal(self.resolve(name))][macro_name]
+
+    def mask(self, cycle_range=None):
+        """
+        Returns a boolean array selecting the cycles of cycle_range (all cycles if None)
+        """
+        if (cycle_range is None):
+            return np.ones(len(self.cycles), dtype=bool)
+
+        low_cycle, high_cycle = cycle_range
+        return (self.cycles >= low_cycle) & (self.cycles <= high_cycle)
+
+    def select(self, cycle_range):
+        """
+        Returns a new trace holding only the cycles of cycle_range
+        """
+        selected = self.mask(cycle_range)
+        columns = {column_name: column[selected] for column_name, column in self.columns.items()}
+        columns["cycle"] = self.cycles[selected]
+
+        return PipelineTrace(columns, self.macro_map)
+
+    def evaluate(self, predicate):
+        """
+        Evaluates a predicate into a boolean array over all cycles. The predicate is either a signal
+        name (true where the signal is non-zero), a boolean array, or a function of the trace, e.g.
+        lambda t: (t["ex.meta.valid"] == 1) & (t["alu_control"] == t.macro("alu_control", "ALU_SLT"))
+        """
+        if (isinstance(predicate, str)):
+            column = self[predicate]
+            return (column != 0) & (column != UNKNOWN)
+        elif (callable(predicate)):
+            predicate = predicate(self)
+
+        return np.asarray(predicate, dtype=bool)
+
+    ###################################################
+    #                     Queries                     #
+    ###################################################
+    def signal(self, name, cycle_range=None):
+        """
+        Returns:
+            cycles: Cycles of cycle_range present in the trace
+            values: The signal's value in each of them
+        """
+        selected = self.mask(cycle_range)
+
+        return self.cycles[selected], self[name][selected]
+
+    def where(self, predicate, cycle_range=None):
+        """
+        Returns the cycles of cycle_range where predicate (see evaluate) holds
+        """
+        return self.cycles[self.evaluate(predicate) & self.mask(cycle_range)]
+
+    def occupancy(self, stages=None, cycle_range=None):
+        """
+        Returns:
+            dict of stage -> fraction of cycles in which it holds a valid instruction
+        """
+        selected = self.mask(cycle_range)
+        cycle_cnt = max(int(np.count_nonzero(selected)), 1)
+
+        occupancy = {}
+        for stage in (stages or PIPELINE_STAGES):
+            if (f"{stage}.meta.valid" in self.columns):
+                occupancy[stage] = int(np.count_nonzero(self.columns[f"{stage}.meta.valid"][selected] == 1)) / cycle_cnt
+
+        return occupancy
+
+    def run_lengths(self, predicate, cycle_range=None):
+        """
+        Finds the runs of consecutive cycles where predicate (see evaluate) holds,
+        e.g. run_lengths("stall_de_o") for the length of every decode stall
+
+        Returns:
+            starts: First cycle of each run
+            lengths: Length of each run in cycles
+        """
+        selected = self.mask(cycle_range)
+        active = self.evaluate(predicate)[selected]
+        cycles = self.cycles[selected]
+
+        # a run starts where the predicate becomes true, or continues across a gap in the cycles
+        starts = active.copy()
+        starts[1:] &= ~active[:-1] | (np.diff(cycles) != 1)
+        start_idx = np.flatnonzero(starts)
+
+        run_ids = np.cumsum(starts)[active] - 1
+        lengths = np.bincount(run_ids, minlength=len(start_idx))
+
+        return cycles[start_idx], lengths
+
+    def count_by(self, name, predicate=None, cycle_range=None):
+        """
+        Counts the cycles (where predicate holds) by the value of a signal,
+        e.g. count_by("ex.meta.pc", "flush_ex_o") for the PCs in execute when it's flushed
+
+        Returns:
+            dict of value -> cycle count, most frequent first
+        """
+        selected = self.mask(cycle_range)
+        if (predicate is not None):
+            selected &= self.evaluate(predicate)
+
+        values, counts = np.unique(self[name][selected], return_counts=True)
+        order = np.argsort(-counts, kind="stable")
+
+        return dict(zip(values[order].tolist(), counts[order].tolist()))
+
+    def join(self, fields, on, cycle_range=None):
+        """
+        Joins stage fields with the hazard unit: the fields' values in every cycle
+        where a hazard signal (or any predicate, see evaluate) holds
+
+        Args:
+            fields: Signal names, e.g. ["de.meta.pc", "ex.data.rd"]
+            on: Hazard signal, e.g. "stall_de_o" or "forward_a_ex_o", or predicate
+
+        Returns:
+            dict of "cycle", the joined signal (if on is a name) and each field -> array
+        """
+        selected = self.evaluate(on) & self.mask(cycle_range)
+
+        joined = {"cycle": self.cycles[selected]}
+        if (isinstance(on, str)):
+            joined[self.resolve(on)] = self[on][selected]
+        for field in fields:
+            joined[self.resolve(field)] = self[field][selected]
+
+        return joined
+
+###################################################
+#                   Main Functions                #
+###################################################
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Summarize a pipeline dump: stage occupancy, and stall and flush run lengths"
+    )
+
+    parser.add_argument(
+        "dump_path",
+        type=str,
+        help="Path to a raw, processed, binary (.bin) or npz pipeline dump"
+    )
+
+    parser.add_argument(
+        "-c", "--cycle_range",
+        type=parse_range,
+        default=DEFAULT_CYCLE_RANGE,
+        help="Cycle range (low,high), inclusive"
+    )
+
+    parser.add_argument(
+        "--schema",
+        type=str,
+        default=None,
+        help="Schema of a binary dump (defaults to: <dump>.schema.yml)"
+    )
+
+    parser.add_argument(
+        "--macro_file",
+        type=str,
+        default=None,
+        help="Path to file containing control macros (default: ../../common/includes/control_macros.sv)"
+    )
+
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    logger = setup_logger("post_process_logger")
+
+    trace = load_trace(args.dump_path, args.cycle_range, args.schema, args.macro_file)
+    logger.info(f"cycles: {len(trace)}")
+
+    for stage, stage_occupancy in trace.occupancy().items():
+        logger.info(f"{stage} occupancy: {stage_occupancy:.1%}")
+
+    for column_name in trace.columns:
+        if (not re.match(r"hazard_unit\.(stall|flush)\.", column_name)):
+            continue
+        starts, lengths = trace.run_lengths(column_name)
+        if (len(lengths)):
+            logger.info(f"{column_name.split('.')[-1]}: {int(lengths.sum())} cycles in {len(lengths)} runs (longest {int(lengths.max())})")
+
+if __name__ == "__main__":
+    main()
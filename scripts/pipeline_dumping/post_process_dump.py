@@ -3,9 +3,21 @@
 import argparse
 import logging
 import itertools
+import bisect
+import json
+import mmap
 import yaml
 import os
 import re
+import io
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+DEFAULT_CYCLE_RANGE = (1, 999999999)
 
 ###################################################
 #                General Functions                #
@@ -45,7 +57,7 @@ def parse_args():
     parser.add_argument(
         "-c", "--cycle_range",
         type=parse_range,
-        default=tuple([1, 999999999]),
+        default=DEFAULT_CYCLE_RANGE,
         help="range of cycles to include in processed results (defaults to 1,-999999999). Input in format low_cycle,high_cycle."
     )
 
@@ -56,6 +68,33 @@ def parse_args():
         help="what signal categories to include in processed results (defaults to all signal categories)"
     )
 
+    parser.add_argument(
+        "--schema",
+        type=str,
+        default=argparse.SUPPRESS,
+        help="schema of a binary dump (defaults to raw_pipeline_dump.schema.yml next to the dump)"
+    )
+
+    parser.add_argument(
+        "-f", "--output_format",
+        choices=["yaml", "npz"],
+        default="yaml",
+        help="processed output format: YAML with macro names, or NumPy columns (.npz) of raw values, binary dumps only (default: yaml)"
+    )
+
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=1,
+        help="number of worker processes decoding chunks of the dump in parallel (default: 1)"
+    )
+
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Parse and write the dump one cycle at a time, using constant memory (for long simulations)"
+    )
+
     parser.add_argument(
         "-o", "--output_dir",
         type=str,
@@ -108,8 +147,30 @@ def load_yaml(yaml_path):
 ###################################################
 #                  Sub-Functions                  #
 ###################################################
+def parse_dump_value(signal_val):
+    """
+    Returns the integer value of a dumped "0b..." or "0x..." string, or None if it
+    has no integer value (x/z bits, or not a dumped value)
+    """
+    try:
+        if (signal_val.startswith("0b")):
+            return int(signal_val[2:], 2)
+        elif (signal_val.startswith("0x")):
+            return int(signal_val[2:], 16)
+    except (AttributeError, ValueError):
+        pass
+
+    return None
+
 def parse_macros(macro_file_path):
+    """
+    Builds a lookup table from dumped values to macro names for each signal in the macro file
 
+    Returns:
+        dict of signal -> {"strings": {dump string: name}, "values": {integer value: name}}.
+        "strings" holds each value in the forms the dump tasks write it ("0b%b" and
+        "0x%h" zero padded to the macro's width), "values" is the fallback for other widths.
+    """
     macro_map = {}
 
     with open(macro_file_path, "r") as f:
@@ -118,26 +179,459 @@ def parse_macros(macro_file_path):
             signal_re = re.search(r'//\s+(\w+)\s+//', line)
             if (signal_re):
                 active_signal = signal_re.group(1)
-                macro_map[active_signal] = {}
+                macro_map[active_signal] = {"strings": {}, "values": {}}
 
-            macro_re = re.search(rf"`define (\w+)\s+[0-9]+'(\w+)$", line)
+            macro_re = re.search(rf"`define (\w+)\s+([0-9]+)'([bhd])(\w+)$", line)
             if (macro_re):
                     macro_name = macro_re.group(1)
+                    width = int(macro_re.group(2))
+                    base = {"b": 2, "h": 16, "d": 10}[macro_re.group(3)]
+                    try:
+                        value = int(macro_re.group(4), base)
+                    except ValueError:
+                        continue
+
                     # match with dumping format
-                    macro_value = macro_re.group(2).replace("b", "0b").replace("h", "0x")
-                    macro_map[active_signal][macro_value] = macro_name
+                    macro_map[active_signal]["values"][value] = macro_name
+                    macro_map[active_signal]["strings"][f"0b{value:0{width}b}"] = macro_name
+                    macro_map[active_signal]["strings"][f"0x{value:0{(width + 3) // 4}x}"] = macro_name
 
     return macro_map
 
 def insert_macro(signal_val, signal_macro_mapping):
 
-    # if macro mapping is found, return macro name
-    for macro_val, macro_name in signal_macro_mapping.items():
-        if (signal_val == macro_val):
-            return macro_name
+    if (not signal_macro_mapping):
+        return signal_val
+
+    # exact match with the dumped string
+    macro_name = signal_macro_mapping["strings"].get(signal_val)
+    if (macro_name is not None):
+        return macro_name
+
+    # otherwise match by value (e.g. a different width), and memoize the result
+    value = parse_dump_value(signal_val)
+    macro_name = signal_macro_mapping["values"].get(value, signal_val)
+    signal_macro_mapping["strings"][signal_val] = macro_name
 
     # if no mapping found, return original value
-    return signal_val
+    return macro_name
+
+def decode_macro_column(column, field, signal_macro_mapping):
+    """
+    Vectorized insert_macro over a column of a binary dump. Each distinct value is
+    formatted and mapped once, then broadcast back to the whole column.
+
+    Returns:
+        Object array of macro names, or formatted values where there is no macro
+    """
+    unique_values, inverse = np.unique(column, return_inverse=True)
+    unique_strings = [insert_macro(format_dump_value(value, field), signal_macro_mapping) for value in unique_values.tolist()]
+
+    return np.array(unique_strings, dtype=object)[inverse]
+
+def parse_cycle(cycle, cycle_data, macro_map, pipeline_stages, signal_categories, logger):
+    """
+    Filters the raw data of a single cycle and maps signal values to macro names
+    """
+    parsed_cycle = {}
+    for stage, signal_category in itertools.product(pipeline_stages, signal_categories):
+        try:
+            parsed_cycle.setdefault(stage, {}).setdefault(signal_category, {})
+
+            for signal_name, signal_val in cycle_data[stage][signal_category].items():
+                signal_macro_mapping = macro_map.get(signal_name, {})
+
+                parsed_cycle[stage][signal_category][signal_name] = insert_macro(signal_val, signal_macro_mapping)
+        except:
+            logger.warning(f"could not parse data for cycle: {cycle}, stage {stage}, category: {signal_category}")
+
+    # special handelling for hazarf unit data (not same format)
+    try:
+        for hazard_category in cycle_data["hazard_unit"].keys():
+            for signal_name, signal_val in cycle_data["hazard_unit"][hazard_category].items():
+                parsed_cycle.setdefault("hazard_unit", {}).setdefault(hazard_category, {})
+
+                if (hazard_category == "forward"):
+                    signal_macro_mapping = macro_map.get("forward", {})
+                else:
+                    signal_macro_mapping = macro_map.get(signal_name, {})
+
+                parsed_cycle["hazard_unit"][hazard_category][signal_name] = insert_macro(signal_val, signal_macro_mapping)
+    except:
+        logger.warning(f"could not parse hazard data for cycle: {cycle}")
+
+    return parsed_cycle
+
+BLOCK_HEADER_PATTERN = re.compile(r"^(\d+):\s*(#.*)?$")
+
+def split_cycle_blocks(lines):
+    """
+    Groups the lines of a raw dump into cycle blocks, using the "N:" header
+    pipeline_monitor writes at the start of every cycle. Comment lines (such as
+    the trigger notes of PIPELINE_DUMP_TRIGGER dumps) are skipped.
+
+    Yields:
+        cycle: Cycle number
+        block_lines: Lines of the cycle's block, excluding the header
+    """
+    cycle = None
+    block_lines = []
+
+    for line in lines:
+        # only header lines start with a digit, so the pattern is only matched against those
+        header_match = line[:1].isdigit() and BLOCK_HEADER_PATTERN.match(line)
+        if (header_match):
+            if (cycle is not None):
+                yield cycle, block_lines
+            cycle = int(header_match.group(1))
+            block_lines = []
+        elif (line.strip() and not line.startswith("#")):
+            block_lines.append(line)
+
+    if (cycle is not None):
+        yield cycle, block_lines
+
+def iter_cycle_blocks(dump_path, start_offset=0, end_offset=None):
+    """
+    Reads a raw dump one cycle at a time
+
+    Args:
+        dump_path: Path to the raw dump
+        start_offset: Byte offset of the cycle header to start reading from (see build_cycle_index)
+        end_offset: Byte offset of the cycle header to stop before (None reads to the end of the dump)
+
+    Yields:
+        cycle: Cycle number
+        block_lines: Lines of the cycle's block, excluding the header
+    """
+    with open(dump_path, "rb") as raw_file:
+        raw_file.seek(start_offset)
+
+        if (end_offset is None):
+            yield from split_cycle_blocks(io.TextIOWrapper(raw_file))
+        else:
+            chunk = raw_file.read(end_offset - start_offset).decode()
+            yield from split_cycle_blocks(chunk.splitlines(keepends=True))
+
+###################################################
+#                   Cycle Index                   #
+###################################################
+# Every INDEX_STRIDE-th cycle header is indexed, so a query reads at most
+# INDEX_STRIDE cycles before its range. In delta dumps every keyframe is indexed.
+INDEX_STRIDE = 1000
+CYCLE_HEADER_PATTERN = re.compile(rb"^(\d+):\r?$", re.MULTILINE)
+KEYFRAME_HEADER_PATTERN = re.compile(rb"^(\d+): # keyframe\r?$", re.MULTILINE)
+DUMP_MODE_PATTERN = re.compile(r"^# pipeline_dump: (\w+)")
+
+def get_index_path(dump_path):
+    return f"{dump_path}.idx"
+
+def get_dump_mode(dump_path):
+    """
+    Returns the mode a raw dump was written in, from its "# pipeline_dump: <mode>" first line:
+    "delta" (PIPELINE_DUMP_DELTA), "trigger" (PIPELINE_DUMP_TRIGGER), or "full" if there is none
+    """
+    with open(dump_path, "r") as f:
+        mode_match = DUMP_MODE_PATTERN.match(f.readline())
+
+    if (mode_match):
+        return mode_match.group(1)
+    return "full"
+
+def is_delta_dump(dump_path):
+    """
+    Returns whether a raw dump was written with PIPELINE_DUMP_DELTA (only changed fields each cycle)
+    """
+    return get_dump_mode(dump_path) == "delta"
+
+def build_cycle_index(dump_path, stride=INDEX_STRIDE):
+    """
+    Scans a raw dump once for its cycle headers, recording the byte offset of every stride-th one.
+    Delta dumps can only be read starting from a keyframe, so all of their keyframes are recorded instead.
+
+    Returns:
+        dict with the dump's size and mtime (to detect a stale index), the stride,
+        and the indexed cycles with their header offsets (both in increasing order)
+    """
+    dump_stat = os.stat(dump_path)
+    cycle_index = {"dump_size": dump_stat.st_size,
+                   "dump_mtime_ns": dump_stat.st_mtime_ns,
+                   "delta": False,
+                   "stride": stride,
+                   "cycles": [],
+                   "offsets": []}
+
+    if (dump_stat.st_size == 0):
+        return cycle_index
+
+    header_pattern = CYCLE_HEADER_PATTERN
+    if (is_delta_dump(dump_path)):
+        header_pattern = KEYFRAME_HEADER_PATTERN
+        cycle_index["delta"] = True
+        cycle_index["stride"] = stride = 1
+
+    with open(dump_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as dump_map:
+        for header_cnt, header_match in enumerate(header_pattern.finditer(dump_map)):
+            if (header_cnt % stride == 0):
+                cycle_index["cycles"].append(int(header_match.group(1)))
+                cycle_index["offsets"].append(header_match.start())
+
+    return cycle_index
+
+def load_cycle_index(dump_path, logger):
+    """
+    Loads the dump's sidecar index (<dump>.idx), building and saving it if it is missing or stale
+    """
+    index_path = get_index_path(dump_path)
+    dump_stat = os.stat(dump_path)
+
+    try:
+        with open(index_path, "r") as f:
+            cycle_index = json.load(f)
+        if (cycle_index["dump_size"] == dump_stat.st_size and cycle_index["dump_mtime_ns"] == dump_stat.st_mtime_ns):
+            return cycle_index
+    except (OSError, ValueError, KeyError):
+        pass
+
+    logger.info(f"building cycle index: {index_path}")
+    cycle_index = build_cycle_index(dump_path)
+
+    try:
+        with open(index_path, "w") as f:
+            json.dump(cycle_index, f)
+    except OSError:
+        logger.warning(f"could not write cycle index {index_path}")
+
+    return cycle_index
+
+def find_cycle_offset(cycle_index, cycle):
+    """
+    Returns the byte offset of the last indexed cycle header at or before cycle (0 if there is none)
+    """
+    position = bisect.bisect_right(cycle_index["cycles"], cycle) - 1
+    if (position < 0):
+        return 0
+
+    return cycle_index["offsets"][position]
+
+def parse_cycle_block(block_lines):
+    """
+    Parses the lines of one cycle block, which use the fixed layout written by the
+    dump tasks (stage at 2 spaces, category at 4, "signal: value" at 6)
+
+    Returns:
+        dict of stage -> category -> signal -> value, as yaml.safe_load would return
+    """
+    cycle_data = {}
+    stage_data = {}
+    category_data = {}
+
+    for line in block_lines:
+        indent = len(line) - len(line.lstrip(" "))
+        key, _, value = line.strip().partition(":")
+
+        if (indent <= 2):
+            stage_data = cycle_data.setdefault(key, {})
+        elif (indent <= 4):
+            category_data = stage_data.setdefault(key, {})
+        else:
+            category_data[key] = value.strip().strip('"')
+
+    return cycle_data
+
+###################################################
+#                  Binary Dumps                   #
+###################################################
+def load_binary_dump(dump_path, schema):
+    """
+    Memory maps a binary dump (PIPELINE_DUMP_BIN) as an array of fixed size records
+
+    Returns:
+        NumPy structured array with a "cycle" field, and one field per section
+        (stage or hazard_unit) holding its little endian 32 bit words
+    """
+    if (np is None):
+        raise ImportError("numpy is required to read binary pipeline dumps")
+
+    dtype_fields = [("cycle", "<u4")]
+    for section_name, section in schema["sections"].items():
+        dtype_fields.append((section_name, "<u4", (section["bytes"] // 4,)))
+    record_dtype = np.dtype(dtype_fields)
+
+    if (record_dtype.itemsize != schema["record_bytes"]):
+        raise ValueError(f"schema record size {schema['record_bytes']} does not match its sections ({record_dtype.itemsize})")
+
+    # A dump cut short by the end of simulation may end with a partial record
+    record_cnt = os.path.getsize(dump_path) // record_dtype.itemsize
+    if (record_cnt == 0):
+        return np.zeros(0, dtype=record_dtype)
+
+    return np.memmap(dump_path, dtype=record_dtype, mode="r", shape=(record_cnt,))
+
+def select_cycle_records(records, low_cycle, high_cycle):
+    """
+    Selects the records of a cycle range. Records are written every cycle, so the range
+    is located from the first record's cycle and only the records in it are read.
+    Falls back to scanning the cycle column if the dump isn't contiguous.
+
+    Returns:
+        Array of the indices of the selected records
+    """
+    if (len(records) == 0):
+        return np.arange(0)
+
+    first_cycle = int(records[0]["cycle"])
+    start = min(max(low_cycle - first_cycle, 0), len(records))
+    end = min(max(high_cycle - first_cycle + 1, 0), len(records))
+
+    contiguous = int(records[-1]["cycle"]) - first_cycle == len(records) - 1
+    if (contiguous and (start == end or int(records[start]["cycle"]) == first_cycle + start)):
+        return np.arange(start, end)
+
+    cycles = np.asarray(records["cycle"])
+    return np.nonzero((cycles >= low_cycle) & (cycles <= high_cycle))[0]
+
+def decode_field(words, offset, width):
+    """
+    Extracts a field from the words of a packed value (least significant word first)
+
+    Args:
+        words: (records, words) uint32 array
+        offset: Bit offset of the field from the LSB
+        width: Bit width of the field (at most 32)
+
+    Returns:
+        uint32 array with the field's value for each record
+    """
+    word_idx, shift = divmod(offset, 32)
+
+    value = words[:, word_idx].astype(np.uint64) >> np.uint64(shift)
+    if (shift + width > 32):
+        value |= words[:, word_idx + 1].astype(np.uint64) << np.uint64(32 - shift)
+
+    return (value & np.uint64((1 << width) - 1)).astype(np.uint32)
+
+def decode_binary_dump(records, schema, pipeline_stages, signal_categories):
+    """
+    Decodes the selected stages and signal categories of binary dump records into columns.
+    As in the YAML output, the hazard unit is always included.
+
+    Returns:
+        dict of "cycle" or "<stage>.<category>.<signal>" -> array of values
+    """
+    columns = {"cycle": np.asarray(records["cycle"])}
+
+    for section_name, section in schema["sections"].items():
+        if (section_name != "hazard_unit" and section_name not in pipeline_stages):
+            continue
+
+        words = np.asarray(records[section_name])
+        for category, fields in section["fields"].items():
+            if (section_name != "hazard_unit" and category not in signal_categories):
+                continue
+
+            for field_name, field in fields.items():
+                if (field["width"] > 32):
+                    raise ValueError(f"{section_name}.{category}.{field_name} is wider than 32 bits")
+                columns[f"{section_name}.{category}.{field_name}"] = decode_field(words, field["offset"], field["width"])
+
+    return columns
+
+def format_dump_value(value, field):
+    """
+    Formats a value the way the text dump tasks do ("0b%b" or "0x%h", zero padded to the field width)
+    """
+    if (field["format"] == "b"):
+        return f"0b{value:0{field['width']}b}"
+
+    return f"0x{value:0{(field['width'] + 3) // 4}x}"
+
+def iter_binary_cycles(columns, schema, macro_map):
+    """
+    Rebuilds each cycle of decoded binary dump columns in the structure of a text dump,
+    with values formatted and mapped to macro names as parse_cycle would
+
+    Yields:
+        cycle: Cycle number
+        cycle_data: dict of stage -> category -> signal -> value string
+    """
+    column_info = []
+    for column_name, column in columns.items():
+        if (column_name == "cycle"):
+            continue
+        section_name, category, field_name = column_name.split(".")
+        field = schema["sections"][section_name]["fields"][category][field_name]
+
+        if (section_name == "hazard_unit" and category == "forward"):
+            signal_macro_mapping = macro_map.get("forward", {})
+        else:
+            signal_macro_mapping = macro_map.get(field_name, {})
+
+        column_info.append((section_name, category, field_name, decode_macro_column(column, field, signal_macro_mapping).tolist()))
+
+    for record_idx, cycle in enumerate(columns["cycle"].tolist()):
+        cycle_data = {}
+        for section_name, category, field_name, values in column_info:
+            cycle_data.setdefault(section_name, {}).setdefault(category, {})[field_name] = values[record_idx]
+
+        yield cycle, cycle_data
+
+def write_binary_chunk(out_file, dump_path, schema, record_indices, macro_map, pipeline_stages, signal_categories, logger):
+    """
+    Decodes the given records of a binary dump and writes them as processed YAML
+    """
+    records = load_binary_dump(dump_path, schema)[record_indices]
+    columns = decode_binary_dump(records, schema, pipeline_stages, signal_categories)
+
+    dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+    for cycle, cycle_data in iter_binary_cycles(columns, schema, macro_map):
+        # values are already mapped to macro names column by column
+        parsed_cycle = parse_cycle(cycle, cycle_data, {}, pipeline_stages, signal_categories, logger)
+        yaml.dump({cycle: parsed_cycle}, out_file, Dumper=dumper, sort_keys=False)
+
+def process_binary_chunk(chunk_args):
+    """
+    Process pool worker: returns the processed YAML of a chunk of a binary dump
+    """
+    out_file = io.StringIO()
+    write_binary_chunk(out_file, *chunk_args, setup_logger("post_process_logger"))
+
+    return out_file.getvalue()
+
+def process_binary_dump(dump_path, schema_path, output_dir, output_format, macro_map, pipeline_stages, cycle_range, signal_categories, logger, jobs=1):
+    """
+    Processes a binary dump, either into the same YAML as the text dump or into NumPy columns
+    """
+    schema = load_yaml(schema_path)
+    if (schema.get("format") != "pipeline_dump_bin"):
+        raise ValueError(f"{schema_path} is not a binary pipeline dump schema")
+
+    records = load_binary_dump(dump_path, schema)
+    low_cycle, high_cycle = cycle_range
+
+    logger.info(f"records: {len(records)} ({schema['record_bytes']} bytes each)")
+    logger.info(f"cycle_range: {low_cycle}:{high_cycle}")
+    logger.info(f"stages: {pipeline_stages}")
+    logger.info(f"signal categories: {signal_categories}")
+
+    record_indices = select_cycle_records(records, low_cycle, high_cycle)
+
+    if (output_format == "npz"):
+        columns = decode_binary_dump(records[record_indices], schema, pipeline_stages, signal_categories)
+        np.savez(f"{output_dir}/processed_pipeline_dump.npz", **columns)
+        return
+
+    with open(f"{output_dir}/processed_pipeline_dump.yml", "w") as f:
+        if (jobs > 1 and len(record_indices) > INDEX_STRIDE):
+            chunks = [(dump_path, schema, record_indices[start:start+INDEX_STRIDE], macro_map, pipeline_stages, signal_categories)
+                      for start in range(0, len(record_indices), INDEX_STRIDE)]
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                for chunk_output in executor.map(process_binary_chunk, chunks):
+                    f.write(chunk_output)
+        else:
+            write_binary_chunk(f, dump_path, schema, record_indices, macro_map, pipeline_stages, signal_categories, logger)
+
+    return
 
 ###################################################
 #                   Main Functions                #
@@ -158,36 +652,123 @@ def parse_raw_dump(dump_path, output_dir, macro_map, pipeline_stages, cycle_rang
     logger.info(f"signal categories: {signal_categories}")
 
     parsed_data = {}
-    for cycle, stage, signal_category in itertools.product(range(low_cycle, high_cycle+1), pipeline_stages, signal_categories):
-        try:
-            parsed_data.setdefault(cycle, {}).setdefault(stage, {}).setdefault(signal_category, {})
+    for cycle in range(low_cycle, high_cycle+1):
+        parsed_data[cycle] = parse_cycle(cycle, dump_data.get(cycle, {}), macro_map, pipeline_stages, signal_categories, logger)
 
-            for signal_name, signal_val in dump_data[cycle][stage][signal_category].items():
-                signal_macro_mapping = macro_map.get(signal_name, {})
+    with open(f"{output_dir}/processed_pipeline_dump.yml", "w") as f:
+        yaml.safe_dump(parsed_data, f, sort_keys=False)
 
-                parsed_data[cycle][stage][signal_category][signal_name] = insert_macro(signal_val, signal_macro_mapping)
-        except:
-            logger.warning(f"could not parse data for cycle: {cycle}, stage {stage}, category: {signal_category}")
+    return
 
-    # special handelling for hazarf unit data (not same format)
-    for cycle in range(low_cycle, high_cycle+1):
-        try:
-            for hazard_category in dump_data[cycle]["hazard_unit"].keys():
-                for signal_name, signal_val in dump_data[cycle]["hazard_unit"][hazard_category].items():
-                    parsed_data.setdefault(cycle, {}).setdefault("hazard_unit", {}).setdefault(hazard_category, {})
+def apply_cycle_delta(state, cycle_data):
+    """
+    Updates the full pipeline state with the fields written in a cycle of a delta dump
+    """
+    for stage, categories in cycle_data.items():
+        for category, signals in categories.items():
+            state.setdefault(stage, {}).setdefault(category, {}).update(signals)
 
-                    if (hazard_category == "forward"):
-                        signal_macro_mapping = macro_map.get("forward", {})
-                    else:
-                        signal_macro_mapping = macro_map.get(signal_name, {})
+    return state
 
-                    parsed_data[cycle]["hazard_unit"][hazard_category][signal_name] = insert_macro(signal_val, signal_macro_mapping)
-        except:
-            logger.warning(f"could not parse hazard data for cycle: {cycle}")
+def write_text_chunk(out_file, dump_path, start_offset, end_offset, macro_map, pipeline_stages, cycle_range, signal_categories, logger, delta=False):
+    """
+    Processes the cycles of a raw dump between two byte offsets, writing them as processed YAML.
+    For delta dumps, start_offset must be a keyframe; every cycle is reconstructed into the full state.
+
+    Returns:
+        True once the end of cycle_range has been reached
+    """
+    low_cycle, high_cycle = cycle_range
+    dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+    state = {}
 
+    for cycle, block_lines in iter_cycle_blocks(dump_path, start_offset, end_offset):
+        # cycles are dumped in increasing order
+        if (cycle > high_cycle):
+            return True
+
+        if (delta):
+            cycle_data = apply_cycle_delta(state, parse_cycle_block(block_lines))
+        elif (cycle >= low_cycle):
+            cycle_data = parse_cycle_block(block_lines)
+
+        if (cycle < low_cycle):
+            continue
+
+        parsed_cycle = parse_cycle(cycle, cycle_data, macro_map, pipeline_stages, signal_categories, logger)
+        yaml.dump({cycle: parsed_cycle}, out_file, Dumper=dumper, sort_keys=False)
+
+    return False
+
+def process_text_chunk(chunk_args):
+    """
+    Process pool worker: returns the processed YAML of a chunk of a raw dump
+    """
+    out_file = io.StringIO()
+    *chunk_args, delta = chunk_args
+    write_text_chunk(out_file, *chunk_args, setup_logger("post_process_logger"), delta)
+
+    return out_file.getvalue()
+
+def get_text_chunks(cycle_index, cycle_range):
+    """
+    Splits a raw dump into chunks at its indexed cycle headers, keeping those that overlap cycle_range
+
+    Returns:
+        List of (start_offset, end_offset) byte ranges, in dump order
+    """
+    low_cycle, high_cycle = cycle_range
+    cycles = cycle_index["cycles"]
+    offsets = cycle_index["offsets"] + [cycle_index["dump_size"]]
+
+    chunks = []
+    for chunk_idx in range(len(cycles)):
+        # the chunk holds cycles [cycles[chunk_idx], cycles[chunk_idx + 1])
+        if (chunk_idx + 1 < len(cycles) and cycles[chunk_idx + 1] <= low_cycle):
+            continue
+        if (cycles[chunk_idx] > high_cycle):
+            break
+        chunks.append((offsets[chunk_idx], offsets[chunk_idx + 1]))
+
+    return chunks
+
+def stream_raw_dump(dump_path, output_dir, macro_map, pipeline_stages, cycle_range, signal_categories, logger, use_index=True, jobs=1):
+    """
+    Streaming version of parse_raw_dump. Only one cycle is held in memory at a time,
+    and each processed cycle is appended to the output as soon as it is parsed.
+    The output is identical to parse_raw_dump's for the cycles present in the dump.
+
+    With use_index, reading starts from the indexed cycle closest before the range,
+    so the time taken depends on the size of the range rather than of the dump.
+
+    With more than one job, the dump is split into chunks at its indexed cycles,
+    which are processed by a pool of worker processes and written in order.
+
+    Delta dumps (PIPELINE_DUMP_DELTA) are reconstructed from their keyframes, so every
+    cycle in the output holds the full pipeline state.
+    """
+    low_cycle, high_cycle = cycle_range
+    delta = is_delta_dump(dump_path)
+
+    logger.info(f"cycle_range: {low_cycle}:{high_cycle}")
+    logger.info(f"stages: {pipeline_stages}")
+    logger.info(f"signal categories: {signal_categories}")
 
     with open(f"{output_dir}/processed_pipeline_dump.yml", "w") as f:
-        yaml.safe_dump(parsed_data, f, sort_keys=False)
+        if (jobs > 1):
+            chunks = [(dump_path, start_offset, end_offset, macro_map, pipeline_stages, cycle_range, signal_categories, delta)
+                      for start_offset, end_offset in get_text_chunks(load_cycle_index(dump_path, logger), cycle_range)]
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                for chunk_output in executor.map(process_text_chunk, chunks):
+                    f.write(chunk_output)
+            return
+
+        # Without an index, reaching a range within the first INDEX_STRIDE cycles is already cheap
+        start_offset = 0
+        if (use_index and low_cycle > INDEX_STRIDE):
+            start_offset = find_cycle_offset(load_cycle_index(dump_path, logger), low_cycle)
+
+        write_text_chunk(f, dump_path, start_offset, None, macro_map, pipeline_stages, cycle_range, signal_categories, logger, delta)
 
     return
 
@@ -208,7 +789,20 @@ def main():
 
     macro_map = parse_macros(macro_file)
 
-    parse_raw_dump(args.dump_path, output_dir, macro_map, args.pipeline_stages, args.cycle_range, args.signal_categories, logger)
+    if (args.dump_path.endswith(".bin")):
+        if (not hasattr(args, "schema")):
+            schema_path = re.sub(r"\.bin$", ".schema.yml", args.dump_path)
+        else:
+            schema_path = args.schema
+        process_binary_dump(args.dump_path, schema_path, output_dir, args.output_format, macro_map, args.pipeline_stages, args.cycle_range, args.signal_categories, logger, jobs=args.jobs)
+    elif (args.output_format != "yaml"):
+        logger.error(f"{args.output_format} output is only supported for binary dumps")
+    elif (args.stream or args.jobs > 1 or tuple(args.cycle_range) != DEFAULT_CYCLE_RANGE or get_dump_mode(args.dump_path) != "full"):
+        # Cycle range queries seek to the range using the dump's index, delta dumps are reconstructed cycle by cycle
+        # and trigger dumps only hold the cycles around their triggers
+        stream_raw_dump(args.dump_path, output_dir, macro_map, args.pipeline_stages, args.cycle_range, args.signal_categories, logger, jobs=args.jobs)
+    else:
+        parse_raw_dump(args.dump_path, output_dir, macro_map, args.pipeline_stages, args.cycle_range, args.signal_categories, logger)
 
     return
 
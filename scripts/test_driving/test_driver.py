@@ -6,9 +6,45 @@ import subprocess
 import os
 import logging
 import re
+import json
+import gzip
+import time
+import signal
+import shutil
+import heapq
+import sqlite3
+import hashlib
+import datetime
+import sys
+import random
+import threading
+import xml.etree.ElementTree as ET
+from collections import defaultdict
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from ordered_set import OrderedSet
 
+# Guards result_info and shared build outputs when tests run concurrently
+result_lock = threading.Lock()
+
+# One lock per build hash, so identical concurrent builds only compile once
+build_locks = defaultdict(threading.Lock)
+
+# Content hashes of source files, keyed by (path, mtime, size)
+file_hash_cache = {}
+
+def parse_shard(s):
+    try:
+        index, count = tuple(map(int, s.split('/')))
+    except ValueError:
+        raise argparse.ArgumentTypeError("Shard must be in the format index/count (e.g. 1/4)")
+
+    if (count < 1 or not 1 <= index <= count):
+        raise argparse.ArgumentTypeError(f"Shard index must be between 1 and {count}")
+
+    return index, count
+
 def parse_args():
     parser = argparse.ArgumentParser(
         description="Run regressions, test groups, or individual tests."
@@ -49,6 +85,122 @@ def parse_args():
         help="Lists all currently supported tests, then exits the program"
     )
 
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=os.cpu_count(),
+        help="Number of tests to run concurrently (default: number of CPU cores)"
+    )
+
+    parser.add_argument(
+        "--no_compile_cache",
+        action="store_true",
+        help="Always recompile tests instead of reusing identical cached builds"
+    )
+
+    parser.add_argument(
+        "--no_pipeline_gen",
+        action="store_true",
+        help="Don't regenerate the pipeline dump tasks before running tests"
+    )
+
+    parser.add_argument(
+        "--plusargs",
+        action="store_true",
+        help="Pass per-test paths (program images, dump paths) to vvp as plusargs, so tests sharing a testbench share one build"
+    )
+
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=None,
+        help="Wall-clock timeout in seconds for every test, overriding the per-test and per-tag timeouts in the catalog"
+    )
+
+    parser.add_argument(
+        "--stream_vectors",
+        type=int,
+        default=None,
+        metavar="COUNT",
+        help="Feed tests with a vector_gen entry COUNT fresh vectors per opcode, streamed from the generator through a FIFO"
+    )
+
+    parser.add_argument(
+        "--vector_seed",
+        type=int,
+        default=None,
+        help="Seed of the streamed vectors (default: random, logged)"
+    )
+
+    parser.add_argument(
+        "--max_memory",
+        type=int,
+        default=None,
+        help="Address space limit in MB applied to each compile and simulation process"
+    )
+
+    parser.add_argument(
+        "--max_cpu",
+        type=int,
+        default=None,
+        help="CPU time limit in seconds applied to each compile and simulation process"
+    )
+
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        default=None,
+        help="Only run slice index/count (1-based) of the selected tests, balanced by historical runtime (e.g. 2/4)"
+    )
+
+    parser.add_argument(
+        "--history_file",
+        type=str,
+        default=None,
+        help="Test duration history used for scheduling and sharding (default: <output_dir>/test_history.json). All shards must share one"
+    )
+
+    parser.add_argument(
+        "--merge_results",
+        nargs="+",
+        default=[],
+        help="Merge results.json files from several shards into one report, then exit"
+    )
+
+    parser.add_argument(
+        "--compress_logs",
+        action="store_true",
+        help="Write test logs gzip compressed (<test>.log.gz)"
+    )
+
+    parser.add_argument(
+        "--max_log_size",
+        type=float,
+        default=None,
+        help="Maximum size in MB of simulation output kept in each test log, the rest is still scanned but dropped"
+    )
+
+    parser.add_argument(
+        "--results_db",
+        type=str,
+        default=None,
+        help="SQLite database each run's results are appended to (default: <output_dir>/results.db)"
+    )
+
+    parser.add_argument(
+        "--changed_since",
+        type=str,
+        default=None,
+        help="Only run selected tests whose RTL, testbench or program inputs changed since this git revision"
+    )
+
+    parser.add_argument(
+        "--changed_files",
+        nargs="+",
+        default=[],
+        help="Only run selected tests whose inputs include one of these files"
+    )
+
     return parser.parse_args()
 
 def setup_logger(log_name, log_file_path, level=logging.INFO):
@@ -169,41 +321,132 @@ def select_active_tests(regressions, tests, test_catalog):
 
     return active_test_info
 
-def get_module_paths(rtl_dir, module_path, module_paths=None):
+def get_proj_dir():
+    return Path(__file__).resolve().parent.parent.parent
+
+def scan_module_instances(module_path):
     """
     Parses file for the instantiaion of modules.
     Requires module instance names to start with "u_"
 
-    Args:
-        rtl_dir: Location of all RTL files
-        module_path: Path to the module currently being parsed
-        module_paths: running list of paths to included modules
+    Returns:
+        List of instantiated module names, in order of instantiation
     """
-    if module_paths is None:
-        module_paths = []
-
+    modules = []
     module_pattern = re.compile(r"u_[^\s]+\s\(")
 
     with open(module_path, "r") as f:
         for line in f:
             if (re.search(module_pattern, line)):
-                module = line.split()[0]
-                sub_module_path = rtl_dir.joinpath(f"{module}.sv")
+                modules.append(line.split()[0])
+
+    return modules
+
+def load_module_index(index_path, rtl_dir, scan_dirs):
+    """
+    Builds the project-wide module dependency index, used to resolve the file
+    list of any testbench or module without reparsing sources.
+
+    Every .sv file under scan_dirs is recorded with the modules it
+    instantiates. The index is persisted to index_path along with each file's
+    mtime, size and hash, so later runs only rescan files that changed.
+
+    Args:
+        index_path: JSON file the index is persisted to
+        rtl_dir: Location of all RTL files
+        scan_dirs: Directories whose .sv files are indexed
+
+    Returns:
+        module_index: dict with "files" (path -> file info) and "filelists" (path -> transitive module paths)
+    """
+    test_logger = logging.getLogger("test_logger")
+
+    try:
+        with open(index_path, "r") as f:
+            prev_files = json.load(f).get("files", {})
+    except (FileNotFoundError, json.JSONDecodeError):
+        prev_files = {}
+
+    module_index = {"files": {}, "filelists": {}}
+    rescanned = 0
+
+    for scan_dir in scan_dirs:
+        for module_path in sorted(Path(scan_dir).rglob("*.sv")):
+            module_path = module_path.resolve()
+            stat = os.stat(module_path)
+            file_info = prev_files.get(str(module_path))
+
+            if (file_info is None or file_info["mtime_ns"] != stat.st_mtime_ns or file_info["size"] != stat.st_size):
+                sha256 = hash_file(module_path)
+                # Touched but unchanged files keep their parsed modules
+                if (file_info is None or file_info["sha256"] != sha256):
+                    file_info = {"modules": scan_module_instances(module_path)}
+                    rescanned += 1
+                file_info = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": sha256, "modules": file_info["modules"]}
+            else:
+                # Seed the build hash cache so unchanged files are never reread
+                file_hash_cache[(str(module_path), stat.st_mtime_ns, stat.st_size)] = file_info["sha256"]
+
+            module_index["files"][str(module_path)] = file_info
+
+    for module_path in module_index["files"].keys():
+        get_module_paths(rtl_dir, module_path, module_index)
+
+    os.makedirs(Path(index_path).parent, exist_ok=True)
+    write_file_atomic(index_path, json.dumps({"files": module_index["files"]}, indent=1))
+
+    test_logger.debug(f"module index: {len(module_index['files'])} files, {rescanned} rescanned")
+
+    return module_index
+
+def get_module_paths(rtl_dir, module_path, module_index=None):
+    """
+    Gets the transitive list of RTL files instantiated by a module.
+    Results are memoized in module_index, so repeated lookups are O(1)
+
+    Args:
+        rtl_dir: Location of all RTL files
+        module_path: Path to the module (or testbench) to resolve
+        module_index: Index from load_module_index (files missing from it are parsed on demand)
+
+    Returns:
+        module_paths: Ordered, duplicate free list of module paths
+    """
+    if module_index is None:
+        module_index = {"files": {}, "filelists": {}}
+
+    module_key = str(Path(module_path).resolve())
+    if module_key in module_index["filelists"]:
+        return list(module_index["filelists"][module_key])
+
+    if module_key not in module_index["files"]:
+        module_index["files"][module_key] = {"modules": scan_module_instances(module_path)}
 
-                if sub_module_path.exists():
-                    module_paths.append(sub_module_path.resolve())
-                    get_module_paths(rtl_dir, sub_module_path, module_paths)
+    module_paths = []
+    for module in module_index["files"][module_key]["modules"]:
+        sub_module_path = rtl_dir.joinpath(f"{module}.sv")
+
+        if sub_module_path.exists():
+            module_paths.append(sub_module_path.resolve())
+            module_paths.extend(get_module_paths(rtl_dir, sub_module_path, module_index))
 
     #Remove duplicates while preserving order
     module_paths = list(dict.fromkeys(module_paths))
+    module_index["filelists"][module_key] = module_paths
 
-    return module_paths
+    return list(module_paths)
 
-def setup_paths(test_name, tb_file, top_out_dir):
+def get_tb_file(test_info):
+    if ("system" in test_info["tags"]):
+        return f"system_test/{test_info['tb']}"
+    else:
+        return f"module_tests/{test_info['tb']}"
+
+def get_dir_paths(test_name, tb_file, top_out_dir):
 
     dir_paths = {}
 
-    dir_paths["proj_dir"]        = Path(__file__).resolve().parent.parent.parent
+    dir_paths["proj_dir"]        = get_proj_dir()
     dir_paths["rtl_dir"]         = dir_paths["proj_dir"] / "rtl"
     dir_paths["include_dir"]     = dir_paths["proj_dir"] / "common" / "includes"
     dir_paths["filelist_dir"]    = dir_paths["proj_dir"] / "filelists"
@@ -214,6 +457,13 @@ def setup_paths(test_name, tb_file, top_out_dir):
     dir_paths["tb_top"]          = os.path.dirname(dir_paths["tb_path"])
 
     dir_paths["test_out_dir"]    = top_out_dir / test_name
+    dir_paths["cache_dir"]       = top_out_dir / ".compile_cache"
+
+    return dir_paths
+
+def setup_paths(test_name, tb_file, top_out_dir):
+
+    dir_paths = get_dir_paths(test_name, tb_file, top_out_dir)
 
     os.makedirs(dir_paths["test_out_dir"], exist_ok=True)
     os.makedirs(dir_paths["filelist_dir"], exist_ok=True)
@@ -221,13 +471,12 @@ def setup_paths(test_name, tb_file, top_out_dir):
 
     return dir_paths
 
-def gen_run_cmd(test_name, test_info, dir_paths, defines):
-
-    test_logger = logging.getLogger("test_logger")
-
-    defines = list(defines)
-    defines.extend(test_info["defines"])
-
+def get_search_dirs(test_info, dir_paths):
+    """
+    Returns:
+        inc_dirs: Directories passed to iverilog with -I
+        module_libs: Directories passed to iverilog with -y
+    """
     # -- Included directories ---
     inc_dirs = [
         str(dir_paths["include_dir"]),
@@ -244,13 +493,144 @@ def gen_run_cmd(test_name, test_info, dir_paths, defines):
     if ("system" in test_info["tags"]):
         module_libs.append(dir_paths['tb_top'])
         module_libs.append(f"{dir_paths['tb_top']}/monitors")
+
+    return inc_dirs, module_libs
+
+def write_file_atomic(file_path, contents):
+    """
+    Writes contents to file_path via a temporary file and rename, so that
+    concurrent tests sharing a file (e.g. top.f) never observe a partial write.
+    """
+    tmp_path = Path(f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp_path, "w") as f:
+        f.write(contents)
+    os.replace(tmp_path, file_path)
+
+def hash_file(file_path):
+    """
+    Returns the sha256 of a file's contents, reusing the previous hash while
+    the file's mtime and size are unchanged.
+    """
+    stat = os.stat(file_path)
+    key = (str(file_path), stat.st_mtime_ns, stat.st_size)
+
+    if key not in file_hash_cache:
+        with open(file_path, "rb") as f:
+            file_hash_cache[key] = hashlib.sha256(f.read()).hexdigest()
+
+    return file_hash_cache[key]
+
+@lru_cache(maxsize=None)
+def get_iverilog_version():
+    try:
+        result = subprocess.run(["iverilog", "-V"], text=True, capture_output=True)
+        return result.stdout.splitlines()[0] if result.stdout else ""
+    except OSError:
+        return ""
+
+def hash_build_inputs(build_args, src_paths, search_dirs):
+    """
+    Computes a key identifying a compiled .vvp
+
+    Args:
+        build_args: iverilog arguments (flags, include dirs, libraries, defines), excluding the output path
+        src_paths: Every source file compiled (file list and testbench)
+        search_dirs: Include and library directories, whose file contents are all hashed
+
+    Returns:
+        Hex digest that only changes when something affecting the build changes
+    """
+    hasher = hashlib.sha256()
+    hasher.update(get_iverilog_version().encode())
+
+    for arg in build_args:
+        hasher.update(f"{arg}\0".encode())
+
+    for src_path in src_paths:
+        hasher.update(f"{src_path}:{hash_file(src_path)}\0".encode())
+
+    for search_dir in search_dirs:
+        search_dir = Path(search_dir)
+        if (not search_dir.is_dir()):
+            continue
+        for file_path in sorted(search_dir.iterdir()):
+            if (file_path.is_file()):
+                hasher.update(f"{file_path}:{hash_file(file_path)}\0".encode())
+
+    return hasher.hexdigest()
+
+def gen_pipeline_dump_tasks(test_logger):
+    """
+    Regenerates the pipeline monitor and dump tasks, so they always match the RTL.
+    The generator only rewrites outputs whose content changed, so compile caches stay valid.
+    """
+    gen_script = get_proj_dir() / "scripts" / "pipeline_dumping" / "gen_pipeline_dump.py"
+    result = subprocess.run([sys.executable, str(gen_script)], text=True, capture_output=True)
+
+    if (result.returncode != 0):
+        test_logger.error(f"Pipeline dump generation failed:\n{result.stdout}{result.stderr}")
+    elif (result.stdout.strip()):
+        test_logger.info(result.stdout.strip())
+
+def fetch_cached_build(dir_paths, vvp_path):
+    """
+    Copies a cached build matching dir_paths["build_hash"] to vvp_path
+
+    Returns:
+        True if a cached build was found
+    """
+    cached_vvp = dir_paths["cache_dir"] / f"{dir_paths['build_hash']}.vvp"
+    if (not cached_vvp.exists()):
+        return False
+
+    try:
+        os.link(cached_vvp, vvp_path)
+    except OSError:
+        shutil.copy2(cached_vvp, vvp_path)
+
+    return True
+
+def store_cached_build(dir_paths, vvp_path):
+    os.makedirs(dir_paths["cache_dir"], exist_ok=True)
+    cached_vvp = dir_paths["cache_dir"] / f"{dir_paths['build_hash']}.vvp"
+    tmp_path = Path(f"{cached_vvp}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+    shutil.copy2(vvp_path, tmp_path)
+    os.replace(tmp_path, cached_vvp)
+
+def gen_run_cmd(test_name, test_info, dir_paths, defines, use_plusargs=False, module_index=None):
+    """
+    Generates the iverilog command for a test, along with the arguments
+    passed to the compiled simulation.
+
+    Per-test paths (VCD/dump paths and program images) are normally baked in
+    as defines. With use_plusargs they are instead passed to vvp as
+    +dump_file/+dump_path/+instr_hex, so every test of a testbench
+    produces an identical build that the compile cache can share.
+
+    Returns:
+        run_cmd: iverilog command
+        sim_args: plusargs to pass to the compiled .vvp
+    """
+    test_logger = logging.getLogger("test_logger")
+
+    defines = list(defines)
+    defines.extend(test_info["defines"])
+    sim_args = []
+
+    inc_dirs, module_libs = get_search_dirs(test_info, dir_paths)
+
     # --- Source files ---
     src_files = [dir_paths["tb_path"]]
 
 
     # --- Defines ---
-    defines.append(f'DUMP_FILE="{dir_paths["test_out_dir"]}/{test_name}.vcd"')
-    defines.append(f'DUMP_PATH="{dir_paths["test_out_dir"]}"')
+    if (use_plusargs):
+        sim_args.append(f"+dump_file={dir_paths['test_out_dir']}/{test_name}.vcd")
+        sim_args.append(f"+dump_path={dir_paths['test_out_dir']}")
+    else:
+        defines.append(f'DUMP_FILE="{dir_paths["test_out_dir"]}/{test_name}.vcd"')
+        defines.append(f'DUMP_PATH="{dir_paths["test_out_dir"]}"')
     defines.append(f'SIM')
 
     # System specific defines
@@ -260,13 +640,17 @@ def gen_run_cmd(test_name, test_info, dir_paths, defines):
 
         if (instr_match):
             dir_paths["instr_path"] = instr_match.resolve()
-            defines.append(f"INSTR_HEX_FILE=\"{dir_paths['instr_path']}\"")
+            if (use_plusargs):
+                sim_args.append(f"+instr_hex={dir_paths['instr_path']}")
+            else:
+                defines.append(f"INSTR_HEX_FILE=\"{dir_paths['instr_path']}\"")
         else:
             test_logger.warning(f"Could not find instruction file for: {test_name}")
 
         if (data_match):
-            data_path = data_match.resolve()
-            defines.append(f"DATA_HEX_FILE=\"{data_path}\"")
+            # No testbench loads the data image yet, so plusargs mode leaves it out rather than split the shared build
+            if (not use_plusargs):
+                defines.append(f"DATA_HEX_FILE=\"{data_match.resolve()}\"")
         elif ("c_program" in test_info["tags"]):
             test_logger.warning(f"Could not find data file for : {test_name}")
 
@@ -293,13 +677,12 @@ def gen_run_cmd(test_name, test_info, dir_paths, defines):
     ]
 
     # --- File list ---
-    module_paths = get_module_paths(dir_paths["rtl_dir"], dir_paths["tb_path"])
+    module_paths = get_module_paths(dir_paths["rtl_dir"], dir_paths["tb_path"], module_index)
     if ("system" in test_info["tags"]):
         filelist = dir_paths["filelist_dir"] / "top.f"
     else:
         filelist = dir_paths["filelist_dir"] / f"{test_name}.f"
-    with open (filelist, "w") as f:
-        f.write("\n".join(map(str, module_paths)) + "\n")
+    write_file_atomic(filelist, "\n".join(map(str, module_paths)) + "\n")
 
     # --- Create command ---
     run_cmd = ["iverilog"]
@@ -320,83 +703,809 @@ def gen_run_cmd(test_name, test_info, dir_paths, defines):
     for src in src_files:
         run_cmd.append(src)
 
-    run_cmd.extend(["-o", f"{dir_paths['test_out_dir']}/{test_name}.vvp"])
-
     # Ensure everything is of proper type
     for i in range(len(run_cmd)):
         run_cmd[i] = str(run_cmd[i])
 
-    return run_cmd
+    # --- Build hash (everything but the output path) ---
+    dir_paths["build_hash"] = hash_build_inputs(run_cmd, module_paths + src_files, inc_dirs + module_libs)
+
+    run_cmd.extend(["-o", f"{dir_paths['test_out_dir']}/{test_name}.vvp"])
+
+    return run_cmd, sim_args
+
+def get_test_timeout(test_info, tag_timeouts, timeout_override=None):
+    """
+    Resolves the wall-clock timeout of a test
+
+    Args:
+        test_info: Catalog entry of the test, may contain a "timeout"
+        tag_timeouts: dict of tag -> timeout from the catalog's "timeouts" section
+        timeout_override: Timeout given on the command line, takes precedence when set
+
+    Returns:
+        Timeout in seconds, or None if the test has no timeout
+    """
+    if (timeout_override is not None):
+        return timeout_override
+
+    if (test_info.get("timeout") is not None):
+        return test_info["timeout"]
 
-def run_test(test_name, test_info, defines, top_out_dir, result_info):
+    # A test with several timed tags gets the most generous one
+    timeouts = [tag_timeouts[tag] for tag in test_info["tags"] if tag in tag_timeouts]
+    return max(timeouts) if timeouts else None
+
+def limit_command(cmd, resource_limits):
+    """
+    Wraps a command so rlimits are applied before it executes.
+    The limits are set by a shell that then execs the command, rather than with preexec_fn
+    (tests are launched from worker threads) or after launch (children forked straight
+    away, e.g. ivlpp/ivl under iverilog, would not inherit them)
+
+    Args:
+        cmd: Command to run
+        resource_limits: dict of "memory" (MB) and/or "cpu" (seconds)
+
+    Returns:
+        The command, prefixed with the shell setting the limits when any are given
+    """
+    if (not resource_limits):
+        return cmd
+
+    ulimits = []
+    if (resource_limits.get("memory")):
+        ulimits.append(f"ulimit -v {int(resource_limits['memory']) * 1024}")
+    if (resource_limits.get("cpu")):
+        ulimits.append(f"ulimit -t {int(resource_limits['cpu'])}")
+    if (not ulimits):
+        return cmd
+
+    # Any failing ulimit stops the command; the shell's error (stderr) ends up in the test log
+    limit_script = " && ".join(ulimits) + ' || { echo "ERROR: could not apply resource limits" >&2; exit 1; }; exec "$@"'
+    return ["sh", "-c", limit_script, "sh"] + list(cmd)
+
+def launch_process(cmd, cwd, process_limits):
+    """
+    Starts a compile/simulation process in its own process group, so that a
+    timeout can kill it along with any children (e.g. ivlpp/ivl under iverilog).
+
+    Args:
+        cmd: Command to run
+        cwd: Working directory of the process
+        process_limits: dict with "deadline" (time.monotonic() value or None),
+                        "timed_out" (threading.Event) and "resource_limits"
+
+    Returns:
+        process: The launched process, with its output as a binary pipe
+        watchdog: Timer killing the process at the deadline (None without a deadline)
+    """
+    cmd = limit_command(cmd, process_limits.get("resource_limits"))
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, cwd=cwd, start_new_session=True)
+
+    if (process_limits.get("deadline") is None):
+        return process, None
+
+    def expire():
+        process_limits["timed_out"].set()
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+    watchdog = threading.Timer(max(process_limits["deadline"] - time.monotonic(), 0), expire)
+    watchdog.daemon = True
+    watchdog.start()
+
+    return process, watchdog
+
+def start_vector_stream(test_info, fifo_path, stream_config):
+    """
+    Starts test_vector_generator.py writing the test's vector_gen target into a
+    FIFO the testbench reads through +vector_file. The generator blocks until the
+    simulation opens the FIFO, and then only runs as far ahead as the pipe buffer,
+    so generation overlaps simulation and no vectors are stored on disk.
+
+    Args:
+        test_info: Catalog entry of the test
+        fifo_path: Path of the FIFO to create
+        stream_config: dict with the "count" of vectors per opcode and the "seed"
+
+    Returns:
+        The generator process
+    """
+    fifo_path.unlink(missing_ok=True)
+    os.mkfifo(fifo_path)
+
+    gen_script = get_proj_dir() / "scripts" / "test_vector_generator.py"
+    gen_cmd = [sys.executable, str(gen_script), "-t", test_info["vector_gen"], "-n", str(stream_config["count"]),
+               "-s", str(stream_config["seed"]), "-j", "1", "-f", "txt", "--output_file", str(fifo_path)]
+
+    return subprocess.Popen(gen_cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+
+def stop_vector_stream(producer, fifo_path, log_file):
+    """
+    Reaps a generator from start_vector_stream, logs its output and removes the FIFO.
+    A generator still blocked on opening the FIFO (the simulation never opened it) is killed.
+    """
+    try:
+        output, _ = producer.communicate(timeout=5)
+    except subprocess.TimeoutExpired:
+        producer.kill()
+        output, _ = producer.communicate()
+
+    log_file.write(f"Vector generator output:\n{output}")
+    fifo_path.unlink(missing_ok=True)
+
+CAPTURE_CHUNK_SIZE = 64 * 1024
+
+def scan_output(data, scan_info):
+    """
+    Scans complete lines of process output for TEST PASSED and warnings (lines
+    containing "warning" in any case, except VCD warnings)
+
+    Whole chunks are searched with bytes.find, which is much faster than a Python
+    loop over lines or an alternation regex; only the rare matching lines are inspected.
+
+    Args:
+        data: Output bytes, ending at a line boundary
+        scan_info: dict with "passed" (bool) and "warnings" (count) that is updated
+    """
+    if (not scan_info["passed"] and b"TEST PASSED" in data):
+        scan_info["passed"] = True
+
+    lowered = data.lower()
+    match_pos = lowered.find(b"warning")
+    while (match_pos != -1):
+        line_start = lowered.rfind(b"\n", 0, match_pos) + 1
+        line_end = lowered.find(b"\n", match_pos)
+        if (line_end == -1):
+            line_end = len(lowered)
+
+        if (b"vcd" not in lowered[line_start:line_end]):
+            scan_info["warnings"] += 1
+        match_pos = lowered.find(b"warning", line_end)
+
+def capture_output(process, log_file, max_log_bytes=None):
+    """
+    Tees a process's output to a log file in chunks, scanning it for TEST PASSED and warnings
+
+    Output is copied to the log unchanged. Once max_log_bytes have been written the
+    remaining output is still read (so the process never blocks) and scanned, but dropped.
+
+    Args:
+        process: Process launched with launch_process
+        log_file: Text log file, whose underlying binary buffer the output is written to
+        max_log_bytes: Maximum number of output bytes kept in the log (None for no limit)
+
+    Returns:
+        dict with "passed" (bool) and "warnings" (count)
+    """
+    scan_info = {"passed": False, "warnings": 0}
+    log_buffer = log_file.buffer
+    log_file.flush()
+
+    written = 0
+    dropped = 0
+    partial_line = b""
+    while True:
+        chunk = process.stdout.read1(CAPTURE_CHUNK_SIZE)
+        if (not chunk):
+            break
+
+        if (max_log_bytes is None or written + len(chunk) <= max_log_bytes):
+            log_buffer.write(chunk)
+            written += len(chunk)
+        else:
+            kept = max(max_log_bytes - written, 0)
+            log_buffer.write(chunk[:kept])
+            written += kept
+            dropped += len(chunk) - kept
+
+        # Only scan up to the last complete line; the rest is carried into the next chunk
+        data = partial_line + chunk
+        line_end = data.rfind(b"\n") + 1
+        if (line_end == 0 and len(data) < CAPTURE_CHUNK_SIZE * 16):
+            partial_line = data
+            continue
+        if (line_end == 0):
+            line_end = len(data)
+        scan_output(data[:line_end], scan_info)
+        partial_line = data[line_end:]
+
+    scan_output(partial_line, scan_info)
+
+    log_buffer.flush()
+    if (dropped):
+        log_file.write(f"\n[Log truncated at {max_log_bytes} bytes, {dropped} bytes of output dropped]\n")
+
+    return scan_info
+
+def run_compile(test_name, run_cmd, dir_paths, log_file, process_limits):
+    process, watchdog = launch_process(run_cmd, dir_paths["proj_dir"], process_limits)
+    capture_output(process, log_file)
+    process.wait()
+    if (watchdog):
+        watchdog.cancel()
+    log_file.write(f"Compilation of {test_name} complete\n")
+
+    return process.returncode
+
+def compile_test(test_name, run_cmd, dir_paths, vvp_path, log_file, use_cache, process_limits):
+    """
+    Compiles a test, reusing a cached .vvp when an identical build exists.
+    Identical builds running concurrently wait on each other rather than
+    compiling in parallel.
+    """
+    if (not use_cache):
+        run_compile(test_name, run_cmd, dir_paths, log_file, process_limits)
+        return
+
+    with build_locks[dir_paths["build_hash"]]:
+        if (fetch_cached_build(dir_paths, vvp_path)):
+            log_file.write(f"Compilation of {test_name} skipped, using cached build {dir_paths['build_hash']}\n")
+            return
+
+        returncode = run_compile(test_name, run_cmd, dir_paths, log_file, process_limits)
+
+        # Only successful builds are cached
+        if (returncode == 0 and vvp_path.exists() and not process_limits["timed_out"].is_set()):
+            store_cached_build(dir_paths, vvp_path)
+
+def run_test(test_name, test_info, defines, top_out_dir, result_info, run_config=None):
     """
     Runs a specific testbench using Icarus Verilog
 
     Args:
         test_name: Name of the test
-        tb_file: Name of the testbench file
-        test_out_dir: Where the outputs of the test are placed
+        test_info: Catalog entry of the test
+        defines: Additional defines applied to the test
+        top_out_dir: Top level directory test outputs are placed in
+        result_info: dict that test results are recorded in
+        run_config: dict of driver options (e.g. "compile_cache", "plusargs", "module_index", "tag_timeouts", "compress_logs", "stream_vectors")
     """
+    if run_config is None:
+        run_config = {}
+
     test_logger = logging.getLogger("test_logger")
 
-    if ("system" in test_info["tags"]):
-        tb_file = f"system_test/{test_info['tb']}"
-    else:
-        tb_file = f"module_tests/{test_info['tb']}"
+    dir_paths = setup_paths(test_name, get_tb_file(test_info), top_out_dir)
+    run_cmd, sim_args = gen_run_cmd(test_name, test_info, dir_paths, defines,
+                                    run_config.get("plusargs", False), run_config.get("module_index"))
 
-    dir_paths = setup_paths(test_name, tb_file, top_out_dir)
-    run_cmd = gen_run_cmd(test_name, test_info, dir_paths, defines)
+    fifo_path = None
+    if (run_config.get("stream_vectors") and "vector_gen" in test_info):
+        fifo_path = Path(dir_paths['test_out_dir']) / f"{test_name}_vectors.fifo"
+        sim_args.append(f"+vector_file={fifo_path}")
+
+    # --- Timeout and resource limits ---
+    timeout = get_test_timeout(test_info, run_config.get("tag_timeouts", {}), run_config.get("timeout"))
+    process_limits = {
+        "deadline": None if timeout is None else time.monotonic() + timeout,
+        "timed_out": threading.Event(),
+        "resource_limits": run_config.get("resource_limits"),
+    }
 
     # --- Run compilation and simulation ---
     test_passed = False
-    warning_present = False
+    warning_cnt = 0
+    compile_time = 0.0
+    sim_time = 0.0
     log_path = Path(dir_paths['test_out_dir']) / f"{test_name}.log"
-    with open(log_path, "w") as log_file:
+    vvp_path = Path(dir_paths['test_out_dir']) / f"{test_name}.vvp"
+    max_log_size = run_config.get("max_log_size")
+    max_log_bytes = None if max_log_size is None else int(max_log_size * 1024 * 1024)
+    if (run_config.get("compress_logs", False)):
+        log_path = log_path.with_suffix(".log.gz")
+        open_log = lambda: gzip.open(log_path, "wt", compresslevel=1)
+    else:
+        open_log = lambda: open(log_path, "w")
+
+    with open_log() as log_file:
         try:
             log_file.write(f"Compilation command:\n {' '.join(run_cmd)}\n")
-            process = subprocess.Popen(run_cmd, text=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, cwd=dir_paths["proj_dir"])
-            for line in process.stdout:
-                log_file.write(f"{line}\n")
-            log_file.write(f"Compilation of {test_name} complete\n")
-
-            process.wait()
-
-            log_file.write(f"Beginning simulation of test: {test_name}...\n")
-            process = subprocess.Popen([f"{dir_paths['test_out_dir']}/{test_name}.vvp"], text=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, cwd=dir_paths["proj_dir"])
-            for line in process.stdout:
-                log_file.write(f"{line}\n")
-                if "TEST PASSED" in line:
-                    test_passed = True
-                if ("WARNING" in line.upper() and "VCD" not in line.upper()):
-                    warning_present = True
-
-            process.wait()
+            compile_start = time.monotonic()
+            compile_test(test_name, run_cmd, dir_paths, vvp_path, log_file, run_config.get("compile_cache", True), process_limits)
+            compile_time = time.monotonic() - compile_start
+
+            if (not process_limits["timed_out"].is_set()):
+                sim_start = time.monotonic()
+                log_file.write(f"Beginning simulation of test: {test_name}...\n")
+                if (sim_args):
+                    log_file.write(f"Simulation arguments:\n {' '.join(sim_args)}\n")
+                if (fifo_path is not None):
+                    producer = start_vector_stream(test_info, fifo_path, run_config["stream_vectors"])
+                try:
+                    process, watchdog = launch_process([str(vvp_path)] + sim_args, dir_paths["proj_dir"], process_limits)
+                    scan_info = capture_output(process, log_file, max_log_bytes)
+                    test_passed = scan_info["passed"]
+                    warning_cnt = scan_info["warnings"]
+
+                    process.wait()
+                    if (watchdog):
+                        watchdog.cancel()
+                finally:
+                    if (fifo_path is not None):
+                        stop_vector_stream(producer, fifo_path, log_file)
+                sim_time = time.monotonic() - sim_start
         except:
             test_passed = False
 
-    if (test_passed == True):
-        result_info["PASSED_TESTS"][test_name] = dir_paths['test_out_dir']
-        test_logger.info(f"{test_name} PASSED")
-    else:
-        result_info["FAILED_TESTS"][test_name] = dir_paths['test_out_dir']
-        test_logger.info(f"{test_name} FAILED")
-    if (warning_present == True):
-        result_info["WARNING_TESTS"][test_name] = dir_paths['test_out_dir']
-        test_logger.info(f"{test_name} CONTAINS WARNINGS")
+        if (process_limits["timed_out"].is_set()):
+            test_passed = False
+            log_file.write(f"Test {test_name} exceeded its {timeout}s timeout and was killed\n")
+
+    with result_lock:
+        result_info["TEST_STATS"][test_name] = {"compile": compile_time, "sim": sim_time, "warnings": warning_cnt, "log": str(log_path)}
+
+        if (process_limits["timed_out"].is_set()):
+            result_info["TIMEOUT_TESTS"][test_name] = dir_paths['test_out_dir']
+            test_logger.info(f"{test_name} TIMED OUT")
+        elif (test_passed == True):
+            result_info["PASSED_TESTS"][test_name] = dir_paths['test_out_dir']
+            test_logger.info(f"{test_name} PASSED")
+        else:
+            result_info["FAILED_TESTS"][test_name] = dir_paths['test_out_dir']
+            test_logger.info(f"{test_name} FAILED")
+        if (warning_cnt > 0):
+            result_info["WARNING_TESTS"][test_name] = dir_paths['test_out_dir']
+            test_logger.info(f"{test_name} CONTAINS WARNINGS")
 
     return
 
-def run_all_tests(active_test_info, defines, top_out_dir, result_info):
+def get_test_inputs(test_name, test_info, dir_paths, module_index=None):
+    """
+    Collects every file whose change could affect the result of a test
+
+    Includes the testbench, its transitive RTL file list, all include and
+    library directory contents, input files referenced by the testbench
+    (e.g. test vectors), and for system tests the program's sources/images
+    along with the shared program build files.
 
-    os.makedirs(top_out_dir, exist_ok=True)
+    Returns:
+        Set of resolved file paths
+    """
+    test_inputs = {dir_paths["tb_path"].resolve()}
+    test_inputs.update(get_module_paths(dir_paths["rtl_dir"], dir_paths["tb_path"], module_index))
+
+    inc_dirs, module_libs = get_search_dirs(test_info, dir_paths)
+    for search_dir in inc_dirs + module_libs:
+        search_dir = Path(search_dir)
+        if (search_dir.is_dir()):
+            test_inputs.update(path.resolve() for path in search_dir.iterdir() if path.is_file())
+
+    # Files opened by the testbench, e.g. $fopen("test_inputs/vectors/...")
+    with open(dir_paths["tb_path"], "r") as f:
+        for input_path in re.findall(r'"(test_inputs/[^"]+)"', f.read()):
+            test_inputs.add((dir_paths["proj_dir"] / input_path).resolve())
+
+    if ("system" in test_info["tags"]):
+        program_file = next(dir_paths["hex_path"].rglob(f"{test_name}.*"), None)
+        if (program_file):
+            test_inputs.update(path.resolve() for path in program_file.parent.iterdir() if path.is_file())
+
+        # Shared program build inputs (linker script, startup code, makefiles, common headers)
+        test_inputs.update(path.resolve() for path in dir_paths["hex_path"].iterdir() if path.is_file())
+        test_inputs.update(path.resolve() for path in (dir_paths["hex_path"] / "common").glob("*") if path.is_file())
+
+    return test_inputs
+
+def get_changed_files(changed_since=None, changed_files=None):
+    """
+    Args:
+        changed_since: git revision to diff the working tree against
+        changed_files: Explicit list of changed files (relative to the current directory)
+
+    Returns:
+        Set of resolved paths of all changed files
+    """
+    changed = set()
+
+    if (changed_since):
+        git_root = Path(subprocess.run(["git", "rev-parse", "--show-toplevel"], cwd=get_proj_dir(),
+                                       capture_output=True, text=True, check=True).stdout.strip())
+        diff = subprocess.run(["git", "diff", "--name-only", changed_since], cwd=git_root,
+                              capture_output=True, text=True, check=True).stdout
+        untracked = subprocess.run(["git", "ls-files", "--others", "--exclude-standard"], cwd=git_root,
+                                   capture_output=True, text=True, check=True).stdout
+
+        for changed_file in (diff + untracked).splitlines():
+            changed.add((git_root / changed_file).resolve())
+
+    for changed_file in (changed_files or []):
+        changed.add(Path(changed_file).resolve())
+
+    return changed
+
+def select_changed_tests(active_test_info, changed_files, top_out_dir, module_index=None):
+    """
+    Filters active tests down to those with at least one changed input
+
+    Args:
+        active_test_info: dict containing info for tests that are to be run
+        changed_files: Set of resolved paths of changed files
+        top_out_dir: Top level directory test outputs are placed in
+        module_index: Index from load_module_index
+
+    Returns:
+        active_test_info: dict containing only the affected tests
+    """
+    test_logger = logging.getLogger("test_logger")
+
+    # A change to the driver or catalog can affect any test
+    driver_dir = Path(__file__).resolve().parent
+    if (any(changed_file.parent == driver_dir for changed_file in changed_files)):
+        test_logger.info("test driver changed, running all selected tests")
+        return active_test_info
 
+    changed_test_info = {}
     for test_name, test_info in active_test_info.items():
-        run_test(test_name, test_info, defines, top_out_dir, result_info)
+        dir_paths = get_dir_paths(test_name, get_tb_file(test_info), top_out_dir)
+        if (get_test_inputs(test_name, test_info, dir_paths, module_index) & changed_files):
+            changed_test_info[test_name] = test_info
+
+    skipped_tests = [test for test in active_test_info.keys() if test not in changed_test_info]
+    test_logger.info(f"skipping {len(skipped_tests)} tests unaffected by changes: {', '.join(skipped_tests)}")
+    test_logger.info(f"running changed tests: {', '.join(changed_test_info.keys())}")
+
+    return changed_test_info
+
+def get_history_path(history_file, top_out_dir):
+    """
+    Returns the test duration history used by a run: --history_file if given, else <output_dir>/test_history.json
+    """
+    return Path(history_file) if history_file else top_out_dir / "test_history.json"
+
+def load_history(history_path):
+    try:
+        with open(history_path, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def update_history(history_path, history, durations, smoothing=0.5):
+    """
+    Folds the durations of this run into the persistent test history.
+    Each duration is an exponential moving average, so the history tracks
+    slow drift (e.g. RTL growth) without being thrown off by one noisy run.
+
+    Args:
+        history_path: JSON file the history is persisted to
+        history: Current history, as returned by load_history
+        durations: dict of test -> {"compile": seconds, "sim": seconds, ...} from this run
+        smoothing: Weight given to the newest measurement
+    """
+    for test_name, duration in durations.items():
+        prev = history.get(test_name)
+        if (prev is None):
+            history[test_name] = {"compile": duration["compile"], "sim": duration["sim"], "runs": 1}
+        else:
+            history[test_name] = {
+                "compile": smoothing * duration["compile"] + (1 - smoothing) * prev["compile"],
+                "sim": smoothing * duration["sim"] + (1 - smoothing) * prev["sim"],
+                "runs": prev.get("runs", 0) + 1,
+            }
+
+    os.makedirs(Path(history_path).parent, exist_ok=True)
+    write_file_atomic(history_path, json.dumps(history, indent=1, sort_keys=True))
+
+def predict_durations(active_test_info, history):
+    """
+    Predicts how long each active test will take from the test history.
+    Tests without history are assumed to take as long as the average known
+    test with the same speed tag ("slow"/"fast"), or of all known tests.
+
+    Returns:
+        dict of test -> predicted seconds
+    """
+    known = {test: info["compile"] + info["sim"] for test, info in history.items()}
+    all_average = sum(known.values()) / len(known) if known else 0.0
+
+    predictions = {}
+    for test_name, test_info in active_test_info.items():
+        if (test_name in known):
+            predictions[test_name] = known[test_name]
+            continue
+
+        speed_tags = {"slow", "fast"} & set(test_info["tags"])
+        similar = [known[test] for test, info in active_test_info.items()
+                   if test in known and speed_tags & set(info["tags"])]
+        predictions[test_name] = sum(similar) / len(similar) if similar else all_average
+
+    return predictions
+
+def schedule_longest_first(active_test_info, predictions):
+    """
+    Orders tests longest predicted duration first (LPT scheduling), so long
+    tests start early and the tail of a concurrent regression stays short.
+    Ties keep the original selection order.
+    """
+    test_order = sorted(active_test_info.keys(), key=lambda test: -predictions[test])
+    return {test: active_test_info[test] for test in test_order}
+
+def predict_regression_time(test_order, predictions, jobs):
+    """
+    Simulates greedy list scheduling of tests (in order) across jobs workers
+
+    Returns:
+        Predicted wall-clock seconds for the regression
+    """
+    workers = [0.0] * max(jobs or 1, 1)
+    for test in test_order:
+        heapq.heappush(workers, heapq.heappop(workers) + predictions[test])
+
+    return max(workers)
+
+def select_shard(active_test_info, predictions, shard_index, shard_count):
+    """
+    Deterministically partitions tests into shard_count balanced shards and
+    returns the tests of one shard.
+
+    Tests are assigned longest predicted first to the least loaded shard
+    (ties broken by test name and shard number), so every worker computes
+    the same partition as long as they share the same history.
+
+    Args:
+        active_test_info: dict containing info for tests that are to be run
+        predictions: dict of test -> predicted seconds
+        shard_index: 1-based shard to return
+        shard_count: Total number of shards
+
+    Returns:
+        active_test_info: dict containing only the tests of the shard, in selection order
+    """
+    test_logger = logging.getLogger("test_logger")
+
+    shard_loads = [(0.0, shard) for shard in range(1, shard_count + 1)]
+    heapq.heapify(shard_loads)
+    assignment = {}
+
+    for test in sorted(active_test_info.keys(), key=lambda test: (-predictions[test], test)):
+        load, shard = heapq.heappop(shard_loads)
+        assignment[test] = shard
+        heapq.heappush(shard_loads, (load + predictions[test], shard))
+
+    shard_test_info = {test: info for test, info in active_test_info.items() if assignment[test] == shard_index}
+    shard_time = sum(predictions[test] for test in shard_test_info.keys())
+    test_logger.info(f"shard {shard_index}/{shard_count}: {len(shard_test_info)} tests, {shard_time:.1f}s predicted")
+    test_logger.info(f"running tests: {', '.join(shard_test_info.keys())}")
+
+    return shard_test_info
+
+def parse_perf_dump(perf_dump_path):
+    """
+    Parses the performance summary written by print_perf_summary
+
+    Metrics are keyed by their section, e.g. "cycles", "cpi",
+    "operation_mix.load_ops", "branch_predictor.mispredict_rate".
+    Percentages are kept as percentages.
+
+    Returns:
+        dict of metric -> value (empty if the file does not exist)
+    """
+    metrics = {}
+    section = ""
+
+    try:
+        with open(perf_dump_path, "r") as f:
+            for line in f:
+                section_match = re.match(r"---\s*(.+?)\s*---", line.strip())
+                if (section_match):
+                    section = re.sub(r"\W+", "_", section_match.group(1).lower()).strip("_")
+                    continue
+
+                metric_match = re.match(r"^([A-Za-z][\w \-]*?):\s+(-?[\d.]+)%?\s*$", line.strip())
+                if (metric_match):
+                    name = re.sub(r"\W+", "_", metric_match.group(1).lower()).strip("_")
+                    key = f"{section}.{name}" if section else name
+                    metrics[key] = float(metric_match.group(2))
+    except FileNotFoundError:
+        pass
+
+    return metrics
+
+def build_test_records(result_info):
+    """
+    Builds one structured record per test from result_info and the test's outputs
+
+    Returns:
+        List of dicts with test, status, out_dir, compile_time, sim_time, warnings, log, cycles and metrics
+    """
+    records = []
+    statuses = [("PASSED_TESTS", "PASSED"), ("FAILED_TESTS", "FAILED"), ("TIMEOUT_TESTS", "TIMEOUT")]
+
+    for category, status in statuses:
+        for test_name, out_dir in result_info[category].items():
+            stats = result_info["TEST_STATS"].get(test_name, {})
+            metrics = parse_perf_dump(Path(out_dir) / "performance_dump.log")
+            cycles = metrics.get("cycles")
+
+            records.append({
+                "test": test_name,
+                "status": status,
+                "out_dir": str(out_dir),
+                "compile_time": stats.get("compile"),
+                "sim_time": stats.get("sim"),
+                "warnings": stats.get("warnings", 0),
+                "log": stats.get("log", f"{out_dir}/{test_name}.log"),
+                "cycles": None if cycles is None else int(cycles),
+                "metrics": metrics,
+            })
+
+    return records
+
+def get_run_info(shard=None, regression_time=None):
+    try:
+        git_commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=get_proj_dir(),
+                                    capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        git_commit = None
+
+    return {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "git_commit": git_commit,
+        "shard": shard if (shard is None or isinstance(shard, str)) else f"{shard[0]}/{shard[1]}",
+        "regression_time": regression_time,
+    }
+
+def write_results(results_path, result_info, records, run_info):
+    """
+    Writes a run's results to a JSON file, which can later be merged with --merge_results
+    """
+    results = {"run": run_info, "shard": run_info["shard"], "results": result_info, "tests": records}
+
+    os.makedirs(Path(results_path).parent, exist_ok=True)
+    write_file_atomic(results_path, json.dumps(results, indent=1, default=str))
+
+def write_junit_results(junit_path, records, run_info):
+    """
+    Writes test records as JUnit XML for CI systems.
+    Timed out tests are reported as errors, failed tests as failures
+    """
+    test_suite = ET.Element("testsuite", {
+        "name": "regression",
+        "timestamp": run_info["timestamp"],
+        "tests": str(len(records)),
+        "failures": str(sum(record["status"] == "FAILED" for record in records)),
+        "errors": str(sum(record["status"] == "TIMEOUT" for record in records)),
+        "time": f"{sum((record['compile_time'] or 0) + (record['sim_time'] or 0) for record in records):.3f}",
+    })
+
+    for record in records:
+        test_time = (record["compile_time"] or 0) + (record["sim_time"] or 0)
+        test_case = ET.SubElement(test_suite, "testcase", {"classname": "regression", "name": record["test"], "time": f"{test_time:.3f}"})
+
+        if (record["status"] == "FAILED"):
+            ET.SubElement(test_case, "failure", {"message": "test did not report TEST PASSED"})
+        elif (record["status"] == "TIMEOUT"):
+            ET.SubElement(test_case, "error", {"type": "timeout", "message": "test exceeded its wall-clock timeout"})
+
+        ET.SubElement(test_case, "system-out").text = record.get("log", f"{record['out_dir']}/{record['test']}.log")
+
+    test_suites = ET.Element("testsuites")
+    test_suites.append(test_suite)
+    ET.indent(test_suites)
+    write_file_atomic(junit_path, ET.tostring(test_suites, encoding="unicode") + "\n")
+
+def store_results_db(db_path, records, run_info):
+    """
+    Appends a run and its test records to the SQLite results store
+
+    Tables:
+        runs: one row per run (timestamp, git commit, shard, regression time, totals)
+        test_results: one row per test per run
+        test_metrics: one row per performance metric per test per run
+    """
+    os.makedirs(Path(db_path).parent, exist_ok=True)
+
+    with sqlite3.connect(db_path) as db:
+        db.execute("""CREATE TABLE IF NOT EXISTS runs (
+                          run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                          timestamp TEXT, git_commit TEXT, shard TEXT, regression_time REAL,
+                          passed INTEGER, failed INTEGER, timeout INTEGER)""")
+        db.execute("""CREATE TABLE IF NOT EXISTS test_results (
+                          run_id INTEGER, test TEXT, status TEXT, compile_time REAL, sim_time REAL,
+                          cycles INTEGER, warnings INTEGER, out_dir TEXT)""")
+        db.execute("""CREATE TABLE IF NOT EXISTS test_metrics (
+                          run_id INTEGER, test TEXT, metric TEXT, value REAL)""")
+
+        statuses = [record["status"] for record in records]
+        cursor = db.execute("INSERT INTO runs (timestamp, git_commit, shard, regression_time, passed, failed, timeout) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                            (run_info["timestamp"], run_info["git_commit"], run_info["shard"], run_info["regression_time"],
+                             statuses.count("PASSED"), statuses.count("FAILED"), statuses.count("TIMEOUT")))
+        run_id = cursor.lastrowid
+
+        db.executemany("INSERT INTO test_results VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                       [(run_id, record["test"], record["status"], record["compile_time"], record["sim_time"],
+                         record["cycles"], record["warnings"], record["out_dir"]) for record in records])
+        db.executemany("INSERT INTO test_metrics VALUES (?, ?, ?, ?)",
+                       [(run_id, record["test"], metric, value) for record in records for metric, value in record["metrics"].items()])
+
+def export_results(top_out_dir, result_info, records, run_info, db_path=None):
+    """
+    Writes results.json, results.xml (JUnit) and appends to the SQLite results store
+    """
+    write_results(top_out_dir / "results.json", result_info, records, run_info)
+    write_junit_results(top_out_dir / "results.xml", records, run_info)
+    store_results_db(db_path or top_out_dir / "results.db", records, run_info)
+
+def merge_results(results_paths):
+    """
+    Combines the result files of several shards
+
+    Returns:
+        result_info: Merged results, with shards' tests in the order given
+        records: Merged test records
+    """
+    test_logger = logging.getLogger("test_logger")
+
+    result_info = new_result_info()
+    records = []
+    for results_path in results_paths:
+        with open(results_path, "r") as f:
+            results = json.load(f)
+
+        test_logger.info(f"merging results of shard {results.get('shard')}: {results_path}")
+        for category, shard_results in results["results"].items():
+            result_info.setdefault(category, {}).update(shard_results)
+        records.extend(results.get("tests", []))
+
+    return result_info, records
+
+def new_result_info():
+    return {"PASSED_TESTS": {}, "FAILED_TESTS": {}, "TIMEOUT_TESTS": {}, "WARNING_TESTS": {}, "TEST_STATS": {}}
+
+def order_results(result_info, test_order):
+    """
+    Reorders each result category to follow test_order, so the report is
+    identical regardless of the order in which concurrent tests finished.
+    """
+    for category, results in result_info.items():
+        result_info[category] = {test: results[test] for test in test_order if test in results}
+
+def run_all_tests(active_test_info, defines, top_out_dir, result_info, jobs=1, run_config=None):
+    """
+    Runs all active tests, either serially or across a pool of worker threads
+
+    Args:
+        active_test_info: dict containing info for tests that are to be run
+        defines: Additional defines applied to every test
+        top_out_dir: Top level directory test outputs are placed in
+        result_info: dict that test results are recorded in
+        jobs: Maximum number of tests to run concurrently
+        run_config: dict of driver options passed to run_test
+    """
+    test_logger = logging.getLogger("test_logger")
+
+    os.makedirs(top_out_dir, exist_ok=True)
+
+    if (jobs is None or jobs <= 1):
+        for test_name, test_info in active_test_info.items():
+            run_test(test_name, test_info, defines, top_out_dir, result_info, run_config)
+        return
+
+    # Tests spend nearly all their time in iverilog/vvp subprocesses, so threads are sufficient
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = {}
+        for test_name, test_info in active_test_info.items():
+            future = executor.submit(run_test, test_name, test_info, defines, top_out_dir, result_info, run_config)
+            futures[future] = test_name
+
+        for future in as_completed(futures):
+            test_name = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                with result_lock:
+                    result_info["FAILED_TESTS"][test_name] = top_out_dir / test_name
+                test_logger.error(f"{test_name} raised an exception: {e}")
+                test_logger.info(f"{test_name} FAILED")
 
 def generate_report(result_info, test_logger):
     # Report results
     passed_tests = result_info["PASSED_TESTS"]
     failed_tests = result_info["FAILED_TESTS"]
+    timeout_tests = result_info["TIMEOUT_TESTS"]
     warning_tests = result_info["WARNING_TESTS"]
 
     if (len(passed_tests) != 0):
@@ -413,6 +1522,11 @@ def generate_report(result_info, test_logger):
     else:
         test_logger.info("==================== NO TESTS FAILED ====================")
 
+    if (len(timeout_tests) != 0):
+        test_logger.info("==================== TIMED OUT TESTS ====================")
+        for test in timeout_tests.keys():
+            test_logger.info(f"{test}: {timeout_tests[test]}")
+
     if (len(warning_tests) != 0):
         test_logger.info("==================== TESTS WITH WARNINGS ====================")
         for test in warning_tests.keys():
@@ -421,6 +1535,7 @@ def generate_report(result_info, test_logger):
     test_logger.info(f"==================== SUMMARY ====================")
     test_logger.info(f"Total PASSED tests: {len(passed_tests)}")
     test_logger.info(f"Total FAILED tests: {len(failed_tests)}")
+    test_logger.info(f"Total TIMEOUT tests: {len(timeout_tests)}")
 
 def main():
     args = parse_args()
@@ -430,17 +1545,78 @@ def main():
     if (args.list_tests):
         list_tests(test_catalog)
         return
+    elif (args.merge_results):
+        result_info, records = merge_results(args.merge_results)
+        top_out_dir = Path(os.path.abspath(args.output_dir))
+        history_path = get_history_path(args.history_file, top_out_dir)
+        update_history(history_path, load_history(history_path), result_info["TEST_STATS"])
+        export_results(top_out_dir, result_info, records, get_run_info("merged"), args.results_db)
+        generate_report(result_info, test_logger)
+        return
     elif (args.regressions == [] and args.tests == []):
         test_logger.error("No regressions or tests provided")
         return
 
     active_test_info = select_active_tests(args.regressions, args.tests, test_catalog)
 
+    if (not args.no_pipeline_gen):
+        gen_pipeline_dump_tasks(test_logger)
+
     top_out_dir = Path(os.path.abspath(args.output_dir))
-    result_info = {"PASSED_TESTS": {}, "FAILED_TESTS": {}, "WARNING_TESTS": {}}
+    result_info = new_result_info()
+    proj_dir = get_proj_dir()
+    module_index = load_module_index(proj_dir / "filelists" / "module_index.json",
+                                     proj_dir / "rtl",
+                                     [proj_dir / "rtl", proj_dir / "tb"])
+
+    if (args.changed_since or args.changed_files):
+        changed_files = get_changed_files(args.changed_since, args.changed_files)
+        active_test_info = select_changed_tests(active_test_info, changed_files, top_out_dir, module_index)
+
+    run_config = {
+        "compile_cache": not args.no_compile_cache,
+        "plusargs": args.plusargs,
+        "module_index": module_index,
+        "timeout": args.timeout,
+        "tag_timeouts": test_catalog.get("timeouts", {}),
+        "resource_limits": {"memory": args.max_memory, "cpu": args.max_cpu},
+        "compress_logs": args.compress_logs,
+        "max_log_size": args.max_log_size,
+        "stream_vectors": None,
+    }
+
+    if (args.stream_vectors is not None):
+        vector_seed = args.vector_seed if args.vector_seed is not None else random.SystemRandom().randrange(2**32)
+        run_config["stream_vectors"] = {"count": args.stream_vectors, "seed": vector_seed}
+        test_logger.info(f"Streaming {args.stream_vectors} vectors per opcode, seed: {vector_seed}")
+
+    # --- Schedule from historical durations ---
+    selection_order = list(active_test_info.keys())
+    history_path = get_history_path(args.history_file, top_out_dir)
+    history = load_history(history_path)
+    predictions = predict_durations(active_test_info, history)
+    if (args.shard):
+        active_test_info = select_shard(active_test_info, predictions, *args.shard)
+        selection_order = list(active_test_info.keys())
+    if (args.jobs is not None and args.jobs > 1):
+        active_test_info = schedule_longest_first(active_test_info, predictions)
+    predicted_time = predict_regression_time(active_test_info.keys(), predictions, args.jobs)
+
+    regression_start = time.monotonic()
+    run_all_tests(active_test_info, args.defines, top_out_dir, result_info, args.jobs, run_config)
+    regression_time = time.monotonic() - regression_start
+
+    # Report in selection order, regardless of scheduling and completion order
+    order_results(result_info, selection_order)
+
+    # Shards must partition against the same history, so it is only updated when merging
+    if (not args.shard):
+        update_history(history_path, history, result_info["TEST_STATS"])
+    records = build_test_records(result_info)
+    export_results(top_out_dir, result_info, records, get_run_info(args.shard, regression_time), args.results_db)
 
-    run_all_tests(active_test_info, args.defines, top_out_dir, result_info)
     generate_report(result_info, test_logger)
+    test_logger.info(f"Regression time: {regression_time:.1f}s (predicted {predicted_time:.1f}s)")
 
 if __name__ == "__main__":
     main()
@@ -1,9 +1,21 @@
 #!/usr/bin/env python3
 
 
+import argparse
+import os
+import sys
+import itertools
+import functools
+import io
+from concurrent.futures import ProcessPoolExecutor
 from bitstring import BitArray
 import random
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 #Functions used in multiple vector generation functions-----------------------------------------------------
 def get_verilog_index(start_index=31, end_index=0):
     """
@@ -96,12 +108,13 @@ def generate_int_range(test_case):
 
 #Vector generation functions--------------------------------------------------------------------------------
 
-def extension_vector_gen(vector_per_op, file):
+def extension_vector_gen(vector_per_op, file, rng=random):
     """
     Description: Generates test vectors for the extension.v module
     Parameters:
         vecter_per_op: Number of vectors to produce per opcode
         file: The file to be writing test vectors to
+        rng: random.Random instance to draw from (defaults to the global one)
     returns: 
         N/A
     """
@@ -118,7 +131,7 @@ def extension_vector_gen(vector_per_op, file):
             full_vector = []
 
             #Generate Random instrution field
-            initial_num = random.randint(-2**24, 2**24-1)
+            initial_num = rng.randint(-2**24, 2**24-1)
             instr = BitArray(int = initial_num, length = 25)
             full_vector.append(instr.bin)
 
@@ -209,12 +222,13 @@ def extension_vector_gen(vector_per_op, file):
             write_vec_to_file(full_vector, file)
 
 
-def reduce_vector_gen(vector_per_op, file):
+def reduce_vector_gen(vector_per_op, file, rng=random):
     """
     Description: Generates test vectors for the reduce.v module
     Parameters:
         vecter_per_op: Number of vectors to produce per opcode
         file: The file to be writing test vectors to
+        rng: random.Random instance to draw from (defaults to the global one)
     returns: 
         N/A
     """
@@ -231,7 +245,7 @@ def reduce_vector_gen(vector_per_op, file):
             full_vector = []
 
             #Generate Random instrution field
-            initial_num = random.randint(-2**31, 2**31-1)
+            initial_num = rng.randint(-2**31, 2**31-1)
             base_result = BitArray(int = initial_num, length = 32)
             full_vector.append(base_result.bin)
 
@@ -278,13 +292,14 @@ def reduce_vector_gen(vector_per_op, file):
             write_vec_to_file(full_vector, file)
 
 
-def ALU_vector_gen(vector_per_op, file, test_case="Random"):
+def ALU_vector_gen(vector_per_op, file, test_case="Random", rng=random):
     """
     Description: Generates test vectors for the ALU.v module
     Parameters:
         vecter_per_op: Number of vectors to produce per opcode
         file: The file to be writing test vectors to
         test_case: what range of randomized inputs are to be generated
+        rng: random.Random instance to draw from (defaults to the global one)
     returns: 
         N/A
     """
@@ -311,12 +326,12 @@ def ALU_vector_gen(vector_per_op, file, test_case="Random"):
             
             #shift amount always less than or equal to 31
             if (opCode.bin in shift_codes):
-                initial_num_b = random.randint(0, 31)
+                initial_num_b = rng.randint(0, 31)
                 b = BitArray(uint = initial_num_b, length = 32)
             else:
-                initial_num_b = random.randint(lower_range, upper_range)
+                initial_num_b = rng.randint(lower_range, upper_range)
                 
-            initial_num_a = random.randint(lower_range, upper_range)
+            initial_num_a = rng.randint(lower_range, upper_range)
 
             if (test_case == "High"):
                 a = BitArray(uint = initial_num_a, length = 32)
@@ -462,23 +477,1137 @@ def ALU_vector_gen(vector_per_op, file, test_case="Random"):
             #Write vector to file
             write_vec_to_file(full_vector, file)
 
+#Vectorized (NumPy) vector generation-----------------------------------------------------------------------
+#Same vectors as the BitArray based generators above, computed a whole column at a time
 
-def main():
-    
-    filename = "./reduce_test_vectors.txt"
-    vector_per_op = 200
+MASK_32 = 0xFFFFFFFF
 
-    with open(filename, "w") as file:
-        if ("ALU_test_vectors.txt" in filename):
-            ALU_vector_gen(vector_per_op, file, "Random")
-        
-        if ("ext_unit_test_vectors.txt" in filename):
-            extension_vector_gen(vector_per_op, file)
-        
-        if ("reduce_test_vectors.txt" in filename):
-            reduce_vector_gen(vector_per_op, file)
-    
-    file.close()
+def format_bin_columns(columns):
+    """
+    Description: Formats columns of values as lines of space separated binary fields,
+                 the same text write_vec_to_file produces for each vector
+    Parameters:
+        columns: List of (values, width) pairs, values being an integer array with one entry per vector
+    Returns:
+        The text of all vectors
+    """
+    num_vectors = len(columns[0][0])
+    line_width = sum(width + 1 for values, width in columns)
+    chars = np.empty((num_vectors, line_width), dtype=np.uint8)
+
+    pos = 0
+    for values, width in columns:
+        #MSB first, one ASCII digit per bit
+        value_bytes = np.asarray(values).astype(">u4").view(np.uint8).reshape(num_vectors, 4)
+        bits = np.unpackbits(value_bytes, axis=1)[:, 32 - width:]
+        chars[:, pos:pos + width] = bits + ord("0")
+        chars[:, pos + width] = ord(" ")
+        pos += width + 1
+
+    #Last separator is the end of line
+    chars[:, -1] = ord("\n")
+
+    return chars.tobytes().decode("ascii")
+
+def get_record_layout(widths):
+    """
+    Description: Packs fields into a hex record, MSB first, each field starting on a hex digit and the record
+                 padded to whole 32 bit words
+    Parameters:
+        widths: Width of each field, in record order
+    Returns:
+        record_bits: Width of the record
+        positions: (msb, lsb) bit position of each field in the record
+    """
+    slot_widths = [-(-width // 4) * 4 for width in widths]
+    record_bits = -(-sum(slot_widths) // 32) * 32
+
+    positions = []
+    slot_lsb = sum(slot_widths)
+    for width, slot_width in zip(widths, slot_widths):
+        slot_lsb -= slot_width
+        positions.append((slot_lsb + width - 1, slot_lsb))
+
+    return record_bits, positions
+
+def format_hex_records(columns):
+    """
+    Description: Formats columns of values as packed hex records, one per line, laid out by get_record_layout
+    Parameters:
+        columns: List of (values, width) pairs, values being an integer array with one entry per vector
+    Returns:
+        The text of all records
+    """
+    num_vectors = len(columns[0][0])
+    record_bits, positions = get_record_layout([width for values, width in columns])
+    record_digits = record_bits // 4
+    digits = np.zeros((num_vectors, record_digits), dtype=np.uint8)
+
+    for (values, width), (msb, lsb) in zip(columns, positions):
+        values = np.asarray(values, dtype=np.uint64)
+        for digit_lsb in range(lsb, msb + 1, 4):
+            digits[:, record_digits - 1 - digit_lsb // 4] = (values >> np.uint64(digit_lsb - lsb)) & np.uint64(0xF)
+
+    chars = np.empty((num_vectors, record_digits + 1), dtype=np.uint8)
+    chars[:, :-1] = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)[digits]
+    chars[:, -1] = ord("\n")
+
+    return chars.tobytes().decode("ascii")
+
+def format_columns(columns, fmt="bin"):
+    """
+    Description: Formats columns of values as binary text lines ("bin") or packed hex records ("hex")
+    """
+    if (fmt == "hex"):
+        return format_hex_records(columns)
+    return format_bin_columns(columns)
+
+def generate_operands(rng, lower_range, upper_range, size):
+    """
+    Description: Generates random operands in [lower_range, upper_range], as their 32 bit two's complement
+    Parameters:
+        rng: numpy.random.Generator to draw from
+        lower_range: The lower bound
+        upper_range: The upper bound
+        size: Number of operands
+    Returns:
+        uint64 array of operands (each fits in 32 bits)
+    """
+    values = rng.integers(lower_range, upper_range, size=size, dtype=np.int64, endpoint=True)
+    return values.astype(np.uint64) & np.uint64(MASK_32)
+
+def sign_fill(value, sign_bit, width):
+    """
+    Description: Vectorized sign extension, fills the bits above width with the given sign bit
+    Parameters:
+        value: uint64 array of values, width bits wide
+        sign_bit: uint64 array of the sign bits (0 or 1)
+        width: Width of the values
+    Returns:
+        uint64 array of the 32 bit sign extended values
+    """
+    ext_mask = np.uint64(MASK_32 ^ ((1 << width) - 1))
+    return value | (sign_bit * ext_mask)
+
+def ALU_expected(ALU_control, a, b):
+    """
+    Description: Computes the expected ALU result and flags for arrays of operands
+    Parameters:
+        ALU_control: uint64 array of ALU control codes
+        a: uint64 array of A operands (32 bit)
+        b: uint64 array of B operands (32 bit)
+    Returns:
+        result, negative, zero, carry, overflow: uint64 arrays
+    """
+    mask = np.uint64(MASK_32)
+    shamt = b & np.uint64(31)
+    sum_ab = a + b
+    dif_ab = (a - b) & mask
+    a_signed = a.astype(np.uint32).view(np.int32)
+    b_signed = b.astype(np.uint32).view(np.int32)
+
+    results = [
+        a >> shamt,                                                               #0000 SRL
+        (a_signed >> shamt.astype(np.int32)).view(np.uint32).astype(np.uint64),   #0001 SRA
+        a & b,                                                                    #0010 AND
+        a | b,                                                                    #0011 OR
+        a ^ b,                                                                    #0100 XOR
+        (a_signed < b_signed).astype(np.uint64),                                  #0101 SLT
+        (a < b).astype(np.uint64),                                                #0110 SLTU
+        (a << shamt) & mask,                                                      #0111 SLL
+        sum_ab & mask,                                                            #1000 ADD
+        dif_ab,                                                                   #1001 SUB
+    ]
+    result = np.choose(ALU_control.astype(np.intp), results)
+
+    is_add = ALU_control == 8
+    is_sub = ALU_control == 9
+
+    carry = np.where(is_add, sum_ab >> np.uint64(32), np.where(is_sub, (a >= b).astype(np.uint64), np.uint64(0)))
+
+    #Signed overflow: operands' signs (B's inverted for subtraction) agree and the result's differs
+    add_overflow = ((a ^ result) & (b ^ result)) >> np.uint64(31)
+    sub_overflow = ((a ^ b) & (a ^ result)) >> np.uint64(31)
+    overflow = np.where(is_add, add_overflow, np.where(is_sub, sub_overflow, np.uint64(0))) & np.uint64(1)
+
+    negative = result >> np.uint64(31)
+    zero = (result == 0).astype(np.uint64)
+
+    return result, negative, zero, carry, overflow
+
+def extension_expected(immSrc, instr):
+    """
+    Description: Computes the expected immediates for arrays of instructions
+    Parameters:
+        immSrc: uint64 array of immSrc codes (0: I, 1: S, 2: B, 3: J, 4: U)
+        instr: uint64 array of instruction fields [31:7] (25 bit)
+    Returns:
+        uint64 array of the extended immediates
+    """
+    word = instr << np.uint64(7)
+
+    def field(start_index, end_index):
+        return (word >> np.uint64(end_index)) & np.uint64((1 << (start_index - end_index + 1)) - 1)
+
+    msb = field(31, 31)
+
+    immediates = [
+        sign_fill(field(31, 20), msb, 12),                                                      #I-type
+        sign_fill((field(31, 25) << np.uint64(5)) | field(11, 7), msb, 12),                     #S-type
+        sign_fill((field(7, 7) << np.uint64(11)) | (field(30, 25) << np.uint64(5))
+                  | (field(11, 8) << np.uint64(1)), msb, 12),                                  #B-type
+        sign_fill((field(19, 12) << np.uint64(12)) | (field(20, 20) << np.uint64(11))
+                  | (field(30, 21) << np.uint64(1)), msb, 20),                                 #J-type
+        field(31, 12) << np.uint64(12),                                                         #U-type
+    ]
+
+    return np.choose(immSrc.astype(np.intp), immediates)
+
+def reduce_expected(widthSrc, base_result):
+    """
+    Description: Computes the expected reduce results for arrays of values
+    Parameters:
+        widthSrc: uint64 array of widthSrc codes (000, 001, 010, 101 or 110)
+        base_result: uint64 array of 32 bit values
+    Returns:
+        uint64 array of the reduced values
+    """
+    byte = base_result & np.uint64(0xFF)
+    half = base_result & np.uint64(0xFFFF)
+
+    expected_result = base_result.copy()
+    expected_result = np.where(widthSrc == 1, sign_fill(byte, byte >> np.uint64(7), 8), expected_result)
+    expected_result = np.where(widthSrc == 2, sign_fill(half, half >> np.uint64(15), 16), expected_result)
+    expected_result = np.where(widthSrc == 5, byte, expected_result)
+    expected_result = np.where(widthSrc == 6, half, expected_result)
+
+    return expected_result
+
+def ALU_vectors_np(ALU_control, test_case, rng, fmt="bin"):
+    """
+    Description: Generates the text of ALU test vectors for a column of control codes
+    Parameters:
+        ALU_control: uint64 array with the control code of each vector
+        test_case: what range of randomized inputs are to be generated
+        rng: numpy.random.Generator to draw from
+        fmt: "bin" for binary text lines, "hex" for packed hex records
+    returns:
+        The vectors' text
+    """
+    lower_range, upper_range = generate_int_range(test_case)
+
+    a = generate_operands(rng, lower_range, upper_range, len(ALU_control))
+    b = generate_operands(rng, lower_range, upper_range, len(ALU_control))
+
+    #shift amount always less than or equal to 31
+    is_shift = np.isin(ALU_control, [0, 1, 7])
+    b[is_shift] = generate_operands(rng, 0, 31, int(is_shift.sum()))
+
+    result, negative, zero, carry, overflow = ALU_expected(ALU_control, a, b)
+
+    return format_columns(list(zip([ALU_control, a, b, result, negative, zero, carry, overflow],
+                                   get_field_widths("alu"))), fmt)
+
+def extension_vectors_np(immSrc, rng, fmt="bin"):
+    """
+    Description: Generates the text of extension test vectors for a column of immSrc codes
+    Parameters:
+        immSrc: uint64 array with the immSrc code of each vector
+        rng: numpy.random.Generator to draw from
+        fmt: "bin" for binary text lines, "hex" for packed hex records
+    returns:
+        The vectors' text
+    """
+    instr = generate_operands(rng, -2**24, 2**24-1, len(immSrc)) & np.uint64(2**25 - 1)
+
+    return format_columns(list(zip([instr, immSrc, extension_expected(immSrc, instr)], get_field_widths("ext"))), fmt)
+
+def reduce_vectors_np(widthSrc, rng, fmt="bin"):
+    """
+    Description: Generates the text of reduce test vectors for a column of widthSrc codes
+    Parameters:
+        widthSrc: uint64 array with the widthSrc code of each vector
+        rng: numpy.random.Generator to draw from
+        fmt: "bin" for binary text lines, "hex" for packed hex records
+    returns:
+        The vectors' text
+    """
+    base_result = generate_operands(rng, -2**31, 2**31-1, len(widthSrc))
+
+    return format_columns(list(zip([base_result, widthSrc, reduce_expected(widthSrc, base_result)],
+                                   get_field_widths("reduce"))), fmt)
+
+def ALU_vector_gen_np(vector_per_op, file, test_case="Random", rng=None):
+    """
+    Description: Vectorized ALU_vector_gen
+    Parameters:
+        vecter_per_op: Number of vectors to produce per opcode
+        file: The file to be writing test vectors to
+        test_case: what range of randomized inputs are to be generated
+        rng: numpy.random.Generator to draw from (defaults to a fresh unseeded one)
+    returns:
+        N/A
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    file.write(ALU_vectors_np(get_opcode_column("alu", vector_per_op), test_case, rng))
+
+def extension_vector_gen_np(vector_per_op, file, rng=None):
+    """
+    Description: Vectorized extension_vector_gen
+    Parameters:
+        vecter_per_op: Number of vectors to produce per opcode
+        file: The file to be writing test vectors to
+        rng: numpy.random.Generator to draw from (defaults to a fresh unseeded one)
+    returns:
+        N/A
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    file.write(extension_vectors_np(get_opcode_column("ext", vector_per_op), rng))
+
+def reduce_vector_gen_np(vector_per_op, file, rng=None):
+    """
+    Description: Vectorized reduce_vector_gen
+    Parameters:
+        vecter_per_op: Number of vectors to produce per opcode
+        file: The file to be writing test vectors to
+        rng: numpy.random.Generator to draw from (defaults to a fresh unseeded one)
+    returns:
+        N/A
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    file.write(reduce_vectors_np(get_opcode_column("reduce", vector_per_op), rng))
+
+#Sharded generation-----------------------------------------------------------------------------------------
+
+#Output file and opcodes (in file order) of each target. ALU goes 9 down to 0, as add and sub
+#set the carry and overflow flags, and unused reduce widthSrc codes aren't checked
+#Fields are (name, width), in the order of the text columns and of the packed hex records
+VECTOR_TARGETS = {
+    "alu": {
+        "file": "ALU_test_vectors.txt",
+        "opcodes": list(range(9, -1, -1)),
+        "fields": [("alu_control", 4), ("a", 32), ("b", 32), ("result", 32),
+                   ("neg_flag", 1), ("zero_flag", 1), ("carry_flag", 1), ("v_flag", 1)],
+    },
+    "ext": {
+        "file": "ext_unit_test_vectors.txt",
+        "opcodes": [0, 1, 2, 3, 4],
+        "fields": [("instr", 25), ("imm_src", 3), ("imm_ext", 32)],
+    },
+    "reduce": {
+        "file": "reduce_test_vectors.txt",
+        "opcodes": [0, 1, 2, 5, 6],
+        "fields": [("base_result", 32), ("width_src", 3), ("result", 32)],
+    },
+}
+
+TEST_CASES = ["Random", "High", "Negative", "Zeros"]
+
+#Depth of the testbenches' record arrays, unless compiled with VECTOR_DEPTH
+DEFAULT_VECTOR_DEPTH = 65536
+
+def get_field_widths(target):
+    return [width for name, width in VECTOR_TARGETS[target]["fields"]]
+
+def get_output_name(target, fmt):
+    """
+    Description: Returns the vector file name of a target, .txt for binary text and .hex for packed records
+    """
+    return os.path.splitext(VECTOR_TARGETS[target]["file"])[0] + (".hex" if fmt == "hex" else ".txt")
+
+def render_hex_header(target, num_vectors):
+    """
+    Description: Returns the start of a packed hex vector file: comments describing the record layout,
+                 then record 0, holding the number of vectors that follow
+    """
+    record_bits, positions = get_record_layout(get_field_widths(target))
+    lines = [f"// {get_output_name(target, 'hex')}: {record_bits} bit records, record 0 holds the vector count"]
+    for (name, width), (msb, lsb) in zip(VECTOR_TARGETS[target]["fields"], positions):
+        lines.append(f"// [{msb}:{lsb}] {name}")
+    lines.append(f"{num_vectors:0{record_bits // 4}x}")
+
+    return "\n".join(lines) + "\n"
+
+def format_hex_record(values, widths):
+    """
+    Description: Formats the field values of one vector as a packed hex record (without NumPy)
+    """
+    record_bits, positions = get_record_layout(widths)
+    record = 0
+    for value, (msb, lsb) in zip(values, positions):
+        record |= value << lsb
+
+    return f"{record:0{record_bits // 4}x}\n"
+
+def render_layout_header():
+    """
+    Description: Returns vector_layouts.sv, the record width and field bit ranges of every target as defines,
+                 so the testbenches unpack the records the generator packs
+    """
+    lines = [
+        "//==============================================================//",
+        "//  File:         vector_layouts.sv",
+        "//  Description:  Packed hex vector record layouts. Generated by",
+        "//                scripts/test_vector_generator.py, do not edit.",
+        "//==============================================================//",
+        "",
+        "`ifndef VECTOR_DEPTH",
+        f"`define VECTOR_DEPTH {DEFAULT_VECTOR_DEPTH}",
+        "`endif",
+    ]
+
+    for target, target_info in VECTOR_TARGETS.items():
+        prefix = f"{target.upper()}_VEC"
+        record_bits, positions = get_record_layout(get_field_widths(target))
+        lines.append("")
+        lines.append(f"`define {prefix}_BITS {record_bits}")
+        for (name, width), (msb, lsb) in zip(target_info["fields"], positions):
+            bit_range = f"{msb}:{lsb}" if width > 1 else f"{lsb}"
+            lines.append(f"`define {prefix}_{name.upper()} {bit_range}")
+
+    return "\n".join(lines) + "\n"
+
+def write_layout_header(header_path):
+    """
+    Description: Writes vector_layouts.sv unless it is already up to date, so testbench builds stay cached
+    """
+    content = render_layout_header()
+    if (os.path.isfile(header_path)):
+        with open(header_path) as f:
+            if (f.read() == content):
+                return
+
+    with open(header_path, "w") as f:
+        f.write(content)
+    print(f"updated {header_path}")
+
+#Vectors per shard. Fixed, so the vectors only depend on the seed and not on the number of jobs
+SHARD_SIZE = 65536
+
+def get_opcode_column(target, vector_per_op):
+    """
+    Description: Returns the opcode of every vector of a target, in file order
+    """
+    return np.repeat(np.array(VECTOR_TARGETS[target]["opcodes"], dtype=np.uint64), vector_per_op)
+
+def get_vector_shards(target, test_case, vector_per_op, seed):
+    """
+    Description: Splits a target's vectors into shards of SHARD_SIZE vectors, each with its own seed
+    Parameters:
+        target: Key of VECTOR_TARGETS
+        test_case: Range of the ALU operands (ignored for other targets)
+        vector_per_op: Number of vectors to produce per opcode
+        seed: Seed of the whole run
+    Returns:
+        Iterator of (target, test_case, opcodes, shard_seed) tuples, in file order. The shard's seed is derived
+        from the run's seed, target, test case and shard index, so every shard is reproducible on its own.
+        Shards are built as they are consumed, so memory doesn't grow with the vector count
+    """
+    opcodes = np.array(VECTOR_TARGETS[target]["opcodes"], dtype=np.uint64)
+    target_idx = list(VECTOR_TARGETS).index(target)
+    case_idx = TEST_CASES.index(test_case)
+
+    for shard_idx, start in enumerate(range(0, len(opcodes) * vector_per_op, SHARD_SIZE)):
+        stop = min(start + SHARD_SIZE, len(opcodes) * vector_per_op)
+        shard_seed = np.random.SeedSequence([seed, target_idx, case_idx, shard_idx])
+        yield (target, test_case, opcodes[np.arange(start, stop) // vector_per_op], shard_seed)
+
+def generate_shard(shard, fmt="bin"):
+    """
+    Description: Process pool worker, returns the text of a shard from get_vector_shards
+    """
+    target, test_case, opcodes, shard_seed = shard
+    rng = np.random.default_rng(shard_seed)
+
+    if (target == "alu"):
+        return ALU_vectors_np(opcodes, test_case, rng, fmt)
+    elif (target == "ext"):
+        return extension_vectors_np(opcodes, rng, fmt)
+    else:
+        return reduce_vectors_np(opcodes, rng, fmt)
+
+def generate_target(target, test_cases, vector_per_op, seed, file, executor=None, jobs=1, fmt="bin"):
+    """
+    Description: Writes all vectors of a target, generating its shards in parallel when given an executor
+    Parameters:
+        target: Key of VECTOR_TARGETS
+        test_cases: ALU operand ranges, written one after the other (other targets only use the first)
+        vector_per_op: Number of vectors to produce per opcode (per test case)
+        seed: Seed of the whole run
+        file: The file to be writing test vectors to
+        executor: Optional concurrent.futures executor
+        jobs: Number of workers of the executor, at most 2 * jobs shards are in flight at once
+        fmt: "bin" for binary text lines, "hex" for packed hex records (after a layout header)
+    returns:
+        N/A
+    """
+    if (target != "alu"):
+        test_cases = test_cases[:1]
+
+    if (fmt == "hex"):
+        file.write(render_hex_header(target, len(VECTOR_TARGETS[target]["opcodes"]) * vector_per_op * len(test_cases)))
+
+    shards = itertools.chain.from_iterable(get_vector_shards(target, test_case, vector_per_op, seed)
+                                           for test_case in test_cases)
+    shard_func = functools.partial(generate_shard, fmt=fmt)
+
+    if (executor is None):
+        for shard in shards:
+            file.write(shard_func(shard))
+        return
+
+    #map keeps the shards in order, whichever finishes first. Batches bound the memory of pending shards
+    #when the file is a slow reader (e.g. a FIFO feeding a simulation)
+    while True:
+        batch = list(itertools.islice(shards, 2 * jobs))
+        if (not batch):
+            break
+        for shard_text in executor.map(shard_func, batch):
+            file.write(shard_text)
+
+def generate_target_bitarray(target, test_cases, vector_per_op, rng, file, fmt="bin"):
+    """
+    Description: Writes all vectors of a target with the BitArray generators, for when NumPy isn't installed
+    Parameters:
+        target: Key of VECTOR_TARGETS
+        test_cases: ALU operand ranges, written one after the other (other targets only use the first)
+        vector_per_op: Number of vectors to produce per opcode (per test case)
+        rng: random.Random to draw from
+        file: The file to be writing test vectors to
+        fmt: "bin" for binary text lines, "hex" for packed hex records (after a layout header)
+    returns:
+        N/A
+    """
+    #Hex records are converted from the text lines
+    text_file = io.StringIO() if fmt == "hex" else file
+
+    if (target == "alu"):
+        for test_case in test_cases:
+            ALU_vector_gen(vector_per_op, text_file, test_case, rng)
+    elif (target == "ext"):
+        extension_vector_gen(vector_per_op, text_file, rng)
+    else:
+        reduce_vector_gen(vector_per_op, text_file, rng)
+
+    if (fmt == "hex"):
+        lines = text_file.getvalue().splitlines()
+        widths = get_field_widths(target)
+        file.write(render_hex_header(target, len(lines)))
+        for line in lines:
+            file.write(format_hex_record([int(field, 2) for field in line.split()], widths))
+
+
+#Coverage-directed generation-------------------------------------------------------------------------------
+#Functional coverage bins per opcode. Each bin is (name, predicate, directed): the predicate flags the vectors
+#(a dict of field columns, named as in VECTOR_TARGETS) that hit the bin, and directed(rng, n) draws n operands
+#aimed at it. Hits are always counted with the predicate, so a directed draw only counts if it really hits
+
+SIGN_BIT = 1 << 31
+
+#Names of the opcodes in the coverage report
+OPCODE_NAMES = {
+    "alu":    {0: "SRL", 1: "SRA", 2: "AND", 3: "OR", 4: "XOR", 5: "SLT", 6: "SLTU", 7: "SLL", 8: "ADD", 9: "SUB"},
+    "ext":    {0: "I-type", 1: "S-type", 2: "B-type", 3: "J-type", 4: "U-type"},
+    "reduce": {0: "word", 1: "byte", 2: "half", 5: "byte unsigned", 6: "half unsigned"},
+}
+
+#Instruction bits [31:7] holding each immSrc type's immediate, as a full instruction word mask
+IMM_FIELD_MASKS = {0: 0xFFF00000, 1: 0xFE000F80, 2: 0xFE000F80, 3: 0xFFFFF000, 4: 0xFFFFF000}
+
+def rand_words(rng, n, lower_range=0, upper_range=MASK_32):
+    """
+    Description: Draws n unsigned values in [lower_range, upper_range] as a uint64 array
+    """
+    return rng.integers(lower_range, upper_range, size=n, dtype=np.uint64, endpoint=True)
+
+def to_signed(values):
+    return values.astype(np.uint32).view(np.int32)
+
+def ALU_coverage_bins():
+    """
+    Description: Returns the ALU coverage bins, {ALU_control: [(name, predicate, directed)]}.
+                 Directed draws return (a, b)
+    """
+    mask = np.uint64(MASK_32)
+    sign = np.uint64(SIGN_BIT)
+
+    def operand_pair(lower_a, upper_a, lower_b, upper_b):
+        return lambda rng, n: (rand_words(rng, n, lower_a, upper_a), rand_words(rng, n, lower_b, upper_b))
+
+    def ordered_pair(signed, less):
+        #Two random operands, ordered so that a < b (or a > b)
+        def directed(rng, n):
+            x, y = rand_words(rng, n), rand_words(rng, n)
+            x_less = to_signed(x) < to_signed(y) if signed else x < y
+            swap = x_less != less
+            return np.where(swap, y, x), np.where(swap, x, y)
+        return directed
+
+    def carry_pair(rng, n):
+        a = rand_words(rng, n, SIGN_BIT, MASK_32)
+        return a, (np.uint64(2**32) - a) + rng.integers(0, a, dtype=np.uint64)
+
+    def sum_pair(total, lower_a, upper_a):
+        #Operands adding up to total exactly
+        def directed(rng, n):
+            a = rand_words(rng, n, lower_a, upper_a)
+            return a, (np.uint64(total) - a) & mask
+        return directed
+
+    def equal_pair(rng, n):
+        a = rand_words(rng, n)
+        return a, a.copy()
+
+    def sign_differs_pair(rng, n):
+        a = rand_words(rng, n)
+        return a, (rand_words(rng, n) & ~sign) | (~a & sign)
+
+    bins = {
+        8: [
+            ("carry",               lambda v: v["carry_flag"] == 1, carry_pair),
+            ("carry_to_zero",       lambda v: (v["carry_flag"] == 1) & (v["zero_flag"] == 1), sum_pair(2**32, 1, MASK_32)),
+            ("max_without_carry",   lambda v: (v["carry_flag"] == 0) & (v["result"] == mask), sum_pair(MASK_32, 0, MASK_32)),
+            ("overflow_positive",   lambda v: (v["v_flag"] == 1) & (v["neg_flag"] == 1),
+                                    operand_pair(2**30, SIGN_BIT - 1, 2**30, SIGN_BIT - 1)),
+            ("overflow_negative",   lambda v: (v["v_flag"] == 1) & (v["neg_flag"] == 0),
+                                    operand_pair(SIGN_BIT, SIGN_BIT + 2**30 - 1, SIGN_BIT, SIGN_BIT + 2**30 - 1)),
+            ("overflow_boundary",   lambda v: (v["v_flag"] == 1) & (v["result"] == sign),
+                                    sum_pair(SIGN_BIT, 1, SIGN_BIT - 1)),
+        ],
+        9: [
+            ("borrow",              lambda v: v["carry_flag"] == 0, ordered_pair(False, True)),
+            ("no_borrow",           lambda v: (v["carry_flag"] == 1) & (v["zero_flag"] == 0), ordered_pair(False, False)),
+            ("equal_operands",      lambda v: v["a"] == v["b"], equal_pair),
+            ("overflow_positive",   lambda v: (v["v_flag"] == 1) & (v["neg_flag"] == 1),
+                                    operand_pair(2**30, SIGN_BIT - 1, SIGN_BIT, SIGN_BIT + 2**30)),
+            ("overflow_negative",   lambda v: (v["v_flag"] == 1) & (v["neg_flag"] == 0),
+                                    operand_pair(SIGN_BIT, SIGN_BIT + 2**30 - 1, 2**30, SIGN_BIT - 1)),
+            ("min_negative_b",      lambda v: v["b"] == sign, operand_pair(0, MASK_32, SIGN_BIT, SIGN_BIT)),
+        ],
+        5: [
+            ("less",                lambda v: v["result"] == 1, ordered_pair(True, True)),
+            ("greater",             lambda v: (v["result"] == 0) & (v["a"] != v["b"]), ordered_pair(True, False)),
+            ("equal_operands",      lambda v: v["a"] == v["b"], equal_pair),
+            ("negative_vs_positive", lambda v: (v["a"] >= sign) & (v["b"] < sign),
+                                    operand_pair(SIGN_BIT, MASK_32, 0, SIGN_BIT - 1)),
+            ("positive_vs_negative", lambda v: (v["a"] < sign) & (v["b"] >= sign),
+                                    operand_pair(0, SIGN_BIT - 1, SIGN_BIT, MASK_32)),
+        ],
+        6: [
+            ("less",                lambda v: v["result"] == 1, ordered_pair(False, True)),
+            ("greater",             lambda v: (v["result"] == 0) & (v["a"] != v["b"]), ordered_pair(False, False)),
+            ("equal_operands",      lambda v: v["a"] == v["b"], equal_pair),
+            ("sign_bits_differ",    lambda v: ((v["a"] ^ v["b"]) & sign) != 0, sign_differs_pair),
+        ],
+    }
+
+    #Shift amounts stay within 0 to 31, as in the uniform vectors
+    for ALU_control in [0, 1, 7]:
+        bins[ALU_control] = [
+            ("shift_by_0",          lambda v: v["b"] == 0, operand_pair(0, MASK_32, 0, 0)),
+            ("shift_by_31",         lambda v: v["b"] == 31, operand_pair(0, MASK_32, 31, 31)),
+            ("negative_operand",    lambda v: (v["a"] >= sign) & (v["b"] != 0), operand_pair(SIGN_BIT, MASK_32, 1, 31)),
+        ]
+
+    def logic_bins(zero_pair, ones_pair, negative_pair):
+        return [
+            ("zero_result",         lambda v: v["zero_flag"] == 1, zero_pair),
+            ("all_ones_result",     lambda v: v["result"] == mask, ones_pair),
+            ("negative_result",     lambda v: v["neg_flag"] == 1, negative_pair),
+        ]
+
+    def disjoint_pair(rng, n):
+        a = rand_words(rng, n)
+        return a, rand_words(rng, n) & ~a
+
+    def covering_pair(rng, n):
+        a = rand_words(rng, n)
+        return a, (rand_words(rng, n) | ~a) & mask
+
+    def complement_pair(rng, n):
+        a = rand_words(rng, n)
+        return a, ~a & mask
+
+    bins[2] = logic_bins(disjoint_pair, operand_pair(MASK_32, MASK_32, MASK_32, MASK_32),
+                         operand_pair(SIGN_BIT, MASK_32, SIGN_BIT, MASK_32))
+    bins[3] = logic_bins(operand_pair(0, 0, 0, 0), covering_pair, operand_pair(SIGN_BIT, MASK_32, 0, MASK_32))
+    bins[4] = logic_bins(equal_pair, complement_pair, operand_pair(SIGN_BIT, MASK_32, 0, SIGN_BIT - 1))
+
+    return bins
+
+def extension_coverage_bins():
+    """
+    Description: Returns the extension coverage bins, {immSrc: [(name, predicate, directed)]}.
+                 Directed draws return (instr,), instruction bits [31:7]
+    """
+    bins = {}
+    for immSrc, field_mask in IMM_FIELD_MASKS.items():
+        field_mask = np.uint64(field_mask)
+        sign = np.uint64(SIGN_BIT)
+
+        def imm_pattern(pattern, field_mask=field_mask):
+            #Random instructions with the immediate's bits set to pattern
+            def directed(rng, n):
+                word = (rand_words(rng, n) & ~field_mask) | (np.uint64(pattern) & field_mask)
+                return (word >> np.uint64(7),)
+            return directed
+
+        def imm_equals(pattern, immSrc=immSrc, field_mask=field_mask):
+            expected = extension_expected(np.array([immSrc], dtype=np.uint64),
+                                          np.array([(pattern & int(field_mask)) >> 7], dtype=np.uint64))[0]
+            return lambda v: v["imm_ext"] == expected
+
+        bins[immSrc] = [
+            ("sign_clear",          lambda v: v["imm_ext"] < sign, imm_pattern(0)),
+            ("sign_set",            lambda v: v["imm_ext"] >= sign, imm_pattern(SIGN_BIT)),
+            ("zero",                imm_equals(0), imm_pattern(0)),
+            ("all_ones",            imm_equals(MASK_32), imm_pattern(MASK_32)),
+            ("max_positive",        imm_equals(MASK_32 ^ SIGN_BIT), imm_pattern(MASK_32 ^ SIGN_BIT)),
+            ("min_negative",        imm_equals(SIGN_BIT), imm_pattern(SIGN_BIT)),
+        ]
+
+    return bins
+
+def reduce_coverage_bins():
+    """
+    Description: Returns the reduce coverage bins, {widthSrc: [(name, predicate, directed)]}.
+                 Directed draws return (base_result,)
+    """
+    def base_pattern(width, upper, low):
+        #Random values with the bits above width set to upper (None: random) and the low width bits set to low
+        def directed(rng, n):
+            base = rand_words(rng, n)
+            if (upper is not None):
+                base = (base & np.uint64((1 << width) - 1)) | np.uint64(upper & (MASK_32 ^ ((1 << width) - 1)))
+            if (low is not None):
+                base = (base & ~np.uint64((1 << width) - 1)) | np.uint64(low)
+            return (base,)
+        return directed
+
+    def sign_directed(width, sign_set, upper=None):
+        #Random low bits with the sign bit of the width forced
+        def directed(rng, n):
+            (base,) = base_pattern(width, upper, None)(rng, n)
+            sign = np.uint64(1 << (width - 1))
+            return (base | sign if sign_set else base & ~sign,)
+        return directed
+
+    def field(v, width):
+        return v["base_result"] & np.uint64((1 << width) - 1)
+
+    def upper(v, width):
+        return v["base_result"] >> np.uint64(width)
+
+    def signed_bins(width):
+        sign = np.uint64(1 << (width - 1))
+        upper_ones = np.uint64(MASK_32 >> width)
+        return [
+            ("sign_set",                lambda v: (field(v, width) & sign) != 0, sign_directed(width, True)),
+            ("sign_clear",              lambda v: (field(v, width) & sign) == 0, sign_directed(width, False)),
+            ("sign_set_upper_zeros",    lambda v: ((field(v, width) & sign) != 0) & (upper(v, width) == 0),
+                                        sign_directed(width, True, 0)),
+            ("sign_clear_upper_ones",   lambda v: ((field(v, width) & sign) == 0) & (upper(v, width) == upper_ones),
+                                        sign_directed(width, False, MASK_32)),
+            ("min_negative",            lambda v: field(v, width) == sign, base_pattern(width, None, 1 << (width - 1))),
+            ("max_positive",            lambda v: field(v, width) == sign - np.uint64(1),
+                                        base_pattern(width, None, (1 << (width - 1)) - 1)),
+        ]
+
+    def unsigned_bins(width):
+        sign = np.uint64(1 << (width - 1))
+        upper_ones = np.uint64(MASK_32 >> width)
+        return [
+            ("top_bit_set",             lambda v: (field(v, width) & sign) != 0, sign_directed(width, True)),
+            ("upper_ones",              lambda v: upper(v, width) == upper_ones, base_pattern(width, MASK_32, None)),
+            ("zero",                    lambda v: field(v, width) == 0, base_pattern(width, None, 0)),
+        ]
+
+    return {
+        0: [
+            ("negative",                lambda v: v["base_result"] >= np.uint64(SIGN_BIT), sign_directed(32, True)),
+            ("positive",                lambda v: v["base_result"] < np.uint64(SIGN_BIT), sign_directed(32, False)),
+        ],
+        1: signed_bins(8),
+        2: signed_bins(16),
+        5: unsigned_bins(8),
+        6: unsigned_bins(16),
+    }
+
+#Coverage bins, opcode field and operand fields of each target
+COVERAGE_TARGETS = {
+    "alu":    {"bins": ALU_coverage_bins,       "opcode": "alu_control", "operands": ["a", "b"]},
+    "ext":    {"bins": extension_coverage_bins, "opcode": "imm_src",     "operands": ["instr"]},
+    "reduce": {"bins": reduce_coverage_bins,    "opcode": "width_src",   "operands": ["base_result"]},
+}
+
+def draw_uniform_operands(target, opcodes, test_case, rng):
+    """
+    Description: Draws operands the way the uniform generators do, as a dict of operand columns
+    """
+    if (target == "alu"):
+        lower_range, upper_range = generate_int_range(test_case)
+        a = generate_operands(rng, lower_range, upper_range, len(opcodes))
+        b = generate_operands(rng, lower_range, upper_range, len(opcodes))
+        is_shift = np.isin(opcodes, [0, 1, 7])
+        b[is_shift] = generate_operands(rng, 0, 31, int(is_shift.sum()))
+        return {"a": a, "b": b}
+    elif (target == "ext"):
+        return {"instr": generate_operands(rng, -2**24, 2**24-1, len(opcodes)) & np.uint64(2**25 - 1)}
+    else:
+        return {"base_result": generate_operands(rng, -2**31, 2**31-1, len(opcodes))}
+
+def evaluate_vectors(target, opcodes, operands):
+    """
+    Description: Computes the expected results of vectors
+    Parameters:
+        target: Key of VECTOR_TARGETS
+        opcodes: uint64 array with the opcode of each vector
+        operands: dict of operand columns, as drawn for the target
+    Returns:
+        dict with a column per field of the target (named as in VECTOR_TARGETS)
+    """
+    if (target == "alu"):
+        result, negative, zero, carry, overflow = ALU_expected(opcodes, operands["a"], operands["b"])
+        return {"alu_control": opcodes, "a": operands["a"], "b": operands["b"], "result": result,
+                "neg_flag": negative, "zero_flag": zero, "carry_flag": carry, "v_flag": overflow}
+    elif (target == "ext"):
+        return {"instr": operands["instr"], "imm_src": opcodes, "imm_ext": extension_expected(opcodes, operands["instr"])}
+    else:
+        return {"base_result": operands["base_result"], "width_src": opcodes,
+                "result": reduce_expected(opcodes, operands["base_result"])}
+
+def sample_coverage(target, bins, columns, hits):
+    """
+    Description: Adds the bin hits of vectors to hits, {opcode: {bin name: count}}
+    """
+    opcode_column = columns[COVERAGE_TARGETS[target]["opcode"]]
+    for opcode, opcode_bins in bins.items():
+        is_opcode = opcode_column == opcode
+        if (not is_opcode.any()):
+            continue
+        opcode_vectors = {name: column[is_opcode] for name, column in columns.items()}
+        for bin_name, predicate, directed in opcode_bins:
+            hits[opcode][bin_name] += int(np.count_nonzero(predicate(opcode_vectors)))
+
+def get_covered_fraction(hits, bin_hits):
+    """
+    Description: Fraction of bins hit at least bin_hits times
+    """
+    counts = [count for opcode_hits in hits.values() for count in opcode_hits.values()]
+    return sum(count >= bin_hits for count in counts) / len(counts)
+
+def new_coverage_hits(bins):
+    return {opcode: {bin_name: 0 for bin_name, predicate, directed in opcode_bins} for opcode, opcode_bins in bins.items()}
+
+def generate_coverage_vectors(target, seed, max_per_op, coverage_target=1.0, bin_hits=1, test_cases=("Random",),
+                              explore_per_op=4):
+    """
+    Description: Generates vectors until coverage_target of the target's bins are hit bin_hits times. Every round
+                 draws explore_per_op uniform vectors per opcode, plus directed vectors for each bin still short
+                 of bin_hits, so generation is biased toward the unhit bins
+    Parameters:
+        target: Key of VECTOR_TARGETS
+        seed: Seed of the whole run
+        max_per_op: Stop once this many vectors per opcode were generated, even if the target isn't met
+        coverage_target: Fraction of bins to hit
+        bin_hits: Hits needed for a bin to count as covered
+        test_cases: Ranges of the uniform ALU operands. Each one is covered on its own, and its vectors written
+                    after the previous one's (other targets only use the first)
+        explore_per_op: Uniform vectors drawn per opcode every round
+    Returns:
+        columns: dict with a column per field of the target, the vectors in generation order
+        hits: {opcode: {bin name: count}}, summed over the test cases
+    """
+    bins = COVERAGE_TARGETS[target]["bins"]()
+    operand_names = COVERAGE_TARGETS[target]["operands"]
+    target_idx = list(VECTOR_TARGETS).index(target)
+    if (target != "alu"):
+        test_cases = test_cases[:1]
+
+    hits = new_coverage_hits(bins)
+    rounds = []
+    max_vectors = max_per_op * len(bins)
+
+    for test_case in test_cases:
+        rng = np.random.default_rng(np.random.SeedSequence([seed, target_idx, len(TEST_CASES), TEST_CASES.index(test_case)]))
+        case_hits = new_coverage_hits(bins)
+        num_vectors = 0
+
+        while (get_covered_fraction(case_hits, bin_hits) < coverage_target and num_vectors < max_vectors):
+            opcode_parts = []
+            operand_parts = {name: [] for name in operand_names}
+
+            for opcode, opcode_bins in bins.items():
+                opcodes = np.full(explore_per_op, opcode, dtype=np.uint64)
+                for name, column in draw_uniform_operands(target, opcodes, test_case, rng).items():
+                    operand_parts[name].append(column)
+                opcode_parts.append(opcodes)
+
+                for bin_name, predicate, directed in opcode_bins:
+                    needed = bin_hits - case_hits[opcode][bin_name]
+                    if (needed <= 0):
+                        continue
+                    for name, column in zip(operand_names, directed(rng, needed)):
+                        operand_parts[name].append(column)
+                    opcode_parts.append(np.full(needed, opcode, dtype=np.uint64))
+
+            #The last round is cut short at max_vectors
+            round_size = min(sum(len(part) for part in opcode_parts), max_vectors - num_vectors)
+            opcodes = np.concatenate(opcode_parts)[:round_size]
+            operands = {name: np.concatenate(parts)[:round_size] for name, parts in operand_parts.items()}
+            columns = evaluate_vectors(target, opcodes, operands)
+            sample_coverage(target, bins, columns, case_hits)
+            rounds.append(columns)
+            num_vectors += len(opcodes)
+
+        for opcode, opcode_hits in case_hits.items():
+            for bin_name, count in opcode_hits.items():
+                hits[opcode][bin_name] += count
+
+    #No round runs when the target is already met (e.g. a target of 0)
+    if (not rounds):
+        return {name: np.zeros(0, dtype=np.uint64) for name, width in VECTOR_TARGETS[target]["fields"]}, hits
+
+    columns = {name: np.concatenate([round_columns[name] for round_columns in rounds]) for name in rounds[0]}
+
+    return columns, hits
+
+def get_uniform_coverage(target, seed, vector_per_op, test_cases=("Random",)):
+    """
+    Description: Coverage of vector_per_op uniform vectors per opcode and test case, what a plain run generates
+    Returns:
+        hits: {opcode: {bin name: count}}
+        num_vectors: Number of uniform vectors
+    """
+    bins = COVERAGE_TARGETS[target]["bins"]()
+    hits = new_coverage_hits(bins)
+    if (target != "alu"):
+        test_cases = test_cases[:1]
+
+    num_vectors = 0
+    for test_case in test_cases:
+        for shard in get_vector_shards(target, test_case, vector_per_op, seed):
+            shard_target, shard_test_case, opcodes, shard_seed = shard
+            rng = np.random.default_rng(shard_seed)
+            operands = draw_uniform_operands(target, opcodes, test_case, rng)
+            sample_coverage(target, bins, evaluate_vectors(target, opcodes, operands), hits)
+            num_vectors += len(opcodes)
+
+    return hits, num_vectors
+
+def render_coverage_report(results, seed, coverage_target, bin_hits):
+    """
+    Description: Formats the coverage of each target, compared to uniform vectors, and the hits of every bin
+    Parameters:
+        results: {target: {"vectors", "hits", "uniform_vectors", "uniform_hits"}}
+        seed: Seed of the run
+        coverage_target: Fraction of bins targeted
+        bin_hits: Hits needed for a bin to count as covered
+    Returns:
+        The report's text
+    """
+    def summary(hits):
+        counts = [count for opcode_hits in hits.values() for count in opcode_hits.values()]
+        covered = sum(count >= bin_hits for count in counts)
+        return f"{covered}/{len(counts)} bins ({100 * covered / len(counts):.1f}%)"
+
+    lines = [f"Coverage report (seed {seed}, target {100 * coverage_target:.1f}%, {bin_hits} hit(s) per bin)", ""]
+    for target, result in results.items():
+        lines.append(f"{target}: {summary(result['hits'])} with {result['vectors']} vectors, "
+                     f"uniform: {summary(result['uniform_hits'])} with {result['uniform_vectors']} vectors")
+
+    for target, result in results.items():
+        lines.append("")
+        lines.append(f"{target}:")
+        opcode_width = dict(VECTOR_TARGETS[target]["fields"])[COVERAGE_TARGETS[target]["opcode"]]
+        for opcode, opcode_hits in result["hits"].items():
+            lines.append(f"  {OPCODE_NAMES[target][opcode]} ({opcode:0{opcode_width}b})")
+            for bin_name, count in opcode_hits.items():
+                uniform_count = result["uniform_hits"][opcode][bin_name]
+                marker = "" if count >= bin_hits else "  <- not covered"
+                lines.append(f"    {bin_name:<24}{count:>8}  (uniform {uniform_count}){marker}")
+
+    return "\n".join(lines) + "\n"
+
+
+def write_coverage_target(target, columns, file, fmt="bin"):
+    """
+    Description: Writes the vectors of generate_coverage_vectors in the target's file format
+    """
+    num_vectors = len(columns[COVERAGE_TARGETS[target]["opcode"]])
+    if (fmt == "hex"):
+        file.write(render_hex_header(target, num_vectors))
+    file.write(format_columns([(columns[name], width) for name, width in VECTOR_TARGETS[target]["fields"]], fmt))
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Generate test vectors for the ALU, imm_extend and reduce module testbenches"
+    )
+
+    parser.add_argument(
+        "-t", "--targets",
+        nargs="+",
+        choices=list(VECTOR_TARGETS.keys()),
+        default=list(VECTOR_TARGETS.keys()),
+        help="Vector files to generate (default: all)"
+    )
+
+    parser.add_argument(
+        "--test_cases",
+        nargs="+",
+        choices=TEST_CASES,
+        default=["Random"],
+        help="ALU operand ranges, written one after the other, each covered on its own with --coverage (default: Random)"
+    )
+
+    parser.add_argument(
+        "-n", "--count",
+        type=int,
+        default=200,
+        help="Number of vectors per opcode (default: 200)"
+    )
+
+    parser.add_argument(
+        "-s", "--seed",
+        type=int,
+        default=argparse.SUPPRESS,
+        help="Seed to generate from, the same seed and count always give the same vectors (default: random, printed)"
+    )
+
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of processes generating shards (default: number of CPU cores)"
+    )
+
+    parser.add_argument(
+        "-o", "--output_dir",
+        type=str,
+        default=argparse.SUPPRESS,
+        help="Directory to write vector files to (default: ../test_inputs/vectors)"
+    )
+
+    parser.add_argument(
+        "-f", "--format",
+        choices=["hex", "txt"],
+        default="hex",
+        help="hex: packed records the testbenches load with $readmemh, txt: binary text lines the testbenches "
+             "read with $fscanf, as streamed through --output_file (default: hex)"
+    )
+
+    parser.add_argument(
+        "--coverage",
+        action="store_true",
+        help="Generate vectors biased toward unhit functional coverage bins until --coverage_target is met, "
+             "and write coverage_report.txt. --count then caps the vectors per opcode"
+    )
+
+    parser.add_argument(
+        "--coverage_target",
+        type=float,
+        default=1.0,
+        help="Fraction of coverage bins to hit in --coverage mode (default: 1.0)"
+    )
+
+    parser.add_argument(
+        "--bin_hits",
+        type=int,
+        default=1,
+        help="Hits needed for a coverage bin to count as covered (default: 1)"
+    )
+
+    parser.add_argument(
+        "--output_file",
+        type=str,
+        default=argparse.SUPPRESS,
+        help="Write the vectors of a single target to this path instead, e.g. a FIFO a testbench is reading from"
+    )
+
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    fmt = "hex" if args.format == "hex" else "bin"
+
+    if (args.coverage and not 0 < args.coverage_target <= 1):
+        print("ERROR: --coverage_target must be in (0, 1]")
+        sys.exit(1)
+    if (args.coverage and args.count < 1):
+        print("ERROR: --count must be at least 1 with --coverage")
+        sys.exit(1)
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    if (not hasattr(args, "output_dir")):
+        output_dir = os.path.abspath(f"{script_dir}/../test_inputs/vectors")
+    else:
+        output_dir = args.output_dir
+
+    if (not hasattr(args, "output_file")):
+        os.makedirs(output_dir, exist_ok=True)
+        output_paths = {target: f"{output_dir}/{get_output_name(target, fmt)}" for target in args.targets}
+    elif (len(args.targets) == 1):
+        output_paths = {args.targets[0]: args.output_file}
+    else:
+        print("ERROR: --output_file takes exactly one target")
+        sys.exit(1)
+
+    if (fmt == "hex"):
+        write_layout_header(os.path.abspath(f"{script_dir}/../tb/common/vector_layouts.sv"))
+
+    if (not hasattr(args, "seed")):
+        seed = random.SystemRandom().randrange(2**32)
+    else:
+        seed = args.seed
+    print(f"seed: {seed}", flush=True)
+
+    if (args.coverage):
+        if (np is None):
+            print("ERROR: --coverage requires NumPy")
+            sys.exit(1)
+
+        results = {}
+        for target in args.targets:
+            columns, hits = generate_coverage_vectors(target, seed, args.count, args.coverage_target, args.bin_hits,
+                                                      args.test_cases)
+            with open(output_paths[target], "w") as file:
+                write_coverage_target(target, columns, file, fmt)
+            uniform_hits, uniform_vectors = get_uniform_coverage(target, seed, args.count, args.test_cases)
+            results[target] = {
+                "vectors": len(columns[COVERAGE_TARGETS[target]["opcode"]]),
+                "hits": hits,
+                "uniform_vectors": uniform_vectors,
+                "uniform_hits": uniform_hits,
+            }
+
+        report = render_coverage_report(results, seed, args.coverage_target, args.bin_hits)
+        report_dir = os.path.dirname(os.path.abspath(args.output_file)) if hasattr(args, "output_file") else output_dir
+        with open(f"{report_dir}/coverage_report.txt", "w") as f:
+            f.write(report)
+        print(report.split("\n\n")[1])
+        return
+
+    try:
+        #Without NumPy, fall back to the BitArray generators in this process (reproducible, but not the same vectors)
+        if (np is None):
+            rng = random.Random(seed)
+            for target in args.targets:
+                with open(output_paths[target], "w") as file:
+                    generate_target_bitarray(target, args.test_cases, args.count, rng, file, fmt)
+            return
+
+        executor = ProcessPoolExecutor(max_workers=args.jobs) if args.jobs > 1 else None
+        try:
+            for target in args.targets:
+                with open(output_paths[target], "w") as file:
+                    generate_target(target, args.test_cases, args.count, seed, file, executor, args.jobs, fmt)
+        finally:
+            if (executor is not None):
+                executor.shutdown(cancel_futures=True)
+    except BrokenPipeError:
+        #The reader of a FIFO exited early (e.g. a testbench stopping at its first mismatch)
+        print("Vector reader closed the output early")
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -1,11 +1,85 @@
 task automatic dump_setup;
+  string dump_file;
   begin
+    if ($value$plusargs("dump_file=%s", dump_file)) begin
+      $display("Dumping VCD to: %s", dump_file);
+      $dumpfile(dump_file);
+    end else begin
     `ifdef DUMP_FILE
       $display("Dumping VCD to: %s", `DUMP_FILE);
       $dumpfile(`DUMP_FILE);
     `else
       $display("Unable to dump VCD\nPlease supply a DUMP_FILE");
     `endif
+    end
     $dumpvars;
   end
 endtask
+
+// Output directory for simulation dumps, +dump_path=<dir> takes precedence over DUMP_PATH
+function automatic string get_dump_path;
+  string dump_path;
+  begin
+    if (!$value$plusargs("dump_path=%s", dump_path)) begin
+    `ifdef DUMP_PATH
+      dump_path = `DUMP_PATH;
+    `else
+      dump_path = ".";
+    `endif
+    end
+    return dump_path;
+  end
+endfunction
+
+// Streamed test vector file, +vector_file=<path> (e.g. a FIFO fed by the vector generator).
+// Returns 0 when no stream is given
+function automatic bit get_vector_file(output string vector_file);
+  begin
+    return $value$plusargs("vector_file=%s", vector_file);
+  end
+endfunction
+
+// Packed hex vector image, +vector_hex=<path> takes precedence over default_path.
+// Returns 0 when +vector_file streams text vectors instead, or when the image doesn't exist
+function automatic bit get_vector_hex(input string default_path, output string vector_hex);
+  string vector_file;
+  int fd;
+  begin
+    if ($value$plusargs("vector_file=%s", vector_file)) begin
+      return 0;
+    end
+    if (!$value$plusargs("vector_hex=%s", vector_hex)) begin
+      vector_hex = default_path;
+    end
+    fd = $fopen(vector_hex, "r");
+    if (fd == 0) begin
+      return 0;
+    end
+    $fclose(fd);
+    return 1;
+  end
+endfunction
+
+// Number of vectors in a packed hex vector image: record 0, after the "//" layout header.
+// Returns -1 when the image can't be read, so the records can be loaded with exact $readmemh bounds
+function automatic int read_vector_count(input string vector_hex);
+  string line;
+  int fd;
+  int vector_cnt;
+  begin
+    vector_cnt = -1;
+    fd = $fopen(vector_hex, "r");
+    if (fd == 0) begin
+      return -1;
+    end
+    while (vector_cnt < 0 && $fgets(line, fd)) begin
+      if (!(line.len() >= 2 && line.substr(0, 1) == "//")) begin
+        if ($sscanf(line, "%h", vector_cnt) != 1) begin
+          vector_cnt = -1;
+        end
+      end
+    end
+    $fclose(fd);
+    return vector_cnt;
+  end
+endfunction
@@ -0,0 +1,29 @@
+//==============================================================//
+//  File:         vector_layouts.sv
+//  Description:  Packed hex vector record layouts. Generated by
+//                scripts/test_vector_generator.py, do not edit.
+//==============================================================//
+
+`ifndef VECTOR_DEPTH
+`define VECTOR_DEPTH 65536
+`endif
+
+`define ALU_VEC_BITS 128
+`define ALU_VEC_ALU_CONTROL 115:112
+`define ALU_VEC_A 111:80
+`define ALU_VEC_B 79:48
+`define ALU_VEC_RESULT 47:16
+`define ALU_VEC_NEG_FLAG 12
+`define ALU_VEC_ZERO_FLAG 8
+`define ALU_VEC_CARRY_FLAG 4
+`define ALU_VEC_V_FLAG 0
+
+`define EXT_VEC_BITS 64
+`define EXT_VEC_INSTR 60:36
+`define EXT_VEC_IMM_SRC 34:32
+`define EXT_VEC_IMM_EXT 31:0
+
+`define REDUCE_VEC_BITS 96
+`define REDUCE_VEC_BASE_RESULT 67:36
+`define REDUCE_VEC_WIDTH_SRC 34:32
+`define REDUCE_VEC_RESULT 31:0
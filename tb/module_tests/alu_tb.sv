@@ -1,5 +1,6 @@
 `timescale 1ns / 1ps
 `include "misc_tasks.sv"
+`include "vector_layouts.sv"
 //////////////////////////////////////////////////////////////////////////////////
 // Company:
 // Engineer:
@@ -42,6 +43,12 @@ module alu_tb();
     int file;
     int read;
 
+    // Packed vector records, laid out as in vector_layouts.sv
+    logic [`ALU_VEC_BITS-1:0] vectors [0:`VECTOR_DEPTH];
+    string vector_hex;
+    string vector_file;
+    int vector_cnt;
+
     // u_DUT instantiation
     alu u_DUT (
         .alu_control_i                  (alu_control),
@@ -54,37 +61,73 @@ module alu_tb();
         .v_flag_o                       (v_flag)
     );
 
+    task automatic check_vector;
+        #5;
+        assert (alu_result == ALUResultExpected & neg_flagExpected == neg_flag & zero_flagExpected == zero_flag & carry_flagExpected == carry_flag & v_flagExpected == v_flag) else begin
+            $fatal(1, "Error: alu_control = %b\nA = %b\nB = %b\nExpected result: %b\nActual result:   %b\nExpect Flags: neg_flag = %b zero_flag = %b carry_flag = %b v_flag = %b\nActual Flags: neg_flag = %b zero_flag = %b carry_flag = %b v_flag = %b",
+                   alu_control, A, B, ALUResultExpected, alu_result, neg_flagExpected, zero_flagExpected, carry_flagExpected, v_flagExpected, neg_flag, zero_flag, carry_flag, v_flag);
+        end
+    endtask
+
     initial begin
 
         dump_setup;
 
-        //Open file
-        file = $fopen("test_inputs/vectors/ALU_test_vectors.txt", "r");
+        if (get_vector_hex("test_inputs/vectors/ALU_test_vectors.hex", vector_hex)) begin
 
-        if (file == 0) begin
-            $fatal(1, "ERROR: Could not open test vector file");
-        end else begin
-            $display("Vector file opened succesfully");
-        end
+            //Record 0 holds the vector count, so every record is loaded at once with exact bounds
+            vector_cnt = read_vector_count(vector_hex);
 
+            if (vector_cnt < 0) begin
+                $fatal(1, "ERROR: No vector count in %s", vector_hex);
+            end else if (vector_cnt > `VECTOR_DEPTH) begin
+                $fatal(1, "ERROR: %0d vectors exceed VECTOR_DEPTH (%0d)", vector_cnt, `VECTOR_DEPTH);
+            end
+            $readmemh(vector_hex, vectors, 0, vector_cnt);
+            $display("Loaded %0d vectors from %s", vector_cnt, vector_hex);
+
+            for (int i = 1; i <= vector_cnt; i++) begin
+                alu_control        = vectors[i][`ALU_VEC_ALU_CONTROL];
+                A                  = vectors[i][`ALU_VEC_A];
+                B                  = vectors[i][`ALU_VEC_B];
+                ALUResultExpected  = vectors[i][`ALU_VEC_RESULT];
+                neg_flagExpected   = vectors[i][`ALU_VEC_NEG_FLAG];
+                zero_flagExpected  = vectors[i][`ALU_VEC_ZERO_FLAG];
+                carry_flagExpected = vectors[i][`ALU_VEC_CARRY_FLAG];
+                v_flagExpected     = vectors[i][`ALU_VEC_V_FLAG];
+                check_vector;
+            end
 
-        while (!$feof(file)) begin
-            read = $fscanf(file, "%b %b %b %b %b %b %b %b\n",
-                           alu_control, A, B, ALUResultExpected, neg_flagExpected, zero_flagExpected, carry_flagExpected, v_flagExpected);
+        end else if (get_vector_file(vector_file)) begin
 
-            if (read == 8) begin
-                #5;
-                assert (alu_result == ALUResultExpected & neg_flagExpected == neg_flag & zero_flagExpected == zero_flag & carry_flagExpected == carry_flag & v_flagExpected == v_flag) else begin
-                    $fatal(1, "Error: alu_control = %b\nA = %b\nB = %b\nExpected result: %b\nActual result:   %b\nExpect Flags: neg_flag = %b zero_flag = %b carry_flag = %b v_flag = %b\nActual Flags: neg_flag = %b zero_flag = %b carry_flag = %b v_flag = %b",
-                           alu_control, A, B, ALUResultExpected, alu_result, neg_flagExpected, zero_flagExpected, carry_flagExpected, v_flagExpected, neg_flag, zero_flag, carry_flag, v_flag);
-                end
+            //Open file
+            file = $fopen(vector_file, "r");
 
+            if (file == 0) begin
+                $fatal(1, "ERROR: Could not open test vector file %s", vector_file);
             end else begin
+                $display("Vector file opened succesfully");
+            end
 
-                $fatal(1, "Incorrect number of arguments read");
+
+            while (!$feof(file)) begin
+                read = $fscanf(file, "%b %b %b %b %b %b %b %b\n",
+                               alu_control, A, B, ALUResultExpected, neg_flagExpected, zero_flagExpected, carry_flagExpected, v_flagExpected);
+
+                if (read == 8) begin
+                    check_vector;
+                end else begin
+
+                    $fatal(1, "Incorrect number of arguments read");
+
+                end
 
             end
 
+        end else begin
+
+            $fatal(1, "ERROR: Could not open test vector image %s (generate it with scripts/test_vector_generator.py, or stream vectors with +vector_file=<path>)", vector_hex);
+
         end
 
         $display("TEST PASSED");
@@ -2,6 +2,7 @@
 `include "misc_tasks.sv"
 `include "control_macros.sv"
 `include "tb_macros.sv"
+`include "vector_layouts.sv"
 //////////////////////////////////////////////////////////////////////////////////
 // Company:
 // Engineer:
@@ -36,43 +37,82 @@ module imm_extend_tb();
     int read;
     int test_num;
 
+    // Packed vector records, laid out as in vector_layouts.sv
+    logic [`EXT_VEC_BITS-1:0] vectors [0:`VECTOR_DEPTH];
+    string vector_hex;
+    string vector_file;
+    int vector_cnt;
+
     imm_extend u_DUT (
         .instr_i                        (instr),
         .imm_src_i                      (imm_src),
         .imm_ext_o                      (imm_ext)
     );
 
+    task automatic check_vector;
+        #1;
+        assert (imm_ext == ImmExtExpected) else begin
+            $fatal(1, "Error: imm_src = %b, instr = %b\nExpected output: %b\nActual output:   %b",
+               imm_src, instr, ImmExtExpected,imm_ext);
+        end
+    endtask
+
     initial begin
 
         dump_setup;
 
         read = 0;
 
-        file = $fopen("test_inputs/vectors/ext_unit_test_vectors.txt", "r");
+        if (get_vector_hex("test_inputs/vectors/ext_unit_test_vectors.hex", vector_hex)) begin
 
-        if (file == 0) begin
-            $fatal(1, "ERROR: Could not open test vector file");
-        end else begin
-            $display("Vector file opened succesfully");
-        end
+            //Record 0 holds the vector count, so every record is loaded at once with exact bounds
+            vector_cnt = read_vector_count(vector_hex);
 
+            if (vector_cnt < 0) begin
+                $fatal(1, "ERROR: No vector count in %s", vector_hex);
+            end else if (vector_cnt > `VECTOR_DEPTH) begin
+                $fatal(1, "ERROR: %0d vectors exceed VECTOR_DEPTH (%0d)", vector_cnt, `VECTOR_DEPTH);
+            end
+            $readmemh(vector_hex, vectors, 0, vector_cnt);
+            $display("Loaded %0d vectors from %s", vector_cnt, vector_hex);
+
+            for (int i = 1; i <= vector_cnt; i++) begin
+                instr          = vectors[i][`EXT_VEC_INSTR];
+                imm_src        = vectors[i][`EXT_VEC_IMM_SRC];
+                ImmExtExpected = vectors[i][`EXT_VEC_IMM_EXT];
+                check_vector;
+            end
 
-        //Iterate through file
-        while (!$feof(file)) begin
-            read = $fscanf(file, "%b %b %b\n", instr, imm_src, ImmExtExpected);
+        end else if (get_vector_file(vector_file)) begin
 
-            //Ensure file reads correct number of elements
-            if (read == 3) begin
-                #1;
-                assert (imm_ext == ImmExtExpected) else begin
-                    $fatal(1, "Error: imm_src = %b, instr = %b\nExpected output: %b\nActual output:   %b",
-                       imm_src, instr, ImmExtExpected,imm_ext);
-                end
+            file = $fopen(vector_file, "r");
 
+            if (file == 0) begin
+                $fatal(1, "ERROR: Could not open test vector file %s", vector_file);
             end else begin
-                $fatal(1, "Incorrect number of elements read");
+                $display("Vector file opened succesfully");
             end
 
+
+            //Iterate through file
+            while (!$feof(file)) begin
+                read = $fscanf(file, "%b %b %b\n", instr, imm_src, ImmExtExpected);
+
+                //Ensure file reads correct number of elements
+                if (read == 3) begin
+                    check_vector;
+                end else begin
+                    $fatal(1, "Incorrect number of elements read");
+                end
+
+            end
+
+            $fclose(file);
+
+        end else begin
+
+            $fatal(1, "ERROR: Could not open test vector image %s (generate it with scripts/test_vector_generator.py, or stream vectors with +vector_file=<path>)", vector_hex);
+
         end
 
         instr[19:15] = 5'b11010;
@@ -84,7 +124,6 @@ module imm_extend_tb();
         `CHECK(imm_ext == {27'b0, 5'b11010}, "CSR extension failed");
 
         $display("TEST PASSED");
-        $fclose(file);
         $finish;
 
     end
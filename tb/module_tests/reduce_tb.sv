@@ -1,5 +1,6 @@
 `timescale 1ns / 1ps
 `include "misc_tasks.sv"
+`include "vector_layouts.sv"
 //////////////////////////////////////////////////////////////////////////////////
 // Company:
 // Engineer:
@@ -32,48 +33,86 @@ module reduce_tb();
     int read;
     int test_num;
 
+    // Packed vector records, laid out as in vector_layouts.sv
+    logic [`REDUCE_VEC_BITS-1:0] vectors [0:`VECTOR_DEPTH];
+    string vector_hex;
+    string vector_file;
+    int vector_cnt;
+
     reduce u_DUT (
         .BaseResult                     (BaseResult),
         .width_src_i                    (width_src),
         .result_o                       (result)
     );
 
+    task automatic check_vector;
+        #1;
+        assert (result == ResultExpected) else begin
+            $fatal(1, "Error: width_src = %b, BaseResult = %b\nExpected output: %b\nActual output:   %b",
+               width_src, BaseResult, ResultExpected, result);
+        end
+    endtask
+
     initial begin
 
         dump_setup;
 
         read = 0;
 
-        file = $fopen("test_inputs/vectors/reduce_test_vectors.txt", "r");
+        if (get_vector_hex("test_inputs/vectors/reduce_test_vectors.hex", vector_hex)) begin
 
-        if (file == 0) begin
-            $fatal(1, "ERROR: Could not open test vector file");
-        end else begin
-            $display("Vector file opened succesfully");
-        end
+            //Record 0 holds the vector count, so every record is loaded at once with exact bounds
+            vector_cnt = read_vector_count(vector_hex);
 
+            if (vector_cnt < 0) begin
+                $fatal(1, "ERROR: No vector count in %s", vector_hex);
+            end else if (vector_cnt > `VECTOR_DEPTH) begin
+                $fatal(1, "ERROR: %0d vectors exceed VECTOR_DEPTH (%0d)", vector_cnt, `VECTOR_DEPTH);
+            end
+            $readmemh(vector_hex, vectors, 0, vector_cnt);
+            $display("Loaded %0d vectors from %s", vector_cnt, vector_hex);
+
+            for (int i = 1; i <= vector_cnt; i++) begin
+                BaseResult     = vectors[i][`REDUCE_VEC_BASE_RESULT];
+                width_src      = vectors[i][`REDUCE_VEC_WIDTH_SRC];
+                ResultExpected = vectors[i][`REDUCE_VEC_RESULT];
+                check_vector;
+            end
 
-        //Iterate through file
-        while (!$feof(file)) begin
-            read = $fscanf(file, "%b %b %b\n", BaseResult, width_src, ResultExpected);
+        end else if (get_vector_file(vector_file)) begin
 
-            //Ensure file reads correct number of elements
-            if (read == 3) begin
-                #1;
-                assert (result == ResultExpected) else begin
-                    $fatal(1, "Error: width_src = %b, BaseResult = %b\nExpected output: %b\nActual output:   %b",
-                       width_src, BaseResult, ResultExpected, result);
-                end
+            file = $fopen(vector_file, "r");
 
+            if (file == 0) begin
+                $fatal(1, "ERROR: Could not open test vector file %s", vector_file);
             end else begin
-                $fatal(1, "Incorrect number of elements read");
+                $display("Vector file opened succesfully");
+            end
+
+
+            //Iterate through file
+            while (!$feof(file)) begin
+                read = $fscanf(file, "%b %b %b\n", BaseResult, width_src, ResultExpected);
+
+                //Ensure file reads correct number of elements
+                if (read == 3) begin
+                    check_vector;
+                end else begin
+                    $fatal(1, "Incorrect number of elements read");
+                end
+
             end
 
+            $fclose(file);
+
+        end else begin
+
+            $fatal(1, "ERROR: Could not open test vector image %s (generate it with scripts/test_vector_generator.py, or stream vectors with +vector_file=<path>)", vector_hex);
+
         end
 
 
         $display("TEST PASSED");
-        $fclose(file);
 
         $finish;
 
@@ -26,8 +26,18 @@ module main_mem_model (
     integer cycle_cnt;
     logic [31:0] mem_array [4095:0];
 
+    // +instr_hex=<path> takes precedence over INSTR_HEX_FILE, allowing one build to run any program
+    string instr_hex_file;
+
     initial begin
-        $readmemh(`INSTR_HEX_FILE, mem_array);
+        if (!$value$plusargs("instr_hex=%s", instr_hex_file)) begin
+        `ifdef INSTR_HEX_FILE
+            instr_hex_file = `INSTR_HEX_FILE;
+        `else
+            $fatal(1, "ERROR: No instruction image supplied (+instr_hex=<path> or INSTR_HEX_FILE)");
+        `endif
+        end
+        $readmemh(instr_hex_file, mem_array);
     end
 
     always_ff @(posedge clk_i) begin
@@ -4,7 +4,15 @@
 //  Description:  Top-level pipeline monitoring module. This module
 //                aggregates all per-stage dump tasks and writes
 //                YAML-formatted snapshots of each pipeline stage
-//                to the output path specified by `DUMP_PATH`.
+//                to the output path given by +dump_path or `DUMP_PATH`.
+//                With PIPELINE_DUMP_BIN, fixed size binary records
+//                are written instead, along with a schema describing
+//                their layout. With PIPELINE_DUMP_DELTA, only changed
+//                fields are written, with a full keyframe every
+//                PIPELINE_DUMP_KEYFRAME (default 1000) cycles. With
+//                PIPELINE_DUMP_TRIGGER, cycles are held in a ring
+//                buffer and only written around the triggers in
+//                trigger_spec.yml.
 //
 //  Author:       Viggo Wozniak
 //  Project:      RISC-V Processor
@@ -25,8 +33,277 @@
 `ifdef PIPELINE_DUMP
     int reg_dump_handle;
 
+`ifdef PIPELINE_DUMP_BIN
+    task automatic write_dump_schema(string schema_path);
+        int schema_handle;
+
+        schema_handle = $fopen(schema_path, "w");
+        if (schema_handle == 0) begin
+            $fatal(1, "ERROR: Could not open raw_pipeline_dump.schema.yml");
+        end
+        $fdisplay(schema_handle, "format: pipeline_dump_bin");
+        $fdisplay(schema_handle, "version: 1");
+        $fdisplay(schema_handle, "byte_order: little");
+        $fdisplay(schema_handle, "word_order: lsw_first");
+        $fdisplay(schema_handle, "record_bytes: 140");
+        $fdisplay(schema_handle, "cycle: {byte_offset: 0, bytes: 4}");
+        $fdisplay(schema_handle, "sections:");
+        $fdisplay(schema_handle, "  de:");
+        $fdisplay(schema_handle, "    byte_offset: 4");
+        $fdisplay(schema_handle, "    bytes: 20");
+        $fdisplay(schema_handle, "    width: 130");
+        $fdisplay(schema_handle, "    fields:");
+        $fdisplay(schema_handle, "      meta:");
+        $fdisplay(schema_handle, "        pc: {offset: 98, width: 32, format: h}");
+        $fdisplay(schema_handle, "        instr: {offset: 66, width: 32, format: h}");
+        $fdisplay(schema_handle, "        valid: {offset: 65, width: 1, format: h}");
+        $fdisplay(schema_handle, "      control:");
+        $fdisplay(schema_handle, "        pc_src_pred: {offset: 64, width: 1, format: b}");
+        $fdisplay(schema_handle, "      data:");
+        $fdisplay(schema_handle, "        pc_plus4: {offset: 32, width: 32, format: h}");
+        $fdisplay(schema_handle, "        pred_pc_target: {offset: 0, width: 32, format: h}");
+        $fdisplay(schema_handle, "  ex:");
+        $fdisplay(schema_handle, "    byte_offset: 24");
+        $fdisplay(schema_handle, "    bytes: 40");
+        $fdisplay(schema_handle, "    width: 308");
+        $fdisplay(schema_handle, "    fields:");
+        $fdisplay(schema_handle, "      meta:");
+        $fdisplay(schema_handle, "        pc: {offset: 276, width: 32, format: h}");
+        $fdisplay(schema_handle, "        instr: {offset: 244, width: 32, format: h}");
+        $fdisplay(schema_handle, "        valid: {offset: 243, width: 1, format: h}");
+        $fdisplay(schema_handle, "      control:");
+        $fdisplay(schema_handle, "        funct3: {offset: 240, width: 3, format: b}");
+        $fdisplay(schema_handle, "        alu_control: {offset: 236, width: 4, format: b}");
+        $fdisplay(schema_handle, "        alu_src: {offset: 235, width: 1, format: b}");
+        $fdisplay(schema_handle, "        result_src: {offset: 232, width: 3, format: b}");
+        $fdisplay(schema_handle, "        width_src: {offset: 229, width: 3, format: b}");
+        $fdisplay(schema_handle, "        branch_op: {offset: 227, width: 2, format: b}");
+        $fdisplay(schema_handle, "        pc_base_src: {offset: 226, width: 1, format: b}");
+        $fdisplay(schema_handle, "        pc_src_pred: {offset: 225, width: 1, format: b}");
+        $fdisplay(schema_handle, "        mem_write: {offset: 224, width: 1, format: b}");
+        $fdisplay(schema_handle, "        reg_write: {offset: 223, width: 1, format: b}");
+        $fdisplay(schema_handle, "        csr_control: {offset: 221, width: 2, format: b}");
+        $fdisplay(schema_handle, "        csr_we: {offset: 220, width: 1, format: b}");
+        $fdisplay(schema_handle, "        csr_src: {offset: 219, width: 1, format: b}");
+        $fdisplay(schema_handle, "      data:");
+        $fdisplay(schema_handle, "        rd: {offset: 214, width: 5, format: h}");
+        $fdisplay(schema_handle, "        rs1: {offset: 209, width: 5, format: h}");
+        $fdisplay(schema_handle, "        rs2: {offset: 204, width: 5, format: h}");
+        $fdisplay(schema_handle, "        reg_data_1: {offset: 172, width: 32, format: h}");
+        $fdisplay(schema_handle, "        reg_data_2: {offset: 140, width: 32, format: h}");
+        $fdisplay(schema_handle, "        imm_ext: {offset: 108, width: 32, format: h}");
+        $fdisplay(schema_handle, "        pc_plus4: {offset: 76, width: 32, format: h}");
+        $fdisplay(schema_handle, "        pred_pc_target: {offset: 44, width: 32, format: h}");
+        $fdisplay(schema_handle, "        csr_addr: {offset: 32, width: 12, format: h}");
+        $fdisplay(schema_handle, "        csr_data: {offset: 0, width: 32, format: h}");
+        $fdisplay(schema_handle, "  mem:");
+        $fdisplay(schema_handle, "    byte_offset: 64");
+        $fdisplay(schema_handle, "    bytes: 36");
+        $fdisplay(schema_handle, "    width: 283");
+        $fdisplay(schema_handle, "    fields:");
+        $fdisplay(schema_handle, "      meta:");
+        $fdisplay(schema_handle, "        instr: {offset: 251, width: 32, format: h}");
+        $fdisplay(schema_handle, "        valid: {offset: 250, width: 1, format: h}");
+        $fdisplay(schema_handle, "      control:");
+        $fdisplay(schema_handle, "        result_src: {offset: 247, width: 3, format: b}");
+        $fdisplay(schema_handle, "        width_src: {offset: 244, width: 3, format: b}");
+        $fdisplay(schema_handle, "        mem_write: {offset: 243, width: 1, format: b}");
+        $fdisplay(schema_handle, "        reg_write: {offset: 242, width: 1, format: b}");
+        $fdisplay(schema_handle, "        csr_we: {offset: 241, width: 1, format: b}");
+        $fdisplay(schema_handle, "      data:");
+        $fdisplay(schema_handle, "        rd: {offset: 236, width: 5, format: h}");
+        $fdisplay(schema_handle, "        alu_result: {offset: 204, width: 32, format: h}");
+        $fdisplay(schema_handle, "        write_data: {offset: 172, width: 32, format: h}");
+        $fdisplay(schema_handle, "        pc_target: {offset: 140, width: 32, format: h}");
+        $fdisplay(schema_handle, "        pc_plus4: {offset: 108, width: 32, format: h}");
+        $fdisplay(schema_handle, "        imm_ext: {offset: 76, width: 32, format: h}");
+        $fdisplay(schema_handle, "        csr_result: {offset: 44, width: 32, format: h}");
+        $fdisplay(schema_handle, "        csr_addr: {offset: 32, width: 12, format: h}");
+        $fdisplay(schema_handle, "        csr_data: {offset: 0, width: 32, format: h}");
+        $fdisplay(schema_handle, "  wb:");
+        $fdisplay(schema_handle, "    byte_offset: 100");
+        $fdisplay(schema_handle, "    bytes: 36");
+        $fdisplay(schema_handle, "    width: 279");
+        $fdisplay(schema_handle, "    fields:");
+        $fdisplay(schema_handle, "      meta:");
+        $fdisplay(schema_handle, "        instr: {offset: 247, width: 32, format: h}");
+        $fdisplay(schema_handle, "        valid: {offset: 246, width: 1, format: h}");
+        $fdisplay(schema_handle, "      control:");
+        $fdisplay(schema_handle, "        result_src: {offset: 243, width: 3, format: b}");
+        $fdisplay(schema_handle, "        reg_write: {offset: 242, width: 1, format: b}");
+        $fdisplay(schema_handle, "        csr_we: {offset: 241, width: 1, format: b}");
+        $fdisplay(schema_handle, "      data:");
+        $fdisplay(schema_handle, "        rd: {offset: 236, width: 5, format: h}");
+        $fdisplay(schema_handle, "        alu_result: {offset: 204, width: 32, format: h}");
+        $fdisplay(schema_handle, "        reduced_data: {offset: 172, width: 32, format: h}");
+        $fdisplay(schema_handle, "        pc_target: {offset: 140, width: 32, format: h}");
+        $fdisplay(schema_handle, "        pc_plus4: {offset: 108, width: 32, format: h}");
+        $fdisplay(schema_handle, "        imm_ext: {offset: 76, width: 32, format: h}");
+        $fdisplay(schema_handle, "        csr_result: {offset: 44, width: 32, format: h}");
+        $fdisplay(schema_handle, "        csr_addr: {offset: 32, width: 12, format: h}");
+        $fdisplay(schema_handle, "        csr_data: {offset: 0, width: 32, format: h}");
+        $fdisplay(schema_handle, "  hazard_unit:");
+        $fdisplay(schema_handle, "    byte_offset: 136");
+        $fdisplay(schema_handle, "    bytes: 4");
+        $fdisplay(schema_handle, "    width: 13");
+        $fdisplay(schema_handle, "    fields:");
+        $fdisplay(schema_handle, "      stall:");
+        $fdisplay(schema_handle, "        stall_fi_o: {offset: 12, width: 1, format: b}");
+        $fdisplay(schema_handle, "        stall_de_o: {offset: 11, width: 1, format: b}");
+        $fdisplay(schema_handle, "        stall_ex_o: {offset: 10, width: 1, format: b}");
+        $fdisplay(schema_handle, "        stall_mem_o: {offset: 9, width: 1, format: b}");
+        $fdisplay(schema_handle, "        stall_wb_o: {offset: 8, width: 1, format: b}");
+        $fdisplay(schema_handle, "      flush:");
+        $fdisplay(schema_handle, "        flush_de_o: {offset: 7, width: 1, format: b}");
+        $fdisplay(schema_handle, "        flush_ex_o: {offset: 6, width: 1, format: b}");
+        $fdisplay(schema_handle, "      forward:");
+        $fdisplay(schema_handle, "        forward_a_ex_o: {offset: 4, width: 2, format: b}");
+        $fdisplay(schema_handle, "        forward_b_ex_o: {offset: 2, width: 2, format: b}");
+        $fdisplay(schema_handle, "        forward_csr_ex_o: {offset: 0, width: 2, format: b}");
+        $fclose(schema_handle);
+    endtask
+
+    initial begin
+        reg_dump_handle = $fopen({get_dump_path(), "/raw_pipeline_dump.bin"}, "wb");
+        if (reg_dump_handle == 0) begin
+            $fatal(1, "ERROR: Could not open raw_pipeline_dump.bin");
+        end
+        write_dump_schema({get_dump_path(), "/raw_pipeline_dump.schema.yml"});
+    end
+
+    always @(negedge clk) begin
+        if (~reset) begin
+            $fwrite(reg_dump_handle, "%u", riscv_top_tb.u_performance_monitor.cycle_cnt);
+            dump_de_bin(reg_dump_handle);
+            dump_ex_bin(reg_dump_handle);
+            dump_mem_bin(reg_dump_handle);
+            dump_wb_bin(reg_dump_handle);
+            dump_hazard_unit_bin(reg_dump_handle);
+        end
+    end
+`elsif PIPELINE_DUMP_DELTA
+`ifndef PIPELINE_DUMP_KEYFRAME
+    `define PIPELINE_DUMP_KEYFRAME 1000
+`endif
+    int dump_cycle_cnt = 0;
+    bit keyframe;
+
+    initial begin
+        reg_dump_handle = $fopen({get_dump_path(), "/raw_pipeline_dump.yml"}, "w");
+        if (reg_dump_handle == 0) begin
+            $fatal(1, "ERROR: Could not open raw_pipeline_dump.yml");
+        end
+        $fdisplay(reg_dump_handle, "# pipeline_dump: delta, keyframe_interval: %0d", `PIPELINE_DUMP_KEYFRAME);
+    end
+
+    always @(negedge clk) begin
+        if (~reset) begin
+            keyframe = (dump_cycle_cnt % `PIPELINE_DUMP_KEYFRAME == 0);
+            if (keyframe) begin
+                $fdisplay(reg_dump_handle, "%0d: # keyframe", riscv_top_tb.u_performance_monitor.cycle_cnt);
+            end else begin
+                $fdisplay(reg_dump_handle, "%0d:", riscv_top_tb.u_performance_monitor.cycle_cnt);
+            end
+            dump_de_delta(reg_dump_handle, keyframe);
+            dump_ex_delta(reg_dump_handle, keyframe);
+            dump_mem_delta(reg_dump_handle, keyframe);
+            dump_wb_delta(reg_dump_handle, keyframe);
+            dump_hazard_unit_delta(reg_dump_handle, keyframe);
+            dump_cycle_cnt++;
+        end
+    end
+`elsif PIPELINE_DUMP_TRIGGER
+    localparam int PRE_WINDOW  = 50;
+    localparam int POST_WINDOW = 10;
+    localparam int RING_SIZE   = (PRE_WINDOW > 0) ? PRE_WINDOW : 1;
+
+    // Ring buffer holding the last PRE_WINDOW cycles
+    int ring_cycle [RING_SIZE];
+    logic [129:0] ring_de [RING_SIZE];
+    logic [307:0] ring_ex [RING_SIZE];
+    logic [282:0] ring_mem [RING_SIZE];
+    logic [278:0] ring_wb [RING_SIZE];
+    logic [12:0] ring_hazard_unit [RING_SIZE];
+    int ring_head = 0;
+    int ring_cnt = 0;
+    int post_cnt = 0;
+    string trigger_name;
+
+    // Returns the name of the first trigger that fires this cycle, or ""
+    function automatic string check_triggers();
+        if (riscv_top_tb.test_failed) return "test_fail";
+        return "";
+    endfunction
+
+    task automatic write_cycle(int cycle,
+                               logic [129:0] de_bundle,
+                               logic [307:0] ex_bundle,
+                               logic [282:0] mem_bundle,
+                               logic [278:0] wb_bundle,
+                               logic [12:0] hazard_unit_outputs);
+        $fwrite(reg_dump_handle, "%0d:\n", cycle);
+        $fwrite(reg_dump_handle, "%s", format_de(de_bundle));
+        $fwrite(reg_dump_handle, "%s", format_ex(ex_bundle));
+        $fwrite(reg_dump_handle, "%s", format_mem(mem_bundle));
+        $fwrite(reg_dump_handle, "%s", format_wb(wb_bundle));
+        $fwrite(reg_dump_handle, "%s", format_hazard_unit(hazard_unit_outputs));
+    endtask
+
     initial begin
-        reg_dump_handle = $fopen({`DUMP_PATH, "/raw_pipeline_dump.yml"}, "w");
+        reg_dump_handle = $fopen({get_dump_path(), "/raw_pipeline_dump.yml"}, "w");
+        if (reg_dump_handle == 0) begin
+            $fatal(1, "ERROR: Could not open raw_pipeline_dump.yml");
+        end
+        $fdisplay(reg_dump_handle, "# pipeline_dump: trigger, pre_window: %0d, post_window: %0d", PRE_WINDOW, POST_WINDOW);
+    end
+
+    always @(negedge clk) begin
+        if (~reset) begin
+            trigger_name = check_triggers();
+
+            // A trigger flushes the held cycles (oldest first) and (re)starts the post window.
+            // Triggers inside an open window only extend it.
+            if (trigger_name != "") begin
+                if (post_cnt == 0) begin
+                    $fdisplay(reg_dump_handle, "# trigger: %s at cycle %0d", trigger_name, riscv_top_tb.u_performance_monitor.cycle_cnt);
+                end
+                for (int i = 0; i < ring_cnt; i++) begin
+                    int slot;
+                    slot = (ring_head + RING_SIZE - ring_cnt + i) % RING_SIZE;
+                    write_cycle(ring_cycle[slot],
+                                ring_de[slot],
+                                ring_ex[slot],
+                                ring_mem[slot],
+                                ring_wb[slot],
+                                ring_hazard_unit[slot]);
+                end
+                ring_cnt = 0;
+                post_cnt = POST_WINDOW + 1;
+            end
+
+            if (post_cnt > 0) begin
+                write_cycle(riscv_top_tb.u_performance_monitor.cycle_cnt,
+                            `DATA_PATH_HIER.u_decode_stage.outputs_de,
+                            `DATA_PATH_HIER.u_execute_stage.outputs_ex,
+                            `DATA_PATH_HIER.u_memory_stage.outputs_mem,
+                            `DATA_PATH_HIER.u_writeback_stage.outputs_wb,
+                            get_hazard_unit_outputs());
+                post_cnt--;
+            end else if (PRE_WINDOW > 0) begin
+                ring_cycle[ring_head] = riscv_top_tb.u_performance_monitor.cycle_cnt;
+                ring_de[ring_head] = `DATA_PATH_HIER.u_decode_stage.outputs_de;
+                ring_ex[ring_head] = `DATA_PATH_HIER.u_execute_stage.outputs_ex;
+                ring_mem[ring_head] = `DATA_PATH_HIER.u_memory_stage.outputs_mem;
+                ring_wb[ring_head] = `DATA_PATH_HIER.u_writeback_stage.outputs_wb;
+                ring_hazard_unit[ring_head] = get_hazard_unit_outputs();
+                ring_head = (ring_head + 1) % RING_SIZE;
+                if (ring_cnt < RING_SIZE) ring_cnt++;
+            end
+        end
+    end
+`else
+    initial begin
+        reg_dump_handle = $fopen({get_dump_path(), "/raw_pipeline_dump.yml"}, "w");
         if (reg_dump_handle == 0) begin
             $fatal(1, "ERROR: Could not open raw_pipeline_dump.yml");
         end
@@ -42,5 +319,6 @@
             dump_hazard_unit(reg_dump_handle);
         end
     end
-
 `endif
+
+`endif
\ No newline at end of file
@@ -35,6 +35,7 @@
     logic        mem_write_mem;
 
     logic        test_complete;
+    logic        test_failed;
 
     //------------------------------------------------------
     //  DUT Instantiation
@@ -57,6 +58,7 @@
         dump_setup;
 
         test_complete = 0;
+        test_failed   = 0;
         clk           = 0;
         reset         = 1;
         #20;
@@ -71,17 +73,10 @@
     //------------------------------------------------------
     //  File Handle Initialization
     //------------------------------------------------------
-    int reg_dump_handle;
+    // The pipeline dump handle is owned by pipeline_monitor
     int perf_dump_handle;
     initial begin : file_handle_init
-        `ifdef PIPELINE_DUMP
-            reg_dump_handle = $fopen({`DUMP_PATH, "/raw_pipeline_dump.yml"}, "w");
-            if (reg_dump_handle == 0) begin
-                $fatal(1, "ERROR: Could not open raw_pipeline_dump.yml");
-            end
-        `endif
-
-        perf_dump_handle = $fopen({`DUMP_PATH, "/performance_dump.log"}, "w");
+        perf_dump_handle = $fopen({get_dump_path(), "/performance_dump.log"}, "w");
         if (perf_dump_handle == 0) begin
             $fatal(1, "ERROR: Could not open performance_dump.log");
         end
@@ -94,6 +89,7 @@
         if (u_performance_monitor.cycle_cnt > 500000) begin
             $display("TEST TIMEOUT");
             test_complete = 1'b1;
+            test_failed   = 1'b1;
         end
 
         if (`DATA_PATH_HIER.csr_we_wb_o && `DATA_PATH_HIER.csr_addr_wb_o == `MTEST_STATUS_ADDR) begin
@@ -103,6 +99,7 @@
             end else if (`DATA_PATH_HIER.csr_result_wb == `TEST_FAIL) begin
                 $display("TEST FAILED");
                 test_complete = 1'b1;
+                test_failed   = 1'b1;
             end
         end
     end
@@ -46,3 +46,62 @@ begin
     $fdisplay(reg_dump_handle, "      pred_pc_target: \"0x%h\"", `DATA_PATH_HIER.u_decode_stage.outputs_de.data.pred_pc_target);
 end
 endtask;
+
+// Binary dump (PIPELINE_DUMP_BIN): the whole output bundle as one packed value
+task automatic dump_de_bin(int reg_dump_handle);
+    $fwrite(reg_dump_handle, "%u", `DATA_PATH_HIER.u_decode_stage.outputs_de);
+endtask
+
+// Delta dump (PIPELINE_DUMP_DELTA): only fields that changed since the previous
+// cycle are written, along with their stage and category headers. Keyframes
+// write every field.
+logic [129:0] prev_de_bundle;
+
+task automatic dump_de_delta(int reg_dump_handle, bit keyframe);
+    if (keyframe) begin
+        dump_de(reg_dump_handle);
+    end else if (`DATA_PATH_HIER.u_decode_stage.outputs_de !== prev_de_bundle) begin
+        $fdisplay(reg_dump_handle, "  de:");
+        if (`DATA_PATH_HIER.u_decode_stage.outputs_de.meta !== prev_de_bundle[129:65]) begin
+            $fdisplay(reg_dump_handle, "    meta:");
+            if (`DATA_PATH_HIER.u_decode_stage.outputs_de.meta.pc !== prev_de_bundle[129:98])
+                $fdisplay(reg_dump_handle, "      pc: \"0x%h\"", `DATA_PATH_HIER.u_decode_stage.outputs_de.meta.pc);
+            if (`DATA_PATH_HIER.u_decode_stage.outputs_de.meta.instr !== prev_de_bundle[97:66])
+                $fdisplay(reg_dump_handle, "      instr: \"0x%h\"", `DATA_PATH_HIER.u_decode_stage.outputs_de.meta.instr);
+            if (`DATA_PATH_HIER.u_decode_stage.outputs_de.meta.valid !== prev_de_bundle[65:65])
+                $fdisplay(reg_dump_handle, "      valid: \"0x%h\"", `DATA_PATH_HIER.u_decode_stage.outputs_de.meta.valid);
+        end
+        if (`DATA_PATH_HIER.u_decode_stage.outputs_de.control !== prev_de_bundle[64:64]) begin
+            $fdisplay(reg_dump_handle, "    control:");
+            if (`DATA_PATH_HIER.u_decode_stage.outputs_de.control.pc_src_pred !== prev_de_bundle[64:64])
+                $fdisplay(reg_dump_handle, "      pc_src_pred: \"0b%b\"", `DATA_PATH_HIER.u_decode_stage.outputs_de.control.pc_src_pred);
+        end
+        if (`DATA_PATH_HIER.u_decode_stage.outputs_de.data !== prev_de_bundle[63:0]) begin
+            $fdisplay(reg_dump_handle, "    data:");
+            if (`DATA_PATH_HIER.u_decode_stage.outputs_de.data.pc_plus4 !== prev_de_bundle[63:32])
+                $fdisplay(reg_dump_handle, "      pc_plus4: \"0x%h\"", `DATA_PATH_HIER.u_decode_stage.outputs_de.data.pc_plus4);
+            if (`DATA_PATH_HIER.u_decode_stage.outputs_de.data.pred_pc_target !== prev_de_bundle[31:0])
+                $fdisplay(reg_dump_handle, "      pred_pc_target: \"0x%h\"", `DATA_PATH_HIER.u_decode_stage.outputs_de.data.pred_pc_target);
+        end
+    end
+    prev_de_bundle = `DATA_PATH_HIER.u_decode_stage.outputs_de;
+endtask
+
+// Trigger dump (PIPELINE_DUMP_TRIGGER): formats a stored output bundle the
+// same way dump_de writes the live one
+function automatic string format_de(logic [129:0] bundle);
+    string text;
+
+    text = "  de:\n";
+    text = {text, "    meta:\n"};
+    text = {text, $sformatf("      pc: \"0x%h\"\n", bundle[129:98])};
+    text = {text, $sformatf("      instr: \"0x%h\"\n", bundle[97:66])};
+    text = {text, $sformatf("      valid: \"0x%h\"\n", bundle[65:65])};
+    text = {text, "    control:\n"};
+    text = {text, $sformatf("      pc_src_pred: \"0b%b\"\n", bundle[64:64])};
+    text = {text, "    data:\n"};
+    text = {text, $sformatf("      pc_plus4: \"0x%h\"\n", bundle[63:32])};
+    text = {text, $sformatf("      pred_pc_target: \"0x%h\"\n", bundle[31:0])};
+
+    return text;
+endfunction
\ No newline at end of file
@@ -66,3 +66,122 @@ begin
     $fdisplay(reg_dump_handle, "      csr_data: \"0x%h\"", `DATA_PATH_HIER.u_execute_stage.outputs_ex.data.csr_data);
 end
 endtask;
+
+// Binary dump (PIPELINE_DUMP_BIN): the whole output bundle as one packed value
+task automatic dump_ex_bin(int reg_dump_handle);
+    $fwrite(reg_dump_handle, "%u", `DATA_PATH_HIER.u_execute_stage.outputs_ex);
+endtask
+
+// Delta dump (PIPELINE_DUMP_DELTA): only fields that changed since the previous
+// cycle are written, along with their stage and category headers. Keyframes
+// write every field.
+logic [307:0] prev_ex_bundle;
+
+task automatic dump_ex_delta(int reg_dump_handle, bit keyframe);
+    if (keyframe) begin
+        dump_ex(reg_dump_handle);
+    end else if (`DATA_PATH_HIER.u_execute_stage.outputs_ex !== prev_ex_bundle) begin
+        $fdisplay(reg_dump_handle, "  ex:");
+        if (`DATA_PATH_HIER.u_execute_stage.outputs_ex.meta !== prev_ex_bundle[307:243]) begin
+            $fdisplay(reg_dump_handle, "    meta:");
+            if (`DATA_PATH_HIER.u_execute_stage.outputs_ex.meta.pc !== prev_ex_bundle[307:276])
+                $fdisplay(reg_dump_handle, "      pc: \"0x%h\"", `DATA_PATH_HIER.u_execute_stage.outputs_ex.meta.pc);
+            if (`DATA_PATH_HIER.u_execute_stage.outputs_ex.meta.instr !== prev_ex_bundle[275:244])
+                $fdisplay(reg_dump_handle, "      instr: \"0x%h\"", `DATA_PATH_HIER.u_execute_stage.outputs_ex.meta.instr);
+            if (`DATA_PATH_HIER.u_execute_stage.outputs_ex.meta.valid !== prev_ex_bundle[243:243])
+                $fdisplay(reg_dump_handle, "      valid: \"0x%h\"", `DATA_PATH_HIER.u_execute_stage.outputs_ex.meta.valid);
+        end
+        if (`DATA_PATH_HIER.u_execute_stage.outputs_ex.control !== prev_ex_bundle[242:219]) begin
+            $fdisplay(reg_dump_handle, "    control:");
+            if (`DATA_PATH_HIER.u_execute_stage.outputs_ex.control.funct3 !== prev_ex_bundle[242:240])
+                $fdisplay(reg_dump_handle, "      funct3: \"0b%b\"", `DATA_PATH_HIER.u_execute_stage.outputs_ex.control.funct3);
+            if (`DATA_PATH_HIER.u_execute_stage.outputs_ex.control.alu_control !== prev_ex_bundle[239:236])
+                $fdisplay(reg_dump_handle, "      alu_control: \"0b%b\"", `DATA_PATH_HIER.u_execute_stage.outputs_ex.control.alu_control);
+            if (`DATA_PATH_HIER.u_execute_stage.outputs_ex.control.alu_src !== prev_ex_bundle[235:235])
+                $fdisplay(reg_dump_handle, "      alu_src: \"0b%b\"", `DATA_PATH_HIER.u_execute_stage.outputs_ex.control.alu_src);
+            if (`DATA_PATH_HIER.u_execute_stage.outputs_ex.control.result_src !== prev_ex_bundle[234:232])
+                $fdisplay(reg_dump_handle, "      result_src: \"0b%b\"", `DATA_PATH_HIER.u_execute_stage.outputs_ex.control.result_src);
+            if (`DATA_PATH_HIER.u_execute_stage.outputs_ex.control.width_src !== prev_ex_bundle[231:229])
+                $fdisplay(reg_dump_handle, "      width_src: \"0b%b\"", `DATA_PATH_HIER.u_execute_stage.outputs_ex.control.width_src);
+            if (`DATA_PATH_HIER.u_execute_stage.outputs_ex.control.branch_op !== prev_ex_bundle[228:227])
+                $fdisplay(reg_dump_handle, "      branch_op: \"0b%b\"", `DATA_PATH_HIER.u_execute_stage.outputs_ex.control.branch_op);
+            if (`DATA_PATH_HIER.u_execute_stage.outputs_ex.control.pc_base_src !== prev_ex_bundle[226:226])
+                $fdisplay(reg_dump_handle, "      pc_base_src: \"0b%b\"", `DATA_PATH_HIER.u_execute_stage.outputs_ex.control.pc_base_src);
+            if (`DATA_PATH_HIER.u_execute_stage.outputs_ex.control.pc_src_pred !== prev_ex_bundle[225:225])
+                $fdisplay(reg_dump_handle, "      pc_src_pred: \"0b%b\"", `DATA_PATH_HIER.u_execute_stage.outputs_ex.control.pc_src_pred);
+            if (`DATA_PATH_HIER.u_execute_stage.outputs_ex.control.mem_write !== prev_ex_bundle[224:224])
+                $fdisplay(reg_dump_handle, "      mem_write: \"0b%b\"", `DATA_PATH_HIER.u_execute_stage.outputs_ex.control.mem_write);
+            if (`DATA_PATH_HIER.u_execute_stage.outputs_ex.control.reg_write !== prev_ex_bundle[223:223])
+                $fdisplay(reg_dump_handle, "      reg_write: \"0b%b\"", `DATA_PATH_HIER.u_execute_stage.outputs_ex.control.reg_write);
+            if (`DATA_PATH_HIER.u_execute_stage.outputs_ex.control.csr_control !== prev_ex_bundle[222:221])
+                $fdisplay(reg_dump_handle, "      csr_control: \"0b%b\"", `DATA_PATH_HIER.u_execute_stage.outputs_ex.control.csr_control);
+            if (`DATA_PATH_HIER.u_execute_stage.outputs_ex.control.csr_we !== prev_ex_bundle[220:220])
+                $fdisplay(reg_dump_handle, "      csr_we: \"0b%b\"", `DATA_PATH_HIER.u_execute_stage.outputs_ex.control.csr_we);
+            if (`DATA_PATH_HIER.u_execute_stage.outputs_ex.control.csr_src !== prev_ex_bundle[219:219])
+                $fdisplay(reg_dump_handle, "      csr_src: \"0b%b\"", `DATA_PATH_HIER.u_execute_stage.outputs_ex.control.csr_src);
+        end
+        if (`DATA_PATH_HIER.u_execute_stage.outputs_ex.data !== prev_ex_bundle[218:0]) begin
+            $fdisplay(reg_dump_handle, "    data:");
+            if (`DATA_PATH_HIER.u_execute_stage.outputs_ex.data.rd !== prev_ex_bundle[218:214])
+                $fdisplay(reg_dump_handle, "      rd: \"0x%h\"", `DATA_PATH_HIER.u_execute_stage.outputs_ex.data.rd);
+            if (`DATA_PATH_HIER.u_execute_stage.outputs_ex.data.rs1 !== prev_ex_bundle[213:209])
+                $fdisplay(reg_dump_handle, "      rs1: \"0x%h\"", `DATA_PATH_HIER.u_execute_stage.outputs_ex.data.rs1);
+            if (`DATA_PATH_HIER.u_execute_stage.outputs_ex.data.rs2 !== prev_ex_bundle[208:204])
+                $fdisplay(reg_dump_handle, "      rs2: \"0x%h\"", `DATA_PATH_HIER.u_execute_stage.outputs_ex.data.rs2);
+            if (`DATA_PATH_HIER.u_execute_stage.outputs_ex.data.reg_data_1 !== prev_ex_bundle[203:172])
+                $fdisplay(reg_dump_handle, "      reg_data_1: \"0x%h\"", `DATA_PATH_HIER.u_execute_stage.outputs_ex.data.reg_data_1);
+            if (`DATA_PATH_HIER.u_execute_stage.outputs_ex.data.reg_data_2 !== prev_ex_bundle[171:140])
+                $fdisplay(reg_dump_handle, "      reg_data_2: \"0x%h\"", `DATA_PATH_HIER.u_execute_stage.outputs_ex.data.reg_data_2);
+            if (`DATA_PATH_HIER.u_execute_stage.outputs_ex.data.imm_ext !== prev_ex_bundle[139:108])
+                $fdisplay(reg_dump_handle, "      imm_ext: \"0x%h\"", `DATA_PATH_HIER.u_execute_stage.outputs_ex.data.imm_ext);
+            if (`DATA_PATH_HIER.u_execute_stage.outputs_ex.data.pc_plus4 !== prev_ex_bundle[107:76])
+                $fdisplay(reg_dump_handle, "      pc_plus4: \"0x%h\"", `DATA_PATH_HIER.u_execute_stage.outputs_ex.data.pc_plus4);
+            if (`DATA_PATH_HIER.u_execute_stage.outputs_ex.data.pred_pc_target !== prev_ex_bundle[75:44])
+                $fdisplay(reg_dump_handle, "      pred_pc_target: \"0x%h\"", `DATA_PATH_HIER.u_execute_stage.outputs_ex.data.pred_pc_target);
+            if (`DATA_PATH_HIER.u_execute_stage.outputs_ex.data.csr_addr !== prev_ex_bundle[43:32])
+                $fdisplay(reg_dump_handle, "      csr_addr: \"0x%h\"", `DATA_PATH_HIER.u_execute_stage.outputs_ex.data.csr_addr);
+            if (`DATA_PATH_HIER.u_execute_stage.outputs_ex.data.csr_data !== prev_ex_bundle[31:0])
+                $fdisplay(reg_dump_handle, "      csr_data: \"0x%h\"", `DATA_PATH_HIER.u_execute_stage.outputs_ex.data.csr_data);
+        end
+    end
+    prev_ex_bundle = `DATA_PATH_HIER.u_execute_stage.outputs_ex;
+endtask
+
+// Trigger dump (PIPELINE_DUMP_TRIGGER): formats a stored output bundle the
+// same way dump_ex writes the live one
+function automatic string format_ex(logic [307:0] bundle);
+    string text;
+
+    text = "  ex:\n";
+    text = {text, "    meta:\n"};
+    text = {text, $sformatf("      pc: \"0x%h\"\n", bundle[307:276])};
+    text = {text, $sformatf("      instr: \"0x%h\"\n", bundle[275:244])};
+    text = {text, $sformatf("      valid: \"0x%h\"\n", bundle[243:243])};
+    text = {text, "    control:\n"};
+    text = {text, $sformatf("      funct3: \"0b%b\"\n", bundle[242:240])};
+    text = {text, $sformatf("      alu_control: \"0b%b\"\n", bundle[239:236])};
+    text = {text, $sformatf("      alu_src: \"0b%b\"\n", bundle[235:235])};
+    text = {text, $sformatf("      result_src: \"0b%b\"\n", bundle[234:232])};
+    text = {text, $sformatf("      width_src: \"0b%b\"\n", bundle[231:229])};
+    text = {text, $sformatf("      branch_op: \"0b%b\"\n", bundle[228:227])};
+    text = {text, $sformatf("      pc_base_src: \"0b%b\"\n", bundle[226:226])};
+    text = {text, $sformatf("      pc_src_pred: \"0b%b\"\n", bundle[225:225])};
+    text = {text, $sformatf("      mem_write: \"0b%b\"\n", bundle[224:224])};
+    text = {text, $sformatf("      reg_write: \"0b%b\"\n", bundle[223:223])};
+    text = {text, $sformatf("      csr_control: \"0b%b\"\n", bundle[222:221])};
+    text = {text, $sformatf("      csr_we: \"0b%b\"\n", bundle[220:220])};
+    text = {text, $sformatf("      csr_src: \"0b%b\"\n", bundle[219:219])};
+    text = {text, "    data:\n"};
+    text = {text, $sformatf("      rd: \"0x%h\"\n", bundle[218:214])};
+    text = {text, $sformatf("      rs1: \"0x%h\"\n", bundle[213:209])};
+    text = {text, $sformatf("      rs2: \"0x%h\"\n", bundle[208:204])};
+    text = {text, $sformatf("      reg_data_1: \"0x%h\"\n", bundle[203:172])};
+    text = {text, $sformatf("      reg_data_2: \"0x%h\"\n", bundle[171:140])};
+    text = {text, $sformatf("      imm_ext: \"0x%h\"\n", bundle[139:108])};
+    text = {text, $sformatf("      pc_plus4: \"0x%h\"\n", bundle[107:76])};
+    text = {text, $sformatf("      pred_pc_target: \"0x%h\"\n", bundle[75:44])};
+    text = {text, $sformatf("      csr_addr: \"0x%h\"\n", bundle[43:32])};
+    text = {text, $sformatf("      csr_data: \"0x%h\"\n", bundle[31:0])};
+
+    return text;
+endfunction
\ No newline at end of file
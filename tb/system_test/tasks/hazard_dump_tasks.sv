@@ -49,3 +49,93 @@ begin
     $fdisplay(reg_dump_handle, "      forward_csr_ex_o: \"0b%b\"", `HAZARD_UNIT_HIER.forward_csr_ex_o);
 end
 endtask;
+
+// All outputs concatenated into one packed value (layout in the binary dump schema)
+function automatic logic [12:0] get_hazard_unit_outputs();
+    return {
+        `HAZARD_UNIT_HIER.stall_fi_o,
+        `HAZARD_UNIT_HIER.stall_de_o,
+        `HAZARD_UNIT_HIER.stall_ex_o,
+        `HAZARD_UNIT_HIER.stall_mem_o,
+        `HAZARD_UNIT_HIER.stall_wb_o,
+        `HAZARD_UNIT_HIER.flush_de_o,
+        `HAZARD_UNIT_HIER.flush_ex_o,
+        `HAZARD_UNIT_HIER.forward_a_ex_o,
+        `HAZARD_UNIT_HIER.forward_b_ex_o,
+        `HAZARD_UNIT_HIER.forward_csr_ex_o
+    };
+endfunction
+
+// Binary dump (PIPELINE_DUMP_BIN): all outputs as one packed value
+task automatic dump_hazard_unit_bin(int reg_dump_handle);
+    $fwrite(reg_dump_handle, "%u", get_hazard_unit_outputs());
+endtask
+
+// Delta dump (PIPELINE_DUMP_DELTA): only outputs that changed since the previous
+// cycle are written, along with their headers. Keyframes write every output.
+logic [12:0] prev_hazard_unit_outputs;
+
+task automatic dump_hazard_unit_delta(int reg_dump_handle, bit keyframe);
+    logic [12:0] hazard_unit_outputs;
+
+    hazard_unit_outputs = get_hazard_unit_outputs();
+
+    if (keyframe) begin
+        dump_hazard_unit(reg_dump_handle);
+    end else if (hazard_unit_outputs !== prev_hazard_unit_outputs) begin
+        $fdisplay(reg_dump_handle, "  hazard_unit:");
+        if (hazard_unit_outputs[12:8] !== prev_hazard_unit_outputs[12:8]) begin
+            $fdisplay(reg_dump_handle, "    stall:");
+            if (`HAZARD_UNIT_HIER.stall_fi_o !== prev_hazard_unit_outputs[12:12])
+                $fdisplay(reg_dump_handle, "      stall_fi_o: \"0b%b\"", `HAZARD_UNIT_HIER.stall_fi_o);
+            if (`HAZARD_UNIT_HIER.stall_de_o !== prev_hazard_unit_outputs[11:11])
+                $fdisplay(reg_dump_handle, "      stall_de_o: \"0b%b\"", `HAZARD_UNIT_HIER.stall_de_o);
+            if (`HAZARD_UNIT_HIER.stall_ex_o !== prev_hazard_unit_outputs[10:10])
+                $fdisplay(reg_dump_handle, "      stall_ex_o: \"0b%b\"", `HAZARD_UNIT_HIER.stall_ex_o);
+            if (`HAZARD_UNIT_HIER.stall_mem_o !== prev_hazard_unit_outputs[9:9])
+                $fdisplay(reg_dump_handle, "      stall_mem_o: \"0b%b\"", `HAZARD_UNIT_HIER.stall_mem_o);
+            if (`HAZARD_UNIT_HIER.stall_wb_o !== prev_hazard_unit_outputs[8:8])
+                $fdisplay(reg_dump_handle, "      stall_wb_o: \"0b%b\"", `HAZARD_UNIT_HIER.stall_wb_o);
+        end
+        if (hazard_unit_outputs[7:6] !== prev_hazard_unit_outputs[7:6]) begin
+            $fdisplay(reg_dump_handle, "    flush:");
+            if (`HAZARD_UNIT_HIER.flush_de_o !== prev_hazard_unit_outputs[7:7])
+                $fdisplay(reg_dump_handle, "      flush_de_o: \"0b%b\"", `HAZARD_UNIT_HIER.flush_de_o);
+            if (`HAZARD_UNIT_HIER.flush_ex_o !== prev_hazard_unit_outputs[6:6])
+                $fdisplay(reg_dump_handle, "      flush_ex_o: \"0b%b\"", `HAZARD_UNIT_HIER.flush_ex_o);
+        end
+        if (hazard_unit_outputs[5:0] !== prev_hazard_unit_outputs[5:0]) begin
+            $fdisplay(reg_dump_handle, "    forward:");
+            if (`HAZARD_UNIT_HIER.forward_a_ex_o !== prev_hazard_unit_outputs[5:4])
+                $fdisplay(reg_dump_handle, "      forward_a_ex_o: \"0b%b\"", `HAZARD_UNIT_HIER.forward_a_ex_o);
+            if (`HAZARD_UNIT_HIER.forward_b_ex_o !== prev_hazard_unit_outputs[3:2])
+                $fdisplay(reg_dump_handle, "      forward_b_ex_o: \"0b%b\"", `HAZARD_UNIT_HIER.forward_b_ex_o);
+            if (`HAZARD_UNIT_HIER.forward_csr_ex_o !== prev_hazard_unit_outputs[1:0])
+                $fdisplay(reg_dump_handle, "      forward_csr_ex_o: \"0b%b\"", `HAZARD_UNIT_HIER.forward_csr_ex_o);
+        end
+    end
+    prev_hazard_unit_outputs = hazard_unit_outputs;
+endtask
+
+// Trigger dump (PIPELINE_DUMP_TRIGGER): formats stored outputs the same way
+// dump_hazard_unit writes the live ones
+function automatic string format_hazard_unit(logic [12:0] outputs);
+    string text;
+
+    text = "  hazard_unit:\n";
+    text = {text, "    stall:\n"};
+    text = {text, $sformatf("      stall_fi_o: \"0b%b\"\n", outputs[12:12])};
+    text = {text, $sformatf("      stall_de_o: \"0b%b\"\n", outputs[11:11])};
+    text = {text, $sformatf("      stall_ex_o: \"0b%b\"\n", outputs[10:10])};
+    text = {text, $sformatf("      stall_mem_o: \"0b%b\"\n", outputs[9:9])};
+    text = {text, $sformatf("      stall_wb_o: \"0b%b\"\n", outputs[8:8])};
+    text = {text, "    flush:\n"};
+    text = {text, $sformatf("      flush_de_o: \"0b%b\"\n", outputs[7:7])};
+    text = {text, $sformatf("      flush_ex_o: \"0b%b\"\n", outputs[6:6])};
+    text = {text, "    forward:\n"};
+    text = {text, $sformatf("      forward_a_ex_o: \"0b%b\"\n", outputs[5:4])};
+    text = {text, $sformatf("      forward_b_ex_o: \"0b%b\"\n", outputs[3:2])};
+    text = {text, $sformatf("      forward_csr_ex_o: \"0b%b\"\n", outputs[1:0])};
+
+    return text;
+endfunction
\ No newline at end of file
@@ -56,3 +56,92 @@ begin
     $fdisplay(reg_dump_handle, "      csr_data: \"0x%h\"", `DATA_PATH_HIER.u_memory_stage.outputs_mem.data.csr_data);
 end
 endtask;
+
+// Binary dump (PIPELINE_DUMP_BIN): the whole output bundle as one packed value
+task automatic dump_mem_bin(int reg_dump_handle);
+    $fwrite(reg_dump_handle, "%u", `DATA_PATH_HIER.u_memory_stage.outputs_mem);
+endtask
+
+// Delta dump (PIPELINE_DUMP_DELTA): only fields that changed since the previous
+// cycle are written, along with their stage and category headers. Keyframes
+// write every field.
+logic [282:0] prev_mem_bundle;
+
+task automatic dump_mem_delta(int reg_dump_handle, bit keyframe);
+    if (keyframe) begin
+        dump_mem(reg_dump_handle);
+    end else if (`DATA_PATH_HIER.u_memory_stage.outputs_mem !== prev_mem_bundle) begin
+        $fdisplay(reg_dump_handle, "  mem:");
+        if (`DATA_PATH_HIER.u_memory_stage.outputs_mem.meta !== prev_mem_bundle[282:250]) begin
+            $fdisplay(reg_dump_handle, "    meta:");
+            if (`DATA_PATH_HIER.u_memory_stage.outputs_mem.meta.instr !== prev_mem_bundle[282:251])
+                $fdisplay(reg_dump_handle, "      instr: \"0x%h\"", `DATA_PATH_HIER.u_memory_stage.outputs_mem.meta.instr);
+            if (`DATA_PATH_HIER.u_memory_stage.outputs_mem.meta.valid !== prev_mem_bundle[250:250])
+                $fdisplay(reg_dump_handle, "      valid: \"0x%h\"", `DATA_PATH_HIER.u_memory_stage.outputs_mem.meta.valid);
+        end
+        if (`DATA_PATH_HIER.u_memory_stage.outputs_mem.control !== prev_mem_bundle[249:241]) begin
+            $fdisplay(reg_dump_handle, "    control:");
+            if (`DATA_PATH_HIER.u_memory_stage.outputs_mem.control.result_src !== prev_mem_bundle[249:247])
+                $fdisplay(reg_dump_handle, "      result_src: \"0b%b\"", `DATA_PATH_HIER.u_memory_stage.outputs_mem.control.result_src);
+            if (`DATA_PATH_HIER.u_memory_stage.outputs_mem.control.width_src !== prev_mem_bundle[246:244])
+                $fdisplay(reg_dump_handle, "      width_src: \"0b%b\"", `DATA_PATH_HIER.u_memory_stage.outputs_mem.control.width_src);
+            if (`DATA_PATH_HIER.u_memory_stage.outputs_mem.control.mem_write !== prev_mem_bundle[243:243])
+                $fdisplay(reg_dump_handle, "      mem_write: \"0b%b\"", `DATA_PATH_HIER.u_memory_stage.outputs_mem.control.mem_write);
+            if (`DATA_PATH_HIER.u_memory_stage.outputs_mem.control.reg_write !== prev_mem_bundle[242:242])
+                $fdisplay(reg_dump_handle, "      reg_write: \"0b%b\"", `DATA_PATH_HIER.u_memory_stage.outputs_mem.control.reg_write);
+            if (`DATA_PATH_HIER.u_memory_stage.outputs_mem.control.csr_we !== prev_mem_bundle[241:241])
+                $fdisplay(reg_dump_handle, "      csr_we: \"0b%b\"", `DATA_PATH_HIER.u_memory_stage.outputs_mem.control.csr_we);
+        end
+        if (`DATA_PATH_HIER.u_memory_stage.outputs_mem.data !== prev_mem_bundle[240:0]) begin
+            $fdisplay(reg_dump_handle, "    data:");
+            if (`DATA_PATH_HIER.u_memory_stage.outputs_mem.data.rd !== prev_mem_bundle[240:236])
+                $fdisplay(reg_dump_handle, "      rd: \"0x%h\"", `DATA_PATH_HIER.u_memory_stage.outputs_mem.data.rd);
+            if (`DATA_PATH_HIER.u_memory_stage.outputs_mem.data.alu_result !== prev_mem_bundle[235:204])
+                $fdisplay(reg_dump_handle, "      alu_result: \"0x%h\"", `DATA_PATH_HIER.u_memory_stage.outputs_mem.data.alu_result);
+            if (`DATA_PATH_HIER.u_memory_stage.outputs_mem.data.write_data !== prev_mem_bundle[203:172])
+                $fdisplay(reg_dump_handle, "      write_data: \"0x%h\"", `DATA_PATH_HIER.u_memory_stage.outputs_mem.data.write_data);
+            if (`DATA_PATH_HIER.u_memory_stage.outputs_mem.data.pc_target !== prev_mem_bundle[171:140])
+                $fdisplay(reg_dump_handle, "      pc_target: \"0x%h\"", `DATA_PATH_HIER.u_memory_stage.outputs_mem.data.pc_target);
+            if (`DATA_PATH_HIER.u_memory_stage.outputs_mem.data.pc_plus4 !== prev_mem_bundle[139:108])
+                $fdisplay(reg_dump_handle, "      pc_plus4: \"0x%h\"", `DATA_PATH_HIER.u_memory_stage.outputs_mem.data.pc_plus4);
+            if (`DATA_PATH_HIER.u_memory_stage.outputs_mem.data.imm_ext !== prev_mem_bundle[107:76])
+                $fdisplay(reg_dump_handle, "      imm_ext: \"0x%h\"", `DATA_PATH_HIER.u_memory_stage.outputs_mem.data.imm_ext);
+            if (`DATA_PATH_HIER.u_memory_stage.outputs_mem.data.csr_result !== prev_mem_bundle[75:44])
+                $fdisplay(reg_dump_handle, "      csr_result: \"0x%h\"", `DATA_PATH_HIER.u_memory_stage.outputs_mem.data.csr_result);
+            if (`DATA_PATH_HIER.u_memory_stage.outputs_mem.data.csr_addr !== prev_mem_bundle[43:32])
+                $fdisplay(reg_dump_handle, "      csr_addr: \"0x%h\"", `DATA_PATH_HIER.u_memory_stage.outputs_mem.data.csr_addr);
+            if (`DATA_PATH_HIER.u_memory_stage.outputs_mem.data.csr_data !== prev_mem_bundle[31:0])
+                $fdisplay(reg_dump_handle, "      csr_data: \"0x%h\"", `DATA_PATH_HIER.u_memory_stage.outputs_mem.data.csr_data);
+        end
+    end
+    prev_mem_bundle = `DATA_PATH_HIER.u_memory_stage.outputs_mem;
+endtask
+
+// Trigger dump (PIPELINE_DUMP_TRIGGER): formats a stored output bundle the
+// same way dump_mem writes the live one
+function automatic string format_mem(logic [282:0] bundle);
+    string text;
+
+    text = "  mem:\n";
+    text = {text, "    meta:\n"};
+    text = {text, $sformatf("      instr: \"0x%h\"\n", bundle[282:251])};
+    text = {text, $sformatf("      valid: \"0x%h\"\n", bundle[250:250])};
+    text = {text, "    control:\n"};
+    text = {text, $sformatf("      result_src: \"0b%b\"\n", bundle[249:247])};
+    text = {text, $sformatf("      width_src: \"0b%b\"\n", bundle[246:244])};
+    text = {text, $sformatf("      mem_write: \"0b%b\"\n", bundle[243:243])};
+    text = {text, $sformatf("      reg_write: \"0b%b\"\n", bundle[242:242])};
+    text = {text, $sformatf("      csr_we: \"0b%b\"\n", bundle[241:241])};
+    text = {text, "    data:\n"};
+    text = {text, $sformatf("      rd: \"0x%h\"\n", bundle[240:236])};
+    text = {text, $sformatf("      alu_result: \"0x%h\"\n", bundle[235:204])};
+    text = {text, $sformatf("      write_data: \"0x%h\"\n", bundle[203:172])};
+    text = {text, $sformatf("      pc_target: \"0x%h\"\n", bundle[171:140])};
+    text = {text, $sformatf("      pc_plus4: \"0x%h\"\n", bundle[139:108])};
+    text = {text, $sformatf("      imm_ext: \"0x%h\"\n", bundle[107:76])};
+    text = {text, $sformatf("      csr_result: \"0x%h\"\n", bundle[75:44])};
+    text = {text, $sformatf("      csr_addr: \"0x%h\"\n", bundle[43:32])};
+    text = {text, $sformatf("      csr_data: \"0x%h\"\n", bundle[31:0])};
+
+    return text;
+endfunction
\ No newline at end of file
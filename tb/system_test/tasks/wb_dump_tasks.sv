@@ -54,3 +54,86 @@ begin
     $fdisplay(reg_dump_handle, "      csr_data: \"0x%h\"", `DATA_PATH_HIER.u_writeback_stage.outputs_wb.data.csr_data);
 end
 endtask;
+
+// Binary dump (PIPELINE_DUMP_BIN): the whole output bundle as one packed value
+task automatic dump_wb_bin(int reg_dump_handle);
+    $fwrite(reg_dump_handle, "%u", `DATA_PATH_HIER.u_writeback_stage.outputs_wb);
+endtask
+
+// Delta dump (PIPELINE_DUMP_DELTA): only fields that changed since the previous
+// cycle are written, along with their stage and category headers. Keyframes
+// write every field.
+logic [278:0] prev_wb_bundle;
+
+task automatic dump_wb_delta(int reg_dump_handle, bit keyframe);
+    if (keyframe) begin
+        dump_wb(reg_dump_handle);
+    end else if (`DATA_PATH_HIER.u_writeback_stage.outputs_wb !== prev_wb_bundle) begin
+        $fdisplay(reg_dump_handle, "  wb:");
+        if (`DATA_PATH_HIER.u_writeback_stage.outputs_wb.meta !== prev_wb_bundle[278:246]) begin
+            $fdisplay(reg_dump_handle, "    meta:");
+            if (`DATA_PATH_HIER.u_writeback_stage.outputs_wb.meta.instr !== prev_wb_bundle[278:247])
+                $fdisplay(reg_dump_handle, "      instr: \"0x%h\"", `DATA_PATH_HIER.u_writeback_stage.outputs_wb.meta.instr);
+            if (`DATA_PATH_HIER.u_writeback_stage.outputs_wb.meta.valid !== prev_wb_bundle[246:246])
+                $fdisplay(reg_dump_handle, "      valid: \"0x%h\"", `DATA_PATH_HIER.u_writeback_stage.outputs_wb.meta.valid);
+        end
+        if (`DATA_PATH_HIER.u_writeback_stage.outputs_wb.control !== prev_wb_bundle[245:241]) begin
+            $fdisplay(reg_dump_handle, "    control:");
+            if (`DATA_PATH_HIER.u_writeback_stage.outputs_wb.control.result_src !== prev_wb_bundle[245:243])
+                $fdisplay(reg_dump_handle, "      result_src: \"0b%b\"", `DATA_PATH_HIER.u_writeback_stage.outputs_wb.control.result_src);
+            if (`DATA_PATH_HIER.u_writeback_stage.outputs_wb.control.reg_write !== prev_wb_bundle[242:242])
+                $fdisplay(reg_dump_handle, "      reg_write: \"0b%b\"", `DATA_PATH_HIER.u_writeback_stage.outputs_wb.control.reg_write);
+            if (`DATA_PATH_HIER.u_writeback_stage.outputs_wb.control.csr_we !== prev_wb_bundle[241:241])
+                $fdisplay(reg_dump_handle, "      csr_we: \"0b%b\"", `DATA_PATH_HIER.u_writeback_stage.outputs_wb.control.csr_we);
+        end
+        if (`DATA_PATH_HIER.u_writeback_stage.outputs_wb.data !== prev_wb_bundle[240:0]) begin
+            $fdisplay(reg_dump_handle, "    data:");
+            if (`DATA_PATH_HIER.u_writeback_stage.outputs_wb.data.rd !== prev_wb_bundle[240:236])
+                $fdisplay(reg_dump_handle, "      rd: \"0x%h\"", `DATA_PATH_HIER.u_writeback_stage.outputs_wb.data.rd);
+            if (`DATA_PATH_HIER.u_writeback_stage.outputs_wb.data.alu_result !== prev_wb_bundle[235:204])
+                $fdisplay(reg_dump_handle, "      alu_result: \"0x%h\"", `DATA_PATH_HIER.u_writeback_stage.outputs_wb.data.alu_result);
+            if (`DATA_PATH_HIER.u_writeback_stage.outputs_wb.data.reduced_data !== prev_wb_bundle[203:172])
+                $fdisplay(reg_dump_handle, "      reduced_data: \"0x%h\"", `DATA_PATH_HIER.u_writeback_stage.outputs_wb.data.reduced_data);
+            if (`DATA_PATH_HIER.u_writeback_stage.outputs_wb.data.pc_target !== prev_wb_bundle[171:140])
+                $fdisplay(reg_dump_handle, "      pc_target: \"0x%h\"", `DATA_PATH_HIER.u_writeback_stage.outputs_wb.data.pc_target);
+            if (`DATA_PATH_HIER.u_writeback_stage.outputs_wb.data.pc_plus4 !== prev_wb_bundle[139:108])
+                $fdisplay(reg_dump_handle, "      pc_plus4: \"0x%h\"", `DATA_PATH_HIER.u_writeback_stage.outputs_wb.data.pc_plus4);
+            if (`DATA_PATH_HIER.u_writeback_stage.outputs_wb.data.imm_ext !== prev_wb_bundle[107:76])
+                $fdisplay(reg_dump_handle, "      imm_ext: \"0x%h\"", `DATA_PATH_HIER.u_writeback_stage.outputs_wb.data.imm_ext);
+            if (`DATA_PATH_HIER.u_writeback_stage.outputs_wb.data.csr_result !== prev_wb_bundle[75:44])
+                $fdisplay(reg_dump_handle, "      csr_result: \"0x%h\"", `DATA_PATH_HIER.u_writeback_stage.outputs_wb.data.csr_result);
+            if (`DATA_PATH_HIER.u_writeback_stage.outputs_wb.data.csr_addr !== prev_wb_bundle[43:32])
+                $fdisplay(reg_dump_handle, "      csr_addr: \"0x%h\"", `DATA_PATH_HIER.u_writeback_stage.outputs_wb.data.csr_addr);
+            if (`DATA_PATH_HIER.u_writeback_stage.outputs_wb.data.csr_data !== prev_wb_bundle[31:0])
+                $fdisplay(reg_dump_handle, "      csr_data: \"0x%h\"", `DATA_PATH_HIER.u_writeback_stage.outputs_wb.data.csr_data);
+        end
+    end
+    prev_wb_bundle = `DATA_PATH_HIER.u_writeback_stage.outputs_wb;
+endtask
+
+// Trigger dump (PIPELINE_DUMP_TRIGGER): formats a stored output bundle the
+// same way dump_wb writes the live one
+function automatic string format_wb(logic [278:0] bundle);
+    string text;
+
+    text = "  wb:\n";
+    text = {text, "    meta:\n"};
+    text = {text, $sformatf("      instr: \"0x%h\"\n", bundle[278:247])};
+    text = {text, $sformatf("      valid: \"0x%h\"\n", bundle[246:246])};
+    text = {text, "    control:\n"};
+    text = {text, $sformatf("      result_src: \"0b%b\"\n", bundle[245:243])};
+    text = {text, $sformatf("      reg_write: \"0b%b\"\n", bundle[242:242])};
+    text = {text, $sformatf("      csr_we: \"0b%b\"\n", bundle[241:241])};
+    text = {text, "    data:\n"};
+    text = {text, $sformatf("      rd: \"0x%h\"\n", bundle[240:236])};
+    text = {text, $sformatf("      alu_result: \"0x%h\"\n", bundle[235:204])};
+    text = {text, $sformatf("      reduced_data: \"0x%h\"\n", bundle[203:172])};
+    text = {text, $sformatf("      pc_target: \"0x%h\"\n", bundle[171:140])};
+    text = {text, $sformatf("      pc_plus4: \"0x%h\"\n", bundle[139:108])};
+    text = {text, $sformatf("      imm_ext: \"0x%h\"\n", bundle[107:76])};
+    text = {text, $sformatf("      csr_result: \"0x%h\"\n", bundle[75:44])};
+    text = {text, $sformatf("      csr_addr: \"0x%h\"\n", bundle[43:32])};
+    text = {text, $sformatf("      csr_data: \"0x%h\"\n", bundle[31:0])};
+
+    return text;
+endfunction
\ No newline at end of file